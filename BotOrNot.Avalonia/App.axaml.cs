@@ -1,6 +1,7 @@
 using Avalonia;
 using Avalonia.Controls.ApplicationLifetimes;
 using Avalonia.Markup.Xaml;
+using BotOrNot.Avalonia.Services;
 using BotOrNot.Avalonia.Views;
 
 namespace BotOrNot.Avalonia;
@@ -16,7 +17,19 @@ public partial class App : Application
     {
         if (ApplicationLifetime is IClassicDesktopStyleApplicationLifetime desktop)
         {
-            desktop.MainWindow = new MainWindow();
+            var window = new MainWindow();
+            desktop.MainWindow = window;
+
+            var replayPath = StartupOptions.ReplayPath(desktop.Args);
+            if (replayPath != null)
+            {
+                window.Opened += async (_, _) => await window.OpenReplayAsync(replayPath);
+            }
+
+            if (StartupOptions.ReadsCommands(desktop.Args))
+            {
+                CommandChannel.Start(window);
+            }
         }
 
         base.OnFrameworkInitializationCompleted();
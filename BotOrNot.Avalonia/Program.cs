@@ -5,6 +5,8 @@ namespace BotOrNot.Avalonia;
 
 internal static class Program
 {
+    // args reach App as IClassicDesktopStyleApplicationLifetime.Args; a replay path
+    // among them is opened on startup (see StartupOptions)
     [STAThread]
     public static void Main(string[] args) => BuildAvaloniaApp()
         .StartWithClassicDesktopLifetime(args);
@@ -0,0 +1,78 @@
+using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Avalonia.Threading;
+
+namespace BotOrNot.Avalonia.Services;
+
+/// <summary>
+/// What the command channel can ask the main window to do.
+/// </summary>
+public interface ICommandTarget
+{
+    Task OpenReplayAsync(string path);
+    void ResetView();
+    string DescribeView();
+}
+
+/// <summary>
+/// Reads one command per line from stdin and runs it on the UI thread. Enabled with the
+/// <c>--commands</c> switch (see StartupOptions); the GUI test harness uses it to load many
+/// replays into one running app. Results are reported through StatusLog:
+/// <list type="bullet">
+///   <item><c>open &lt;path&gt;</c> — load a replay as if it had been picked in the file dialog</item>
+///   <item><c>reset</c> — clear the filter and every column's sort ("view reset")</item>
+///   <item><c>state</c> — print the filter, sort and row counts ("view state")</item>
+/// </list>
+/// </summary>
+public static class CommandChannel
+{
+    public static void Start(ICommandTarget target)
+    {
+        var thread = new Thread(() => ReadLoop(target)) { IsBackground = true, Name = "command-channel" };
+        thread.Start();
+    }
+
+    private static void ReadLoop(ICommandTarget target)
+    {
+        string? line;
+        try
+        {
+            while ((line = Console.In.ReadLine()) != null)
+            {
+                var command = line.Trim();
+                if (command.Length > 0)
+                    Dispatcher.UIThread.Post(() => Run(target, command));
+            }
+        }
+        catch (Exception ex)
+        {
+            // A closed or broken stdin only ends the channel, never the app
+            StatusLog.Write("command channel closed", ex.Message);
+        }
+    }
+
+    private static async void Run(ICommandTarget target, string command)
+    {
+        var space = command.IndexOf(' ');
+        var verb = space < 0 ? command : command[..space];
+        var argument = space < 0 ? "" : command[(space + 1)..].Trim();
+
+        switch (verb)
+        {
+            case "open" when argument.Length > 0:
+                await target.OpenReplayAsync(argument);
+                break;
+            case "reset":
+                target.ResetView();
+                StatusLog.Write("view reset");
+                break;
+            case "state":
+                StatusLog.Write("view state", target.DescribeView());
+                break;
+            default:
+                StatusLog.Write("unknown command", command);
+                break;
+        }
+    }
+}
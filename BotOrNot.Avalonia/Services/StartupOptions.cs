@@ -0,0 +1,39 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+
+namespace BotOrNot.Avalonia.Services;
+
+/// <summary>
+/// Command-line options of the app. A replay path given after <c>--replay</c>, or as a
+/// positional argument that ends in <c>.replay</c> or names an existing file, is opened on
+/// startup through the same load path as "Select Replay File", so file associations work and
+/// the GUI test harness can skip the native file dialog.
+/// </summary>
+public static class StartupOptions
+{
+    public static string? ReplayPath(IReadOnlyList<string>? args)
+    {
+        if (args == null) return null;
+
+        for (var i = 0; i < args.Count; i++)
+        {
+            if (args[i] == "--replay")
+                return i + 1 < args.Count ? Path.GetFullPath(args[i + 1]) : null;
+
+            // Skip other switches, e.g. the -psn_ argument macOS passes to app bundles. Their
+            // values look like positional arguments, so only take what is plausibly a replay.
+            if (!args[i].StartsWith('-') && IsReplayArgument(args[i]))
+                return Path.GetFullPath(args[i]);
+        }
+        return null;
+    }
+
+    private static bool IsReplayArgument(string arg)
+        => arg.EndsWith(".replay", StringComparison.OrdinalIgnoreCase) || File.Exists(arg);
+
+    /// <summary>True when the app should take commands on stdin (see CommandChannel).</summary>
+    public static bool ReadsCommands(IReadOnlyList<string>? args)
+        => args != null && args.Contains("--commands");
+}
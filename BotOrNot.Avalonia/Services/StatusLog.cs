@@ -0,0 +1,29 @@
+using System;
+
+namespace BotOrNot.Avalonia.Services;
+
+/// <summary>
+/// Writes one-line status events to stdout, e.g. "[BotOrNot] replay loaded: match.replay".
+/// The GUI test harness (UITests/run_ui_test.py) waits on these lines instead of timers.
+/// </summary>
+public static class StatusLog
+{
+    private const string Prefix = "[BotOrNot]";
+    private static readonly object Lock = new();
+
+    public static void Write(string evt, string? detail = null)
+    {
+        try
+        {
+            lock (Lock)
+            {
+                Console.Out.WriteLine(detail is null ? $"{Prefix} {evt}" : $"{Prefix} {evt}: {detail}");
+                Console.Out.Flush();
+            }
+        }
+        catch
+        {
+            // stdout may be closed or redirected to nowhere — never crash the app over it
+        }
+    }
+}
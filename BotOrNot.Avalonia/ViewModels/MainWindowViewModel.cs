@@ -61,6 +61,7 @@ public class MainWindowViewModel : ReactiveObject
         {
             ErrorMessage = $"Failed to load replay: {ex.Message}";
             IsLoading = false;
+            StatusLog.Write("replay failed", ex.Message);
         });
 
         CycleThemeCommand = ReactiveCommand.Create(CycleTheme);
@@ -255,6 +256,7 @@ public class MainWindowViewModel : ReactiveObject
     {
         ErrorMessage = null;
         IsLoading = true;
+        StatusLog.Write("replay loading", path);
 
         try
         {
@@ -323,10 +325,12 @@ public class MainWindowViewModel : ReactiveObject
             ElimsSummary = $"{totalKills} Elims ({botKills} Bot{(botKills != 1 ? "s" : "")})";
             HasMetadata = true;
             HasData = true;
+            StatusLog.Write("replay loaded", $"{data.Metadata.FileName} ({_allPlayers.Count} players, {_allOwnerEliminations.Count} eliminations)");
         }
         catch (IOException ex)
         {
             ErrorMessage = $"Could not read replay file: {ex.Message} (The file may still be locked by Fortnite.)";
+            StatusLog.Write("replay failed", ex.Message);
         }
         finally
         {
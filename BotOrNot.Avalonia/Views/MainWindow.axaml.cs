@@ -1,6 +1,8 @@
 using System.Collections;
 using System.Diagnostics;
 using System.Reactive.Linq;
+using System.Collections.Specialized;
+using Avalonia.Automation;
 using Avalonia.Collections;
 using Avalonia.Controls;
 using Avalonia.Controls.Primitives;
@@ -9,20 +11,25 @@ using Avalonia.Interactivity;
 using Avalonia.Media;
 using Avalonia.Platform.Storage;
 using Avalonia.Threading;
+using BotOrNot.Avalonia.Services;
 using BotOrNot.Avalonia.ViewModels;
 using BotOrNot.Core.Models;
 using ReactiveUI;
 
 namespace BotOrNot.Avalonia.Views;
 
-public partial class MainWindow : Window
+public partial class MainWindow : Window, ICommandTarget
 {
     private readonly MainWindowViewModel _viewModel;
     private readonly MenuFlyout _columnsFlyout;
     // All columns use a 3-mode cycle:
     //   0 = desc (unknowns bottom), 1 = asc (unknowns bottom), 2 = unknowns-first
     private readonly Dictionary<DataGridColumn, int> _columnSortMode = new();
+    // Column and mode of the last sort of each grid, published for UI tests (see PublishGridState)
+    private readonly Dictionary<DataGrid, (string Column, int Mode)> _gridSort = new();
+    private bool _gridStatePending;
     private DataGrid? _playersGrid;
+    private DataGrid? _ownerGrid;
     private Button? _columnsButton;
 
     public MainWindow()
@@ -43,17 +50,20 @@ public partial class MainWindow : Window
         }
 
         // Wire up custom sorting and row tinting on both grids
-        var ownerGrid = this.FindControl<DataGrid>("OwnerEliminationsGrid");
-        if (ownerGrid != null)
+        _ownerGrid = this.FindControl<DataGrid>("OwnerEliminationsGrid");
+        if (_ownerGrid != null)
         {
-            ownerGrid.Sorting += OnDataGridSorting;
-            ownerGrid.LoadingRow += OnDataGridLoadingRow;
+            _ownerGrid.Sorting += OnDataGridSorting;
+            _ownerGrid.LoadingRow += OnDataGridLoadingRow;
         }
         if (_playersGrid != null)
         {
             _playersGrid.Sorting += OnDataGridSorting;
             _playersGrid.LoadingRow += OnDataGridLoadingRow;
         }
+        _viewModel.Players.CollectionChanged += OnGridItemsChanged;
+        _viewModel.OwnerEliminations.CollectionChanged += OnGridItemsChanged;
+        PublishGridState();
 
         // Drag-and-drop handlers
         AddHandler(DragDrop.DragOverEvent, OnDragOver);
@@ -62,13 +72,22 @@ public partial class MainWindow : Window
 
         // Build the columns menu when the window loads
         Loaded += (_, _) => BuildColumnsFlyout();
+        Opened += (_, _) => StatusLog.Write("window opened", $"{Width}x{Height}");
+
+        // Report once the grids have been rebuilt for a freshly loaded replay.
+        // Background priority runs after layout and render have caught up.
+        _viewModel.LoadReplayCommand.Subscribe(_ => Dispatcher.UIThread.Post(() =>
+        {
+            if (_viewModel.HasData)
+                StatusLog.Write("grid populated", $"{_viewModel.Players.Count} rows");
+        }, DispatcherPriority.Background));
 
         // Refresh DataGrid row backgrounds when theme changes
         if (global::Avalonia.Application.Current != null)
         {
             global::Avalonia.Application.Current.ActualThemeVariantChanged += (_, _) =>
             {
-                RefreshDataGridRows(ownerGrid);
+                RefreshDataGridRows(_ownerGrid);
                 RefreshDataGridRows(_playersGrid);
             };
         }
@@ -117,9 +136,41 @@ public partial class MainWindow : Window
                 cv.SortDescriptions.Clear();
                 cv.SortDescriptions.Add(DataGridSortDescription.FromComparer(comparer));
             }
+            _columnSortMode.TryGetValue(e.Column, out var mode);
+            _gridSort[grid] = (e.Column.Header?.ToString() ?? "", mode);
+            PublishGridState();
+            StatusLog.Write("grid sorted", $"{grid.Name} {e.Column.Header} mode={mode}");
         });
     }
 
+    private void OnGridItemsChanged(object? sender, NotifyCollectionChangedEventArgs e)
+    {
+        // A filter or a new replay changes the collections one item at a time; publish once afterwards
+        if (_gridStatePending) return;
+        _gridStatePending = true;
+        Dispatcher.UIThread.Post(() =>
+        {
+            _gridStatePending = false;
+            PublishGridState();
+        }, DispatcherPriority.Background);
+    }
+
+    /// <summary>
+    /// Mirrors each grid's row count and sort into its accessibility help text, e.g.
+    /// <c>rows=98 sort="Kills" mode=1</c>, so UI tests can read them from the
+    /// accessibility tree (UITests/a11y.py) instead of from the screen.
+    /// </summary>
+    private void PublishGridState()
+    {
+        foreach (var grid in new[] { _ownerGrid, _playersGrid })
+        {
+            if (grid == null) continue;
+            var rows = (grid.ItemsSource as ICollection)?.Count ?? 0;
+            var (column, mode) = _gridSort.TryGetValue(grid, out var sort) ? sort : ("", 0);
+            AutomationProperties.SetHelpText(grid, $"rows={rows} sort=\"{column}\" mode={mode}");
+        }
+    }
+
     private void OnDataGridLoadingRow(object? sender, DataGridRowEventArgs e)
     {
         if (e.Row.DataContext is PlayerRow player)
@@ -234,14 +285,60 @@ public partial class MainWindow : Window
 
             if (!string.IsNullOrEmpty(path))
             {
-                await _viewModel.LoadReplayCommand.Execute(path).FirstAsync();
+                await OpenReplayAsync(path);
             }
         }
         catch (Exception ex)
         {
-            _viewModel.ErrorMessage = $"Failed to load replay: {ex.Message} (The file may still be locked by Fortnite.)";
-            _viewModel.IsLoading = false;
+            ShowLoadError(ex);
+        }
+    }
+
+    /// <summary>
+    /// Loads a replay exactly as if it had been picked in the file dialog. Also used for
+    /// drag-and-drop and for a replay path passed on the command line (see StartupOptions).
+    /// </summary>
+    public async Task OpenReplayAsync(string path)
+    {
+        try
+        {
+            await _viewModel.LoadReplayCommand.Execute(path).FirstAsync();
+        }
+        catch (Exception ex)
+        {
+            ShowLoadError(ex);
+        }
+    }
+
+    /// <summary>
+    /// Clears the filter and the sort of both grids, so the next replay starts from the
+    /// same view as a fresh window.
+    /// </summary>
+    public void ResetView()
+    {
+        _viewModel.FilterText = "";
+        _columnSortMode.Clear();
+        _gridSort.Clear();
+        foreach (var grid in new[] { _ownerGrid, _playersGrid })
+        {
+            grid?.CollectionView?.SortDescriptions.Clear();
         }
+        PublishGridState();
+    }
+
+    /// <summary>One-line summary of the filter, sort and row counts (for the command channel).</summary>
+    public string DescribeView()
+    {
+        var sorts = (_ownerGrid?.CollectionView?.SortDescriptions.Count ?? 0)
+                    + (_playersGrid?.CollectionView?.SortDescriptions.Count ?? 0);
+        return $"filter=\"{_viewModel.FilterText}\" sorts={sorts} rows={_viewModel.Players.Count} " +
+               $"eliminations={_viewModel.OwnerEliminations.Count}";
+    }
+
+    private void ShowLoadError(Exception ex)
+    {
+        _viewModel.ErrorMessage = $"Failed to load replay: {ex.Message} (The file may still be locked by Fortnite.)";
+        _viewModel.IsLoading = false;
     }
 
     private async void OpenReplay_Click(object? sender, RoutedEventArgs e)
@@ -271,14 +368,13 @@ public partial class MainWindow : Window
                 var path = file.TryGetLocalPath();
                 if (!string.IsNullOrEmpty(path))
                 {
-                    await _viewModel.LoadReplayCommand.Execute(path).FirstAsync();
+                    await OpenReplayAsync(path);
                 }
             }
         }
         catch (Exception ex)
         {
-            _viewModel.ErrorMessage = $"Failed to load replay: {ex.Message} (The file may still be locked by Fortnite.)";
-            _viewModel.IsLoading = false;
+            ShowLoadError(ex);
         }
     }
 
@@ -0,0 +1,66 @@
+using BotOrNot.Avalonia.Services;
+
+namespace BotOrNot.Tests;
+
+[TestFixture]
+public class StartupOptionsTests
+{
+    [Test]
+    public void ReplayPath_NoArguments_ReturnsNull()
+    {
+        Assert.That(StartupOptions.ReplayPath([]), Is.Null);
+        Assert.That(StartupOptions.ReplayPath(null), Is.Null);
+    }
+
+    [Test]
+    public void ReplayPath_FirstPositionalArgument_IsMadeAbsolute()
+    {
+        var path = StartupOptions.ReplayPath(["match.replay"]);
+
+        Assert.That(path, Is.EqualTo(Path.GetFullPath("match.replay")));
+    }
+
+    [Test]
+    public void ReplayPath_ReplayOption_TakesFollowingArgument()
+    {
+        var expected = Path.GetFullPath(Path.Combine("replays", "match.replay"));
+
+        Assert.That(StartupOptions.ReplayPath(["--replay", Path.Combine("replays", "match.replay")]), Is.EqualTo(expected));
+    }
+
+    [Test]
+    public void ReplayPath_SkipsOtherSwitches()
+    {
+        var path = StartupOptions.ReplayPath(["-psn_0_12345", "match.replay"]);
+
+        Assert.That(path, Is.EqualTo(Path.GetFullPath("match.replay")));
+    }
+
+    [Test]
+    public void ReplayPath_IgnoresValuesOfOtherSwitches()
+    {
+        Assert.That(StartupOptions.ReplayPath(["--some-option", "value"]), Is.Null);
+        Assert.That(StartupOptions.ReplayPath(["--some-option", "value", "match.replay"]),
+            Is.EqualTo(Path.GetFullPath("match.replay")));
+    }
+
+    [Test]
+    public void ReplayPath_ReplayOptionWithoutValue_ReturnsNull()
+    {
+        Assert.That(StartupOptions.ReplayPath(["--replay"]), Is.Null);
+    }
+
+    [Test]
+    public void ReadsCommands_OnlyWithCommandsSwitch()
+    {
+        Assert.That(StartupOptions.ReadsCommands(["--commands"]), Is.True);
+        Assert.That(StartupOptions.ReadsCommands(["match.replay"]), Is.False);
+        Assert.That(StartupOptions.ReadsCommands(null), Is.False);
+    }
+
+    [Test]
+    public void ReplayPath_IgnoresCommandsSwitch()
+    {
+        Assert.That(StartupOptions.ReplayPath(["--commands"]), Is.Null);
+    }
+}
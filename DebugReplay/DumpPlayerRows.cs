@@ -0,0 +1,88 @@
+using System.Text.Json;
+using BotOrNot.Core.Models;
+using BotOrNot.Core.Services;
+
+/// <summary>
+/// Writes the PlayerRows the app shows for a replay as JSON, parsed by the same
+/// ReplayService the app uses. Alongside the rows it writes, for every sortable
+/// PlayersGrid column, the modes successive header clicks go through and where
+/// the key changes in each mode's order, computed with the app's own
+/// PlayerRowSortComparer. UITests/expected.py caches the export and checks the
+/// grid against those runs, so a change to the comparer changes the expected
+/// order with it.
+/// </summary>
+public static class DumpPlayerRows
+{
+    // Bump when the JSON shape changes; the harness ignores exports of another format
+    public const int Format = 2;
+
+    private static readonly JsonSerializerOptions Options = new()
+    {
+        PropertyNamingPolicy = JsonNamingPolicy.CamelCase,
+    };
+
+    // As in MainWindow.GetColumnSortInfo; the group-cycle columns (Platform, Death Cause) are left out
+    private static readonly (string Header, Func<PlayerRow, string?> Selector, bool Numeric, bool Bot)[] Columns =
+    [
+        ("Id", p => p.Id, false, false),
+        ("Name", p => p.Name, false, false),
+        ("Level", p => p.Level, true, false),
+        ("Bot", p => p.Bot, false, true),
+        ("Kills", p => p.Kills, true, false),
+        ("Squad", p => p.TeamIndex, true, false),
+        ("Place", p => p.Placement, true, false),
+        ("Elim Time", p => p.ElimTime, true, false),
+        ("Pickaxe", p => p.Pickaxe, false, false),
+        ("Glider", p => p.Glider, false, false),
+    ];
+
+    public static async Task RunAsync(string replayPath, string? outputPath = null)
+    {
+        var data = await new ReplayService().LoadReplayAsync(replayPath);
+
+        var export = new
+        {
+            format = Format,
+            file = Path.GetFileName(replayPath),
+            owner = data.OwnerName,
+            players = data.Players,
+            ownerEliminations = data.OwnerEliminations,
+            sorts = Columns.ToDictionary(c => c.Header, c => Sorts(data.Players, c.Selector, c.Numeric, c.Bot)),
+        };
+
+        if (string.IsNullOrEmpty(outputPath))
+        {
+            Console.WriteLine(JsonSerializer.Serialize(export, Options));
+            return;
+        }
+
+        await using (var stream = File.Create(outputPath))
+            await JsonSerializer.SerializeAsync(stream, export, Options);
+        Console.WriteLine($"Wrote {data.Players.Count} players to: {outputPath}");
+    }
+
+    /// <summary>
+    /// The column's click cycle as MainWindow.BuildStandardComparer runs it (1=asc,
+    /// 2=unknowns-first when a numeric or bot column has unknowns, 0=desc), with the
+    /// positions in each mode's order where the comparer sees a new key.
+    /// </summary>
+    private static object Sorts(IReadOnlyList<PlayerRow> players, Func<PlayerRow, string?> selector,
+        bool numeric, bool bot)
+    {
+        var unknowns = players.Count(p => PlayerRowSortComparer.IsUnknownOrEmpty(selector(p)));
+        var cycle = (numeric || bot) && unknowns > 0 ? new[] { 1, 2, 0 } : new[] { 1, 0 };
+
+        var modes = cycle.Select(mode =>
+        {
+            var comparer = new PlayerRowSortComparer(
+                selector, descending: mode == 0, numeric: numeric, isBotField: bot, unknownsFirst: mode == 2);
+            var sorted = players.OrderBy(p => p, comparer).ToList();
+            var starts = Enumerable.Range(1, Math.Max(sorted.Count - 1, 0))
+                .Where(i => comparer.Compare(sorted[i - 1], sorted[i]) != 0)
+                .ToList();
+            return new { mode, starts };
+        });
+
+        return new { unknowns, modes = modes.ToList() };
+    }
+}
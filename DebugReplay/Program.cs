@@ -37,6 +37,13 @@ if (args.Length > 1 && args[0] == "--dump-all")
     return;
 }
 
+if (args.Length > 1 && args[0] == "--dump-rows")
+{
+    string? outFile = args.Length > 2 ? args[2] : null;
+    await DumpPlayerRows.RunAsync(args[1], outFile);
+    return;
+}
+
 if (args.Length > 1 && args[0] == "--dump-unknown-deaths")
 {
     DumpUnknownDeaths.Run(args[1]);
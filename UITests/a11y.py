@@ -0,0 +1,360 @@
+"""
+Accessibility-tree locator for the BotOrNot GUI test harness.
+
+Finds the app's named controls in its accessibility tree instead of in
+screen pixels:
+
+- macOS  — the AX API (ApplicationServices through pyobjc); needs the
+           Accessibility permission for the terminal running the harness
+- Linux  — AT-SPI (gi.repository.Atspi); needs a session bus with the
+           AT-SPI registry, which a bare Xvfb display doesn't have
+
+Avalonia uses a control's x:Name as its automation id, so OpenButton,
+ColumnsButton, OwnerEliminationsGrid and PlayersGrid are found by the names
+MainWindow.axaml gives them. Column headers are the elements inside a grid
+whose name is one of the grid's visible column headers (layout.parse()).
+The app mirrors each grid's row count and sort into the grid's help text
+(MainWindow.axaml.cs, PublishGridState):
+
+    rows=98 sort="Kills" mode=1
+
+so reading them is one attribute query on an element that is already known.
+
+The tree is walked once into an ElementIndex. After that the harness
+invalidates only what it changed (a sort invalidates nothing, a column
+change one grid, a window move everything) and the next lookup re-walks
+just that subtree. When no tree is available the harness keeps using the
+pixel layout (layout.py) and the app log.
+"""
+
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+import timing
+import layout
+
+NAMED = ("OpenButton", "ColumnsButton", "OwnerEliminationsGrid", "PlayersGrid")
+GRID_STATUS = r'rows=(?P<rows>\d+) sort="(?P<column>[^"]*)" mode=(?P<mode>\d+)'
+
+MAX_DEPTH = 40
+HEADER_BAND = 3 * layout.HEADER_HEIGHT   # screen units below a grid's top that can hold its headers
+
+
+@dataclass
+class Element:
+    key: str                          # automation id, or "<grid>/<header>" for a column header
+    role: str
+    name: str
+    help: str
+    bounds: tuple[int, int, int, int] | None    # screen x, y, w, h
+    handle: object = field(default=None, repr=False, compare=False)
+
+    @property
+    def center(self) -> tuple[int, int] | None:
+        if not self.bounds:
+            return None
+        x, y, w, h = self.bounds
+        return (x + w // 2, y + h // 2)
+
+
+@dataclass(frozen=True)
+class GridState:
+    rows: int
+    column: str          # "" when the grid isn't sorted
+    mode: int            # oracle.MODE_NAMES
+
+    @classmethod
+    def parse(cls, text: str) -> "GridState | None":
+        m = re.search(GRID_STATUS, text or "")
+        return cls(int(m.group("rows")), m.group("column"), int(m.group("mode"))) if m else None
+
+
+# ---------------------------------------------------------------------------
+# Platform trees: node(handle) -> (role, automation_id, name, help, bounds, children) or None when stale
+# ---------------------------------------------------------------------------
+
+class _AXTree:
+    """macOS AX API. Each node is one AXUIElementCopyMultipleAttributeValues round trip."""
+
+    name = "ax"
+    ATTRIBUTES = ["AXRole", "AXIdentifier", "AXTitle", "AXDescription", "AXHelp", "AXPosition", "AXSize",
+                  "AXChildren"]
+
+    def __init__(self):
+        import ApplicationServices
+        from CoreFoundation import CFGetTypeID
+        self.AS = ApplicationServices
+        self.CFGetTypeID = CFGetTypeID
+        if not self.AS.AXIsProcessTrusted():
+            raise RuntimeError("no Accessibility permission (System Settings → Privacy & Security → Accessibility)")
+
+    def root(self, pid: int):
+        return self.AS.AXUIElementCreateApplication(pid)
+
+    def _present(self, value):
+        """Missing attributes come back as AXValues of the error type rather than as None."""
+        if value is None:
+            return None
+        if self.CFGetTypeID(value) == self.AS.AXValueGetTypeID():
+            if self.AS.AXValueGetType(value) == self.AS.kAXValueAXErrorType:
+                return None
+        return value
+
+    def _point(self, value, kind):
+        ok, out = self.AS.AXValueGetValue(value, kind, None)
+        return out if ok else None
+
+    def node(self, handle):
+        err, values = self.AS.AXUIElementCopyMultipleAttributeValues(handle, self.ATTRIBUTES, 0, None)
+        if err != self.AS.kAXErrorSuccess:
+            return None
+        role, ident, title, description, help_text, position, size, children = (self._present(v) for v in values)
+        bounds = None
+        if position is not None and size is not None:
+            origin = self._point(position, self.AS.kAXValueCGPointType)
+            extent = self._point(size, self.AS.kAXValueCGSizeType)
+            if origin is not None and extent is not None:
+                bounds = (int(origin.x), int(origin.y), int(extent.width), int(extent.height))
+        return (str(role or ""), str(ident or ""), str(title or description or ""), str(help_text or ""),
+                bounds, list(children or []))
+
+    def help(self, handle) -> str | None:
+        err, value = self.AS.AXUIElementCopyAttributeValue(handle, "AXHelp", None)
+        return str(value or "") if err == self.AS.kAXErrorSuccess else None
+
+    def close(self):
+        pass
+
+
+class _AtspiTree:
+    """Linux AT-SPI through GObject introspection."""
+
+    name = "atspi"
+
+    def __init__(self):
+        import gi
+        gi.require_version("Atspi", "2.0")
+        from gi.repository import Atspi
+        self.Atspi = Atspi
+        if Atspi.init() not in (0, 1):   # 1: already initialized
+            raise RuntimeError("AT-SPI registry not reachable (no accessibility bus?)")
+
+    def root(self, pid: int):
+        desktop = self.Atspi.get_desktop(0)
+        for i in range(desktop.get_child_count()):
+            app = desktop.get_child_at_index(i)
+            try:
+                if app is not None and app.get_process_id() == pid:
+                    return app
+            except Exception:   # GLib.Error from an application that went away
+                continue
+        return None
+
+    def node(self, handle):
+        A = self.Atspi
+        try:
+            component = handle.get_component_iface()
+            extents = component.get_extents(A.CoordType.SCREEN) if component else None
+            children = [handle.get_child_at_index(i) for i in range(handle.get_child_count())]
+            return (handle.get_role_name() or "", handle.get_accessible_id() or "", handle.get_name() or "",
+                    handle.get_description() or "",
+                    (extents.x, extents.y, extents.width, extents.height) if extents else None,
+                    [c for c in children if c is not None])
+        except Exception:   # GLib.Error: the element is gone
+            return None
+
+    def help(self, handle) -> str | None:
+        try:
+            return handle.get_description() or ""
+        except Exception:
+            return None
+
+    def close(self):
+        pass
+
+
+def open_tree():
+    """The accessibility tree for this platform. Raises (ImportError, RuntimeError, …) when there is none."""
+    if sys.platform == "darwin":
+        return _AXTree()
+    if sys.platform.startswith("linux"):
+        return _AtspiTree()
+    raise RuntimeError(f"no accessibility tree support on {sys.platform}")
+
+
+# ---------------------------------------------------------------------------
+# Element index
+# ---------------------------------------------------------------------------
+
+class ElementIndex:
+    """
+    key → Element for the named controls and the grids' column headers.
+    build() walks the whole application; refresh(key) walks only the subtree
+    under one indexed element and replaces what was found there.
+    """
+
+    def __init__(self, tree, pid: int, headers: dict[str, tuple[str, ...]]):
+        self.tree = tree
+        self.pid = pid
+        self.headers = headers            # grid → visible column headers
+        self.elements: dict[str, Element] = {}
+        self._stale: set[str] = set()
+        self._all_stale = True
+        self.walks = 0                    # full walks
+        self.subtree_walks = 0
+        self.nodes = 0                    # nodes visited by all walks
+        self.lookups = 0
+        self.cache_hits = 0
+
+    def _walk(self, handle, depth: int, grid: str | None, found: dict[str, Element]):
+        info = self.tree.node(handle)
+        self.nodes += 1
+        if info is None:
+            return
+        role, ident, name, help_text, bounds, children = info
+        if ident in NAMED and ident not in found:
+            found[ident] = Element(ident, role, name, help_text, bounds, handle)
+            if ident in self.headers:
+                grid = ident
+        elif grid is not None and name in self.headers[grid]:
+            key = f"{grid}/{name}"
+            # Cells can carry the same text as a header; the header is the topmost one
+            if key not in found or (bounds and found[key].bounds and bounds[1] < found[key].bounds[1]):
+                found[key] = Element(key, role, name, help_text, bounds, handle)
+        if depth >= MAX_DEPTH:
+            return
+        if grid is not None and grid in found and bounds and found[grid].bounds:
+            # Nothing below the header band of the grid can be a column header
+            if bounds[1] > found[grid].bounds[1] + HEADER_BAND:
+                return
+        for child in children:
+            self._walk(child, depth + 1, grid, found)
+
+    def build(self) -> int:
+        """Walk the whole application tree. Returns the number of elements indexed."""
+        root = self.tree.root(self.pid)
+        found: dict[str, Element] = {}
+        with timing.span("a11y tree walk", "io") as s:
+            if root is not None:
+                self._walk(root, 0, None, found)
+            s.args["elements"] = len(found)
+        self.walks += 1
+        self.elements = found
+        self._stale.clear()
+        self._all_stale = False
+        return len(found)
+
+    def refresh(self, key: str):
+        """Re-walk the subtree under `key` (a named control); falls back to a full walk if it's gone."""
+        element = self.elements.get(key)
+        prefix = f"{key}/"
+        found: dict[str, Element] = {}
+        if element is not None:
+            with timing.span(f"a11y refresh {key}", "io"):
+                self._walk(element.handle, 0, None, found)
+            self.subtree_walks += 1
+        if key not in found:
+            self.build()
+            return
+        self.elements = {k: e for k, e in self.elements.items() if not k.startswith(prefix)}
+        self.elements.update(found)
+        self._stale = {k for k in self._stale if k != key and not k.startswith(prefix)}
+
+    def invalidate(self, key: str | None = None):
+        """Mark one subtree (or, without a key, the whole index) as changed."""
+        if key is None:
+            self._all_stale = True
+        else:
+            self._stale.add(key)
+
+    def get(self, key: str) -> Element | None:
+        self.lookups += 1
+        if self._all_stale:
+            self.build()
+        else:
+            stale = next((s for s in self._stale if key == s or key.startswith(f"{s}/")), None)
+            if stale is not None:
+                self.refresh(stale)
+            else:
+                self.cache_hits += 1
+        return self.elements.get(key)
+
+    def stats(self) -> dict:
+        return {
+            "tree": self.tree.name,
+            "elements": len(self.elements),
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "walks": self.walks,
+            "subtree_walks": self.subtree_walks,
+            "nodes": self.nodes,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Locator
+# ---------------------------------------------------------------------------
+
+class Locator:
+    """Click targets, row counts and sort state of the app, read from its accessibility tree."""
+
+    def __init__(self, index: ElementIndex):
+        self.index = index
+
+    def target(self, key: str) -> tuple[int, int] | None:
+        """Screen point at the center of a named control or "<grid>/<header>"."""
+        element = self.index.get(key)
+        return element.center if element else None
+
+    def header_target(self, grid: str, column: str) -> tuple[int, int] | None:
+        return self.target(f"{grid}/{column}")
+
+    def grid_state(self, grid: str) -> GridState | None:
+        """Row count and sort of a grid: one help-text query on the indexed grid element."""
+        element = self.index.get(grid)
+        if element is None:
+            return None
+        with timing.span(f"a11y state {grid}", "io"):
+            text = self.index.tree.help(element.handle)
+        if text is None:
+            # The element went away (the grid was rebuilt); find it again once
+            self.index.invalidate()
+            element = self.index.get(grid)
+            text = self.index.tree.help(element.handle) if element else None
+        return GridState.parse(text)
+
+    def invalidate(self, key: str | None = None):
+        self.index.invalidate(key)
+
+    def stats(self) -> dict:
+        return self.index.stats()
+
+    def close(self):
+        self.index.tree.close()
+
+
+def visible_headers(path: str = layout.MAIN_WINDOW_AXAML) -> dict[str, tuple[str, ...]]:
+    """Grid → visible column headers, as in MainWindow.axaml."""
+    return {g["name"]: tuple(header for header, _width, _sortable in g["columns"]) for g in layout.parse(path)["grids"]}
+
+
+def create_locator(pid: int, timeout: float = 3.0) -> tuple[Locator | None, str]:
+    """
+    A Locator for the app with process id `pid`, or None and the reason when
+    there is no usable tree: no platform module, no permission, or an app
+    that exposes none of the named controls within `timeout` seconds.
+    """
+    try:
+        tree = open_tree()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    index = ElementIndex(tree, pid, visible_headers())
+    deadline = time.monotonic() + timeout
+    while index.build() == 0 or "OpenButton" not in index.elements:
+        if time.monotonic() >= deadline:
+            tree.close()
+            return None, f"the app exposes none of {', '.join(NAMED)} in its {tree.name} tree"
+        time.sleep(0.2)
+    return Locator(index), f"{tree.name} tree, {len(index.elements)} elements indexed"
@@ -0,0 +1,145 @@
+"""
+Background reader for the BotOrNot app's stdout/stderr.
+
+The app is launched with both pipes redirected. If nobody reads them a chatty
+run can fill the OS pipe buffer and stall the app, so AppOutputReader drains
+both on daemon threads into a bounded ring buffer and a log file.
+
+The app prints one-line status events (BotOrNot.Avalonia/Services/StatusLog.cs),
+which are the harness's best readiness signals:
+
+    [BotOrNot] window opened: 1100x800
+    [BotOrNot] replay loading: /path/to/file.replay
+    [BotOrNot] replay loaded: file.replay (98 players, 3 eliminations)
+    [BotOrNot] grid populated: 98 rows
+    [BotOrNot] grid sorted: PlayersGrid Kills mode=1
+    [BotOrNot] replay failed: <message>
+    [BotOrNot] view reset
+    [BotOrNot] view state: filter="" sorts=0 rows=98 eliminations=3
+
+The last two answer the "reset" and "state" commands of the app's stdin
+command channel (--commands, see session.py).
+"""
+
+import re
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+# Regexes for the status events above
+WINDOW_OPENED = r"\[BotOrNot\] window opened"
+REPLAY_LOADING = r"\[BotOrNot\] replay loading: (?P<path>.+)"
+REPLAY_LOADED = r"\[BotOrNot\] replay loaded: (?P<file>.+?) \((?P<players>\d+) players"
+GRID_POPULATED = r"\[BotOrNot\] grid populated: (?P<rows>\d+) rows"
+GRID_SORTED = r"\[BotOrNot\] grid sorted: (?P<grid>\S+) (?P<column>.+) mode=(?P<mode>\d+)"
+REPLAY_FAILED = r"\[BotOrNot\] replay failed: (?P<error>.*)"
+VIEW_RESET = r"\[BotOrNot\] view reset"
+VIEW_STATE = (r'\[BotOrNot\] view state: filter="(?P<filter>.*)" sorts=(?P<sorts>\d+) '
+              r"rows=(?P<rows>\d+) eliminations=(?P<eliminations>\d+)")
+
+
+@dataclass
+class LogLine:
+    seq: int        # monotonically increasing across both streams
+    time: float     # time.monotonic() when the line was read
+    stream: str     # "stdout" or "stderr"
+    text: str
+
+
+class AppOutputReader:
+    """Drains a subprocess's stdout/stderr line by line on background threads."""
+
+    def __init__(self, process, log_path: str | None = None, capacity: int = 5000):
+        self.process = process
+        self.log_path = log_path
+        self._lines: deque[LogLine] = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._log_file = open(log_path, "w", encoding="utf-8") if log_path else None
+        self._threads = []
+        self._open_streams = 0
+
+    def start(self) -> "AppOutputReader":
+        for name in ("stdout", "stderr"):
+            pipe = getattr(self.process, name)
+            if pipe is None:
+                continue
+            self._open_streams += 1
+            t = threading.Thread(target=self._pump, args=(name, pipe), name=f"app-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def _pump(self, name: str, pipe):
+        for raw in iter(pipe.readline, b""):
+            text = raw.decode("utf-8", "replace").rstrip("\r\n")
+            with self._cond:
+                self._seq += 1
+                self._lines.append(LogLine(self._seq, time.monotonic(), name, text))
+                if self._log_file:
+                    self._log_file.write(f"[{name}] {text}\n")
+                    self._log_file.flush()
+                self._cond.notify_all()
+        with self._cond:
+            self._open_streams -= 1
+            self._cond.notify_all()
+
+    def mark(self) -> int:
+        """Sequence number of the latest line; pass to find/wait_for as `since`."""
+        with self._cond:
+            return self._seq
+
+    def lines(self, since: int = 0) -> list[LogLine]:
+        with self._cond:
+            return [line for line in self._lines if line.seq > since]
+
+    def find(self, pattern: str, since: int = 0):
+        """First match of pattern in lines newer than `since`, or None."""
+        regex = re.compile(pattern)
+        for line in self.lines(since):
+            match = regex.search(line.text)
+            if match:
+                return match
+        return None
+
+    def find_line(self, pattern: str, since: int = 0) -> LogLine | None:
+        """Like find(), but returns the LogLine itself (its `time` is when the harness read it)."""
+        regex = re.compile(pattern)
+        for line in self.lines(since):
+            if regex.search(line.text):
+                return line
+        return None
+
+    def wait_for(self, pattern: str, timeout: float, since: int = 0):
+        """
+        Block until a line newer than `since` matches pattern. Returns the
+        re.Match, or None on timeout or when the app's pipes close first.
+        """
+        regex = re.compile(pattern)
+        deadline = time.monotonic() + timeout
+        checked = since
+        with self._cond:
+            while True:
+                for line in self._lines:
+                    if line.seq > checked:
+                        match = regex.search(line.text)
+                        if match:
+                            return match
+                        checked = line.seq
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (self._threads and self._open_streams == 0):
+                    return None
+                self._cond.wait(remaining)
+
+    def tail(self, n: int = 20) -> list[str]:
+        with self._cond:
+            return [f"[{l.stream}] {l.text}" for l in list(self._lines)[-n:]]
+
+    def close(self):
+        for t in self._threads:
+            t.join(timeout=1)
+        with self._cond:
+            if self._log_file:
+                self._log_file.close()
+                self._log_file = None
@@ -0,0 +1,790 @@
+"""
+Automation backends for the BotOrNot GUI test harness.
+
+A backend owns everything platform-specific: finding the app window,
+focusing it, sending mouse/keyboard input, and capturing the screen.
+run_ui_test.py only talks to the AutomationBackend interface, so the same
+test flow runs against a logged-in Mac (QuartzBackend) or a headless Xvfb
+display on a Linux build box (X11Backend).
+
+Platform modules (Quartz, python-xlib, pyautogui) are imported lazily so that
+importing this file never fails on the "other" platform.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+import subprocess
+
+from capture import Frame, XShmGrabber
+
+# Anything smaller is a menu-bar strip, tooltip or Avalonia's pre-layout stub
+MIN_WINDOW_SIZE = 200
+
+# Title the Avalonia app sets on its main window ("Bot or Not? v1.2.3 - file")
+WINDOW_TITLE_HINT = "bot or not"
+
+
+def _import_pyautogui():
+    """Import pyautogui on first use (it needs DISPLAY to be set on X11)."""
+    import pyautogui
+    pyautogui.FAILSAFE = True
+    # No implicit pause after every call: the harness waits on the screen instead
+    pyautogui.PAUSE = 0
+    return pyautogui
+
+
+class AutomationBackend:
+    """Interface every backend implements. Bounds are dicts with x, y, w, h, window_id."""
+
+    name = "base"
+    title_bar_height = 0  # points of window chrome above the client area in find_window bounds
+
+    def __init__(self):
+        self._pyautogui = None
+        self.focus_skipped = 0   # focus() calls where the app was already frontmost
+        self.focus_raised = 0    # focus() calls that had to activate/raise it
+
+    @property
+    def gui(self):
+        if self._pyautogui is None:
+            self._pyautogui = _import_pyautogui()
+        return self._pyautogui
+
+    # -- window lookup ------------------------------------------------------
+
+    def find_window(self, window_id=None, pid=None) -> dict | None:
+        raise NotImplementedError
+
+    def list_windows(self) -> list[dict]:
+        """Every top-level window as {owner, title, layer, bounds} (for debugging)."""
+        raise NotImplementedError
+
+    def window_bounds(self, window_id) -> dict | None:
+        """Bounds of one known window, without enumerating the others. None if it is gone."""
+        return self.find_window(window_id=window_id)
+
+    def watch_window(self, window_id) -> bool:
+        """Start listening for moves/resizes of a window. Returns False if the backend can't."""
+        return False
+
+    def window_changed(self, window_id) -> bool:
+        """True if a watched window moved, resized or closed since the last call."""
+        return False
+
+    # -- focus --------------------------------------------------------------
+
+    def focus(self, pid: int) -> bool:
+        """
+        Make the app frontmost and raise its window. A no-op when it already
+        is frontmost, which is the common case between header clicks.
+        Returns True if the window had to be raised.
+        """
+        if self.is_frontmost(pid):
+            self.focus_skipped += 1
+            return False
+        self.focus_raised += 1
+        self._raise(pid)
+        return True
+
+    def is_frontmost(self, pid: int) -> bool:
+        return False
+
+    def _raise(self, pid: int):
+        raise NotImplementedError
+
+    # -- input --------------------------------------------------------------
+
+    def click(self, x: int, y: int):
+        self.gui.click(x, y)
+
+    def hotkey(self, *keys: str):
+        self.gui.hotkey(*keys)
+
+    def press(self, key: str):
+        self.gui.press(key)
+
+    def type_text(self, text: str, interval: float = 0.01):
+        self.gui.typewrite(text, interval=interval)
+
+    def open_path_in_dialog(self, path: str, snapshot=None, settle=None):
+        """Drive the native file dialog to the given path and confirm it.
+        snapshot(label) is called at intermediate points if given.
+        settle(label, budget) waits for the dialog to react; defaults to sleeping budget."""
+        raise NotImplementedError
+
+    # -- capture / record ---------------------------------------------------
+
+    def screen_size(self) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def scale_factor(self) -> float:
+        """Screen coordinate units per Avalonia logical pixel (window bounds and clicks)."""
+        return 1.0
+
+    def grab_frame(self, region: tuple[int, int, int, int]) -> Frame:
+        """BGRX pixels of an (x, y, w, h) screen region, captured in-process."""
+        raise NotImplementedError
+
+    def grab(self, region: tuple[int, int, int, int]) -> bytes:
+        """Raw pixels of an (x, y, w, h) screen region, for change detection."""
+        return self.grab_frame(region).data
+
+    def frame_buffer(self, region: tuple[int, int, int, int]):
+        """A capture buffer the caller owns and refills with grab_into(region, buffer)."""
+        return bytearray(len(self.grab_frame(region).data))
+
+    def release_buffer(self, buffer):
+        """Give back a buffer from frame_buffer() that is no longer needed."""
+
+    def grab_into(self, region: tuple[int, int, int, int], buffer) -> Frame:
+        """
+        Capture region into `buffer` (from frame_buffer()); the frame's data is
+        a view of it. Without shared memory this is grab_frame() plus one copy.
+        """
+        frame = self.grab_frame(region)
+        buffer[:] = frame.data
+        return Frame(frame.width, frame.height, frame.stride, buffer, region, frame.timestamp)
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# macOS: persistent JavaScript for Automation session
+# ---------------------------------------------------------------------------
+
+# Runs inside `osascript -l JavaScript`. Reads one JSON array of commands per
+# line on stdin and answers with one JSON array of results per line on stdout,
+# so System Events is loaded once and scripts are compiled once per run.
+_JXA_SESSION = r"""
+ObjC.import('Foundation');
+var se = Application('System Events');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+
+function reply(text) {
+    stdout.writeData($(text + "\n").dataUsingEncoding($.NSUTF8StringEncoding));
+}
+
+function processFor(pid) {
+    var matches = se.processes.whose({unixId: pid});
+    if (matches.length === 0) throw new Error("no process with pid " + pid);
+    return matches[0];
+}
+
+function raiseWindow(proc) {
+    if (proc.windows.length > 0) proc.windows[0].actions.byName("AXRaise").perform();
+}
+
+function handle(cmd) {
+    switch (cmd.op) {
+        case "ping": return "pong";
+        case "frontmost_pid": return se.processes.whose({frontmost: true})[0].unixId();
+        case "activate": processFor(cmd.pid).frontmost = true; return true;
+        case "raise": raiseWindow(processFor(cmd.pid)); return true;
+        case "focus":
+            var proc = processFor(cmd.pid);
+            if (proc.frontmost()) return "frontmost";
+            proc.frontmost = true;
+            raiseWindow(proc);
+            return "raised";
+        default: throw new Error("unknown op " + cmd.op);
+    }
+}
+
+function run() {
+    reply('["ready"]');
+    var buffer = "";
+    while (true) {
+        var data = stdin.availableData;
+        if (data.length === 0) return;   // harness closed the pipe
+        buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+        var nl;
+        while ((nl = buffer.indexOf("\n")) >= 0) {
+            var line = buffer.slice(0, nl);
+            buffer = buffer.slice(nl + 1);
+            var results = JSON.parse(line).map(function (cmd) {
+                try { return {ok: true, value: handle(cmd)}; }
+                catch (e) { return {ok: false, error: String(e)}; }
+            });
+            reply(JSON.stringify(results));
+        }
+    }
+}
+"""
+
+
+class JXASession:
+    """
+    One long-lived osascript process for System Events work (activate,
+    AXRaise, frontmost checks). call() sends a batch of commands and
+    returns their results; a failing command returns None and is logged.
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.calls = 0
+        self._process = None
+        self._lines = None
+
+    def start(self) -> "JXASession":
+        import queue
+        import threading
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(
+            ["osascript", "-l", "JavaScript", "-e", _JXA_SESSION],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1,
+        )
+
+        def pump():
+            for line in self._process.stdout:
+                self._lines.put(line)
+            self._lines.put(None)
+
+        threading.Thread(target=pump, name="jxa-session", daemon=True).start()
+        self._read()   # "ready"
+        return self
+
+    def _read(self) -> list:
+        import queue
+        try:
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"osascript session did not answer within {self.timeout:.0f}s")
+        if line is None:
+            err = self._process.stderr.read() if self._process.stderr else ""
+            raise RuntimeError(f"osascript session exited: {err.strip()}")
+        return json.loads(line)
+
+    def call(self, *commands: dict) -> list:
+        self.calls += 1
+        self._process.stdin.write(json.dumps(list(commands)) + "\n")
+        self._process.stdin.flush()
+        results = []
+        for cmd, res in zip(commands, self._read()):
+            if not res.get("ok"):
+                print(f"  [jxa] {cmd.get('op')} failed: {res.get('error')}")
+            results.append(res.get("value"))
+        return results
+
+    def close(self):
+        if self._process and self._process.poll() is None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=3)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+        self._process = None
+
+
+# ---------------------------------------------------------------------------
+# macOS: Quartz window list + AppleScript focus + CGWindowListCreateImage capture
+# ---------------------------------------------------------------------------
+
+class QuartzBackend(AutomationBackend):
+    """Logged-in macOS session. Uses Quartz for window listing (no Accessibility needed)."""
+
+    name = "quartz"
+    title_bar_height = 28  # CGWindow bounds include the title bar; coordinates are in points
+
+    def __init__(self):
+        super().__init__()
+        import Quartz
+        self.Quartz = Quartz
+        self._session = None
+
+    def _all_windows(self):
+        # Search all windows across all Spaces so we find the app even if it's
+        # on a different Space. Uses kCGWindowListOptionAll instead of OnScreenOnly.
+        Q = self.Quartz
+        return Q.CGWindowListCopyWindowInfo(
+            Q.kCGWindowListOptionAll | Q.kCGWindowListExcludeDesktopElements,
+            Q.kCGNullWindowID,
+        ) or []
+
+    @staticmethod
+    def _bounds(w, window_id) -> dict | None:
+        b = w.get("kCGWindowBounds")
+        if not b:
+            return None
+        width = int(b.get("Width", 0))
+        height = int(b.get("Height", 0))
+        if width <= MIN_WINDOW_SIZE or height <= MIN_WINDOW_SIZE:
+            return None
+        return {
+            "x": int(b.get("X", 0)), "y": int(b.get("Y", 0)),
+            "w": width, "h": height,
+            "window_id": window_id,
+        }
+
+    def find_window(self, window_id=None, pid=None) -> dict | None:
+        windows = self._all_windows()
+
+        # If we have a known window ID, prefer that for re-queries
+        if window_id:
+            for w in windows:
+                if w.get("kCGWindowNumber") == window_id:
+                    info = self._bounds(w, window_id)
+                    if info:
+                        return info
+
+        # Fall back to name-based search (used during initial discovery)
+        for w in windows:
+            if w.get("kCGWindowLayer", 0) != 0:
+                continue
+            owner = w.get("kCGWindowOwnerName") or ""
+            title = (w.get("kCGWindowName") or "").lower()
+            owner_pid = w.get("kCGWindowOwnerPID")
+            if owner == "BotOrNot" or WINDOW_TITLE_HINT in title or (pid and owner_pid == pid):
+                info = self._bounds(w, w.get("kCGWindowNumber"))
+                if info:
+                    return info
+        return None
+
+    def window_bounds(self, window_id) -> dict | None:
+        Q = self.Quartz
+        windows = Q.CGWindowListCopyWindowInfo(Q.kCGWindowListOptionIncludingWindow, window_id) or []
+        for w in windows:
+            if w.get("kCGWindowNumber") == window_id:
+                return self._bounds(w, window_id)
+        return None
+
+    def list_windows(self) -> list[dict]:
+        Q = self.Quartz
+        windows = Q.CGWindowListCopyWindowInfo(Q.kCGWindowListOptionOnScreenOnly, Q.kCGNullWindowID) or []
+        return [{
+            "owner": w.get("kCGWindowOwnerName", "?"),
+            "title": w.get("kCGWindowName", ""),
+            "layer": w.get("kCGWindowLayer", -1),
+            "bounds": dict(w.get("kCGWindowBounds", {})),
+        } for w in windows]
+
+    @property
+    def session(self) -> "JXASession":
+        if self._session is None:
+            self._session = JXASession().start()
+        return self._session
+
+    def focus(self, pid: int) -> bool:
+        # Check and raise in one round trip to the persistent osascript process
+        state = self.session.call({"op": "focus", "pid": pid})[0]
+        if state == "frontmost":
+            self.focus_skipped += 1
+            return False
+        self.focus_raised += 1
+        self._wait_frontmost(pid)
+        return True
+
+    def is_frontmost(self, pid: int) -> bool:
+        return self.session.call({"op": "frontmost_pid"})[0] == pid
+
+    def _raise(self, pid: int):
+        self.session.call({"op": "activate", "pid": pid}, {"op": "raise", "pid": pid})
+        self._wait_frontmost(pid)
+
+    def _wait_frontmost(self, pid: int, timeout: float = 1.0):
+        deadline = time.monotonic() + timeout
+        while not self.is_frontmost(pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def open_path_in_dialog(self, path: str, snapshot=None, settle=None):
+        settle = settle or (lambda _label, budget: time.sleep(budget))
+        # In the macOS file dialog, Cmd+Shift+G opens the "Go to Folder" sheet
+        # where we can type an arbitrary path.
+        self.hotkey("command", "shift", "g")
+        settle("go_to_folder_sheet", 1.5)
+        if snapshot:
+            snapshot("go_to_folder_sheet")
+        self.type_text(path)
+        settle("path_typed", 0.5)
+        if snapshot:
+            snapshot("path_typed")
+        # Enter navigates to the path, the second Enter opens the selected file
+        self.press("enter")
+        settle("go_to_folder_closed", 1)
+        self.press("enter")
+
+    def screen_size(self) -> tuple[int, int]:
+        bounds = self.Quartz.CGDisplayBounds(self.Quartz.CGMainDisplayID())
+        return int(bounds.size.width), int(bounds.size.height)
+
+    def grab_frame(self, region: tuple[int, int, int, int]) -> Frame:
+        Q = self.Quartz
+        x, y, w, h = region
+        image = Q.CGWindowListCreateImage(
+            Q.CGRectMake(x, y, w, h),
+            Q.kCGWindowListOptionOnScreenOnly, Q.kCGNullWindowID, Q.kCGWindowImageDefault,
+        )
+        if image is None:
+            raise RuntimeError("CGWindowListCreateImage failed (Screen Recording permission?)")
+        # 32-bit BGRA, little-endian; width/height are in backing pixels (2x on Retina)
+        data = Q.CGDataProviderCopyData(Q.CGImageGetDataProvider(image))
+        return Frame(Q.CGImageGetWidth(image), Q.CGImageGetHeight(image), Q.CGImageGetBytesPerRow(image),
+                     memoryview(data), region, time.monotonic())
+
+    def close(self):
+        if self._session:
+            self._session.close()
+            self._session = None
+
+
+# ---------------------------------------------------------------------------
+# Window tracking
+# ---------------------------------------------------------------------------
+
+class WindowTracker:
+    """
+    Keeps the app window's bounds without enumerating every window on every
+    query. The window is discovered once by title/PID; after that only its
+    ID is re-queried, and only when the cached bounds may be out of date:
+    after invalidate() (focus changes, file dialogs) or, on backends that
+    deliver window events (X11 ConfigureNotify), when the window moved.
+    """
+
+    def __init__(self, backend: AutomationBackend, pid: int | None = None):
+        self.backend = backend
+        self.pid = pid
+        self.window_id = None
+        self.info = None
+        self.hits = 0          # answered from the cache
+        self.refreshes = 0     # single-window re-queries
+        self.enumerations = 0  # full window-list scans
+        self._stale = True
+        self._watching = False
+
+    def bounds(self) -> dict | None:
+        """Current bounds dict (x, y, w, h, window_id), from the cache when it is still valid."""
+        if self.info and not self._stale and not (
+                self._watching and self.backend.window_changed(self.window_id)):
+            self.hits += 1
+            return self.info
+        return self.refresh()
+
+    def refresh(self) -> dict | None:
+        """Re-query the window now, rediscovering it if its ID no longer resolves."""
+        info = None
+        if self.window_id:
+            self.refreshes += 1
+            info = self.backend.window_bounds(self.window_id)
+        if not info:
+            self.enumerations += 1
+            info = self.backend.find_window(pid=self.pid)
+            if info and info["window_id"] != self.window_id:
+                self.window_id = info["window_id"]
+                self._watching = self.backend.watch_window(self.window_id)
+        self.info = info
+        self._stale = info is None
+        return info
+
+    def invalidate(self, rediscover: bool = False):
+        """Drop the cached bounds. rediscover=True also forgets the window ID (e.g. after a dialog)."""
+        self._stale = True
+        if rediscover:
+            self.window_id = None
+            self._watching = False
+
+    def stats(self) -> dict:
+        total = self.hits + self.refreshes + self.enumerations
+        return {
+            "queries": total,
+            "cache_hits": self.hits,
+            "refreshes": self.refreshes,
+            "enumerations": self.enumerations,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Linux: Xvfb + python-xlib
+# ---------------------------------------------------------------------------
+
+class VirtualDisplay:
+    """An Xvfb server on its own display number. Use as a context manager."""
+
+    XVFB = shutil.which("Xvfb") or "/usr/bin/Xvfb"
+
+    def __init__(self, number: int = 99, size: str = "1920x1080", depth: int = 24):
+        self.number = number
+        self.size = size
+        self.depth = depth
+        self.name = f":{number}"
+        self._process = None
+
+    def start(self, timeout: float = 10) -> "VirtualDisplay":
+        socket_path = f"/tmp/.X11-unix/X{self.number}"
+        if os.path.exists(socket_path):
+            raise RuntimeError(f"Display {self.name} is already in use ({socket_path})")
+        self._process = subprocess.Popen(
+            [self.XVFB, self.name, "-screen", "0", f"{self.size}x{self.depth}", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Xvfb exited with code {self._process.returncode}")
+            if os.path.exists(socket_path):
+                return self
+            time.sleep(0.05)
+        self.stop()
+        raise TimeoutError(f"Xvfb did not create {socket_path}")
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.stop()
+
+
+class X11Backend(AutomationBackend):
+    """Any X server, typically a headless Xvfb display. Needs python-xlib."""
+
+    name = "x11"
+
+    def __init__(self, display_name: str | None = None):
+        super().__init__()
+        from Xlib import X, display
+        self.X = X
+        self.display_name = display_name or os.environ.get("DISPLAY", ":0")
+        # pyautogui reads DISPLAY when it is first imported
+        os.environ["DISPLAY"] = self.display_name
+        self.display = display.Display(self.display_name)
+        self.root = self.display.screen().root
+        self._atoms = {}
+        self._focus_window = None
+        self._capture = None
+        try:
+            self._shm = XShmGrabber(self.display_name)
+        except OSError as e:
+            print(f"  [x11] MIT-SHM capture unavailable ({e}); using XGetImage")
+            self._shm = None
+            # python-xlib connections are not thread-safe, and the recorder grabs
+            # from its own thread while the main thread uses self.display
+            self._capture = display.Display(self.display_name)
+            self._capture_lock = threading.Lock()
+
+    def _atom(self, name: str) -> int:
+        if name not in self._atoms:
+            self._atoms[name] = self.display.intern_atom(name)
+        return self._atoms[name]
+
+    def _window_title(self, win) -> str:
+        try:
+            prop = win.get_full_property(self._atom("_NET_WM_NAME"), 0)
+            if prop and prop.value:
+                value = prop.value
+                return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+            return win.get_wm_name() or ""
+        except Exception:
+            return ""
+
+    def _window_pid(self, win) -> int | None:
+        try:
+            prop = win.get_full_property(self._atom("_NET_WM_PID"), self.X.AnyPropertyType)
+            return int(prop.value[0]) if prop and len(prop.value) else None
+        except Exception:
+            return None
+
+    def _walk(self, win):
+        """Yield every window under win, depth first."""
+        try:
+            children = win.query_tree().children
+        except Exception:
+            return
+        for child in children:
+            yield child
+            yield from self._walk(child)
+
+    def _bounds(self, win) -> dict | None:
+        try:
+            attrs = win.get_attributes()
+            if attrs.map_state != self.X.IsViewable:
+                return None
+            geom = win.get_geometry()
+            pos = win.translate_coords(self.root, 0, 0)
+        except Exception:
+            return None
+        if geom.width <= MIN_WINDOW_SIZE or geom.height <= MIN_WINDOW_SIZE:
+            return None
+        return {"x": -pos.x, "y": -pos.y, "w": geom.width, "h": geom.height, "window_id": win.id}
+
+    def window_bounds(self, window_id) -> dict | None:
+        return self._bounds(self.display.create_resource_object("window", window_id))
+
+    def watch_window(self, window_id) -> bool:
+        try:
+            win = self.display.create_resource_object("window", window_id)
+            win.change_attributes(event_mask=self.X.StructureNotifyMask)
+            self.display.sync()
+            return True
+        except Exception:
+            return False
+
+    def window_changed(self, window_id) -> bool:
+        changed = False
+        watched = (self.X.ConfigureNotify, self.X.UnmapNotify, self.X.DestroyNotify, self.X.MapNotify)
+        while self.display.pending_events():
+            ev = self.display.next_event()
+            if ev.type in watched and getattr(ev, "window", None) is not None and ev.window.id == window_id:
+                changed = True
+        return changed
+
+    def find_window(self, window_id=None, pid=None) -> dict | None:
+        if window_id:
+            info = self._bounds(self.display.create_resource_object("window", window_id))
+            if info:
+                return info
+        for win in self._walk(self.root):
+            title = self._window_title(win).lower()
+            if WINDOW_TITLE_HINT in title or (pid and self._window_pid(win) == pid):
+                info = self._bounds(win)
+                if info:
+                    return info
+        return None
+
+    def list_windows(self) -> list[dict]:
+        out = []
+        for win in self._walk(self.root):
+            title = self._window_title(win)
+            if not title:
+                continue
+            info = self._bounds(win) or {}
+            out.append({"owner": str(self._window_pid(win) or "?"), "title": title,
+                        "layer": 0, "bounds": info})
+        return out
+
+    def _app_window(self, pid: int):
+        """The app's window, remembered between focus calls (one tree walk per window)."""
+        if self._focus_window is not None and self._bounds(self._focus_window):
+            return self._focus_window
+        info = self.find_window(pid=pid)
+        self._focus_window = self.display.create_resource_object("window", info["window_id"]) if info else None
+        return self._focus_window
+
+    def is_frontmost(self, pid: int) -> bool:
+        win = self._app_window(pid)
+        if win is None:
+            return False
+        try:
+            prop = self.root.get_full_property(self._atom("_NET_ACTIVE_WINDOW"), self.X.AnyPropertyType)
+            if prop and len(prop.value) and prop.value[0]:
+                return int(prop.value[0]) == win.id
+            # Bare Xvfb has no window manager: check input focus and stacking order ourselves
+            if self.display.get_input_focus().focus != win:
+                return False
+            tree = win.query_tree()
+            if tree.parent != self.root:
+                return True
+            return self.root.query_tree().children[-1] == win
+        except Exception:
+            return False
+
+    def _raise(self, pid: int):
+        win = self._app_window(pid)
+        if win is None:
+            return
+        # Ask a window manager (if any) to activate it, then do it ourselves for bare Xvfb
+        from Xlib.protocol import event
+        ev = event.ClientMessage(
+            window=win, client_type=self._atom("_NET_ACTIVE_WINDOW"),
+            data=(32, [1, self.X.CurrentTime, 0, 0, 0]),
+        )
+        mask = self.X.SubstructureRedirectMask | self.X.SubstructureNotifyMask
+        self.root.send_event(ev, event_mask=mask)
+        win.configure(stack_mode=self.X.Above)
+        win.set_input_focus(self.X.RevertToParent, self.X.CurrentTime)
+        self.display.sync()
+
+    def open_path_in_dialog(self, path: str, snapshot=None, settle=None):
+        settle = settle or (lambda _label, budget: time.sleep(budget))
+        # GTK and Avalonia's managed dialog both accept Ctrl+L to type a location
+        self.hotkey("ctrl", "l")
+        settle("location_entry", 0.5)
+        self.type_text(path)
+        settle("path_typed", 0.3)
+        if snapshot:
+            snapshot("path_typed")
+        self.press("enter")
+
+    def screen_size(self) -> tuple[int, int]:
+        geom = self.root.get_geometry()
+        return geom.width, geom.height
+
+    def scale_factor(self) -> float:
+        # Avalonia on X11 honours AVALONIA_GLOBAL_SCALE_FACTOR, else Xft.dpi / 96
+        env = os.environ.get("AVALONIA_GLOBAL_SCALE_FACTOR")
+        if env:
+            try:
+                return float(env)
+            except ValueError:
+                pass
+        try:
+            prop = self.root.get_full_property(self._atom("RESOURCE_MANAGER"), self.X.AnyPropertyType)
+            value = prop.value.decode("utf-8", "replace") if prop and isinstance(prop.value, bytes) else ""
+            for line in value.splitlines():
+                if line.startswith("Xft.dpi:"):
+                    return float(line.split(":", 1)[1]) / 96.0
+        except Exception:
+            pass
+        return 1.0
+
+    def grab_frame(self, region: tuple[int, int, int, int]) -> Frame:
+        if self._shm:
+            return self._shm.grab(region)
+        x, y, w, h = region
+        with self._capture_lock:
+            data = self._capture.screen().root.get_image(x, y, w, h, self.X.ZPixmap, 0xFFFFFFFF).data
+        return Frame(w, h, len(data) // h, data, region, time.monotonic())
+
+    def frame_buffer(self, region: tuple[int, int, int, int]):
+        if self._shm:
+            return self._shm.buffer(region[2], region[3])
+        return super().frame_buffer(region)
+
+    def release_buffer(self, buffer):
+        if self._shm:
+            self._shm.release(buffer)
+
+    def grab_into(self, region: tuple[int, int, int, int], buffer) -> Frame:
+        if self._shm:
+            return self._shm.grab_into(region, buffer)
+        return super().grab_into(region, buffer)
+
+    def close(self):
+        if self._shm:
+            self._shm.close()
+        for conn in (self._capture, self.display):
+            if conn is None:
+                continue
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def default_backend_name() -> str:
+    return "quartz" if sys.platform == "darwin" else "x11"
+
+
+def create_backend(name: str = "auto", display_name: str | None = None) -> AutomationBackend:
+    """Instantiate a backend by name ("auto", "quartz" or "x11")."""
+    if name == "auto":
+        name = default_backend_name()
+    if name == "quartz":
+        return QuartzBackend()
+    if name == "x11":
+        return X11Backend(display_name)
+    raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+BotOrNot latency benchmark
+
+Repeats the GUI harness (run_ui_test.py) N times per replay, each time in a
+fresh harness and app process, and reports percentiles of three user-visible
+latencies taken from every run's result JSON:
+
+- launch   — app process started → window shown at its real size
+- load     — file picked in the dialog ("replay loading") → PlayersGrid
+             populated (ReplayService.LoadReplayAsync plus grid binding)
+- sort     — header click → first repainted frame of PlayersGrid
+- sort_stable — header click → last repainted frame, once PlayersGrid is still
+
+Sort latencies are also shown per column and direction as histograms over
+all measured runs (latency.py).
+
+Results are compared with a stored baseline; a p50 or p95 that is slower
+than the baseline by more than the threshold is a regression (exit code 2).
+
+Usage:
+    python3 UITests/benchmark.py replay [replay ...] [--repeats N] [--threshold 0.2]
+                                 [--baseline FILE] [--update-baseline]
+                                 [-- extra run_ui_test.py args]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from dataclasses import dataclass
+
+import build
+import expected
+import latency
+from backends import default_backend_name
+from latency import percentile
+
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+HARNESS = os.path.join(UITESTS_DIR, "run_ui_test.py")
+DEFAULT_OUT = os.path.join(UITESTS_DIR, "benchmark-results")
+BASELINE_DIR = os.path.join(UITESTS_DIR, "benchmarks")
+DOTNET = os.path.expanduser("~/.dotnet/dotnet")
+
+DEFAULT_THRESHOLD = 0.2    # 20% slower than the baseline fails
+MIN_DELTA = 0.02           # … but only if it is also at least this many seconds slower
+METRICS = ("launch", "load", "sort", "sort_stable")
+
+
+def describe(samples: list[float]) -> dict:
+    if not samples:
+        return {"n": 0}
+    return {
+        "n": len(samples),
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "max": round(max(samples), 4),
+        "samples": [round(s, 4) for s in samples],
+    }
+
+
+def samples_from_result(result: dict) -> dict[str, list[float]]:
+    """The benchmark's metrics from one run_ui_test.py --result-json file."""
+    out = {metric: [] for metric in METRICS}
+    if "launch_seconds" in result:
+        out["launch"].append(result["launch_seconds"])
+    if "load_seconds" in result:
+        out["load"].append(result["load_seconds"])
+    for s in result.get("sort_latencies", []):
+        if s.get("seconds") is not None:
+            out["sort"].append(s["seconds"])
+        if s.get("stable_seconds") is not None:
+            out["sort_stable"].append(s["stable_seconds"])
+    return out
+
+
+def _replay_name(replay: str) -> str:
+    return os.path.splitext(os.path.basename(replay))[0]
+
+
+def run_replay(replay: str, repeats: int, out_dir: str, backend: str, harness_args: list[str],
+               warmup: int = 1, timeout: int = 600) -> dict:
+    """Run the harness warmup + repeats times for one replay; warm-up runs are not counted."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", _replay_name(replay))[:80]
+    samples = {metric: [] for metric in METRICS}
+    sort_latencies = []
+    failures = []
+    for i in range(warmup + repeats):
+        counted = i >= warmup
+        artifacts = os.path.join(out_dir, name, f"run-{i:02d}" if counted else f"warmup-{i:02d}")
+        os.makedirs(artifacts, exist_ok=True)
+        result_path = os.path.join(artifacts, "result.json")
+        cmd = [sys.executable, HARNESS, replay, "--backend", backend, "--artifacts", artifacts,
+               "--result-json", result_path, "--no-visual"] + harness_args
+        start = time.monotonic()
+        with open(os.path.join(artifacts, "harness.log"), "w", encoding="utf-8") as log:
+            try:
+                code = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=timeout).returncode
+            except subprocess.TimeoutExpired:
+                code = None
+        result = {}
+        if os.path.exists(result_path):
+            with open(result_path, encoding="utf-8") as f:
+                result = json.load(f)
+        label = f"run {i - warmup + 1}/{repeats}" if counted else "warm-up"
+        print(f"  {_replay_name(replay)} {label}: {'ok' if code == 0 else 'FAILED'} "
+              f"({time.monotonic() - start:.1f}s)")
+        if code != 0:
+            # A failed run's latencies (if any) describe a broken app, not a slow one
+            failures.append({"run": i, "exit_code": code, "error": result.get("error"), "artifacts": artifacts})
+            continue
+        if counted:
+            for metric, values in samples_from_result(result).items():
+                samples[metric].extend(values)
+            sort_latencies.extend(result.get("sort_latencies", []))
+    return {
+        "replay": replay,
+        "runs": repeats,
+        "failures": failures,
+        "metrics": {metric: describe(values) for metric, values in samples.items()},
+        "sort_latency": latency.summarize(sort_latencies),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Comparison:
+    replay: str
+    metric: str
+    stat: str
+    current: float
+    baseline: float | None
+
+    @property
+    def change(self) -> float | None:
+        if not self.baseline:
+            return None
+        return self.current / self.baseline - 1
+
+    def regressed(self, threshold: float) -> bool:
+        return (self.baseline is not None
+                and self.current > self.baseline * (1 + threshold)
+                and self.current - self.baseline > MIN_DELTA)
+
+
+def default_baseline(backend: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{backend}.json")
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline_from(results: dict) -> dict:
+    """Per-replay p50/p95/max of a benchmark result, in the baseline file's shape."""
+    return {"replays": {
+        _replay_name(r["replay"]): {
+            metric: {k: m[k] for k in ("p50", "p95", "max")}
+            for metric, m in r["metrics"].items() if m["n"]
+        }
+        for r in results["replays"]
+    }}
+
+
+def save_baseline(path: str, results: dict):
+    """Merge this run's per-replay p50/p95 into the baseline file (other replays are kept)."""
+    stored = load_baseline(path)
+    stored.setdefault("replays", {}).update(baseline_from(results)["replays"])
+    stored["updated"] = results["created"]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, indent=2)
+
+
+def compare(results: dict, baseline: dict) -> list[Comparison]:
+    out = []
+    for r in results["replays"]:
+        base = baseline.get("replays", {}).get(_replay_name(r["replay"]), {})
+        for metric, m in r["metrics"].items():
+            if not m["n"]:
+                continue
+            for stat in ("p50", "p95"):
+                out.append(Comparison(r["replay"], metric, stat, m[stat], base.get(metric, {}).get(stat)))
+    return out
+
+
+def print_report(results: dict, comparisons: list[Comparison], threshold: float):
+    print(f"\n  {'Replay':<28} {'Metric':<11} {'n':>3} {'p50':>8} {'p95':>8} {'max':>8}  vs baseline (p50 / p95)")
+    print(f"  {'-'*28} {'-'*11} {'-'*3} {'-'*8} {'-'*8} {'-'*8}  {'-'*24}")
+    by_key = {(c.replay, c.metric, c.stat): c for c in comparisons}
+    for r in results["replays"]:
+        name = _replay_name(r["replay"])
+        for metric, m in r["metrics"].items():
+            if not m["n"]:
+                print(f"  {name[:28]:<28} {metric:<11} {0:>3} {'-':>8} {'-':>8} {'-':>8}")
+                continue
+            notes = []
+            for stat in ("p50", "p95"):
+                c = by_key.get((r["replay"], metric, stat))
+                if not c or c.change is None:
+                    notes.append("new")
+                else:
+                    notes.append(f"{c.change:+.0%}{' REGRESSED' if c.regressed(threshold) else ''}")
+            print(f"  {name[:28]:<28} {metric:<11} {m['n']:>3} {m['p50']:>7.3f}s {m['p95']:>7.3f}s "
+                  f"{m['max']:>7.3f}s  {' / '.join(notes)}")
+        if r["failures"]:
+            print(f"  {name[:28]:<28} {len(r['failures'])} failed run(s), e.g. {r['failures'][0]['artifacts']}")
+    for r in results["replays"]:
+        latency.print_histograms(r.get("sort_latency", []), title=f"{_replay_name(r['replay'])} sort latency")
+
+
+def run_and_report(replays: list[str], repeats: int, out_dir: str, backend: str,
+                   baseline: str | None = None, threshold: float = DEFAULT_THRESHOLD,
+                   update_baseline: bool = False, result_json: str | None = None,
+                   rebuild: bool = False, harness_args: list[str] | None = None, warmup: int = 1) -> int:
+    """Benchmark every replay, write the results and compare with the baseline. Returns the exit code."""
+    # Build once up front so every harness run finds an up-to-date stamp (the stand-in needs none)
+    if "--fake-app" not in (harness_args or []):
+        built = build.ensure_built(DOTNET, "Debug", force=rebuild)
+        if not built.ok:
+            print(f"BUILD FAILED:\n{built.output}")
+            return 1
+        if "--no-expected" not in (harness_args or []):
+            # Parse each replay once here, not inside the first timed run
+            try:
+                expected.load(replays, expected.debug_replay_exporter(DOTNET))
+            except expected.ExportError as e:
+                print(f"  WARNING: no expected rows: {e}")
+
+    print(f"BotOrNot benchmark: {len(replays)} replay(s) x {repeats} runs (+{warmup} warm-up), {backend}")
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend": backend,
+        "repeats": repeats,
+        "threshold": threshold,
+        "replays": [run_replay(r, repeats, out_dir, backend, harness_args or [], warmup) for r in replays],
+    }
+
+    baseline_path = baseline or default_baseline(backend)
+    comparisons = compare(results, load_baseline(baseline_path))
+    regressions = [c for c in comparisons if c.regressed(threshold)]
+    results["regressions"] = [
+        {"replay": c.replay, "metric": c.metric, "stat": c.stat, "current": c.current, "baseline": c.baseline}
+        for c in regressions
+    ]
+    print_report(results, comparisons, threshold)
+
+    result_path = result_json or os.path.join(out_dir, "benchmark.json")
+    os.makedirs(os.path.dirname(os.path.abspath(result_path)), exist_ok=True)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n  Results: {result_path}")
+
+    failed = any(r["failures"] for r in results["replays"])
+    if update_baseline and not failed:
+        save_baseline(baseline_path, results)
+        print(f"  Baseline updated: {baseline_path}")
+        return 0
+    if failed:
+        print("  BENCHMARK RUNS FAILED (see the harness.log of the failed runs)")
+        return 1
+    if regressions:
+        print(f"  REGRESSION: {len(regressions)} latency figure(s) more than {threshold:.0%} over {baseline_path}")
+        return 2
+    return 0
+
+
+def parse_args(argv=None) -> tuple[argparse.Namespace, list[str]]:
+    """Arguments after `--` are passed through to every run_ui_test.py invocation."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra = []
+    if "--" in argv:
+        cut = argv.index("--")
+        argv, extra = argv[:cut], argv[cut + 1:]
+    parser = argparse.ArgumentParser(description="Benchmark BotOrNot launch, replay-load and sort latency")
+    parser.add_argument("replays", nargs="+", help="replay files to benchmark")
+    parser.add_argument("--repeats", type=int, default=10, help="measured runs per replay")
+    parser.add_argument("--warmup", type=int, default=1, help="uncounted runs before the measured ones")
+    parser.add_argument("--backend", choices=["auto", "quartz", "x11"], default="auto")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="artifact directory for the runs")
+    parser.add_argument("--result-json", default=None, help="results file (default: <out>/benchmark.json)")
+    parser.add_argument("--baseline", default=None, help="baseline file (default: UITests/benchmarks/<backend>.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--rebuild", action="store_true", help="force a build before benchmarking")
+    return parser.parse_args(argv), extra
+
+
+def main(argv=None) -> int:
+    args, extra = parse_args(argv)
+    backend = default_backend_name() if args.backend == "auto" else args.backend
+    replays = [os.path.abspath(r) for r in args.replays]
+    missing = [r for r in replays if not os.path.isfile(r)]
+    if missing:
+        print(f"ERROR: replay file(s) not found: {', '.join(missing)}")
+        return 1
+    return run_and_report(replays, args.repeats, os.path.abspath(args.out), backend,
+                          baseline=args.baseline, threshold=args.threshold,
+                          update_baseline=args.update_baseline, result_json=args.result_json,
+                          rebuild=args.rebuild, harness_args=extra, warmup=args.warmup)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
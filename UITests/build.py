@@ -0,0 +1,126 @@
+"""
+Incremental build for the BotOrNot GUI test harness.
+
+Hashes the inputs that affect the app binary (C# sources, AXAML, project
+files, bundled data and assets of BotOrNot.Core and BotOrNot.Avalonia) and
+skips `dotnet build` when nothing changed since the last successful build.
+Edit-run loops on harness-only changes then start the app in seconds.
+
+DebugReplay, which exports the rows the app would show (expected.py), is
+built the same way from BotOrNot.Core and its own sources; core_hash() is
+the hash of exactly those inputs, so cached exports go stale with them.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import subprocess
+from dataclasses import dataclass
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PROJECT = os.path.join(PROJECT_ROOT, "BotOrNot.Avalonia", "BotOrNot.Avalonia.csproj")
+DEBUG_REPLAY_PROJECT = os.path.join(PROJECT_ROOT, "DebugReplay", "DebugReplay.csproj")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".build-cache")
+
+# Projects whose contents end up in the app binary
+INPUT_DIRS = ["BotOrNot.Core", "BotOrNot.Avalonia"]
+CORE_INPUT_DIRS = ["BotOrNot.Core", "DebugReplay"]   # what DebugReplay's row export is built from
+INPUT_EXTENSIONS = (".cs", ".axaml", ".csproj", ".json", ".png", ".manifest")
+SKIP_DIRS = {"bin", "obj", ".vs", ".idea"}
+
+
+@dataclass
+class BuildResult:
+    ok: bool
+    skipped: bool
+    seconds: float
+    dll: str
+    output: str = ""
+
+
+def input_hash(root: str = PROJECT_ROOT, dirs: list[str] = INPUT_DIRS) -> str:
+    """SHA-256 over the relative path and content of every build input."""
+    digest = hashlib.sha256()
+    for project in dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, project)):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                if not name.endswith(INPUT_EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, name)
+                digest.update(os.path.relpath(path, root).replace(os.sep, "/").encode())
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def core_hash(root: str = PROJECT_ROOT) -> str:
+    """Hash of the BotOrNot.Core and DebugReplay sources: the parse behind a row export."""
+    return input_hash(root, CORE_INPUT_DIRS)
+
+
+def target_framework(csproj: str = APP_PROJECT) -> str:
+    with open(csproj, encoding="utf-8") as f:
+        match = re.search(r"<TargetFramework>([^<]+)</TargetFramework>", f.read())
+    return match.group(1) if match else "net9.0"
+
+
+def app_dll(configuration: str = "Debug") -> str:
+    """Path of the built app assembly (AssemblyName is BotOrNot)."""
+    return os.path.join(PROJECT_ROOT, "BotOrNot.Avalonia", "bin", configuration,
+                        target_framework(), "BotOrNot.dll")
+
+
+def debug_replay_dll(configuration: str = "Debug") -> str:
+    return os.path.join(PROJECT_ROOT, "DebugReplay", "bin", configuration,
+                        target_framework(DEBUG_REPLAY_PROJECT), "DebugReplay.dll")
+
+
+def _stamp_path(configuration: str, name: str = "build") -> str:
+    return os.path.join(CACHE_DIR, f"{name}-{configuration.lower()}.json")
+
+
+def ensure_built(dotnet: str, configuration: str = "Debug", force: bool = False,
+                 timeout: int = 300) -> BuildResult:
+    """Build the app unless the stamped input hash matches and the DLL exists."""
+    return _ensure(dotnet, APP_PROJECT, app_dll(configuration), input_hash, _stamp_path(configuration),
+                   configuration, force, timeout)
+
+
+def ensure_debug_replay(dotnet: str, configuration: str = "Debug", force: bool = False,
+                        timeout: int = 300) -> BuildResult:
+    """Build DebugReplay unless BotOrNot.Core and DebugReplay are unchanged since its last build."""
+    return _ensure(dotnet, DEBUG_REPLAY_PROJECT, debug_replay_dll(configuration), core_hash,
+                   _stamp_path(configuration, "debugreplay"), configuration, force, timeout)
+
+
+def _ensure(dotnet: str, project: str, dll: str, inputs, stamp_path: str, configuration: str,
+            force: bool, timeout: int) -> BuildResult:
+    """Build `project` unless the stamped hash of its inputs (`inputs()`) matches and its DLL exists."""
+    start = time.monotonic()
+    current = inputs()
+
+    if not force and os.path.exists(dll) and os.path.exists(stamp_path):
+        try:
+            with open(stamp_path, encoding="utf-8") as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            stamp = {}
+        if stamp.get("hash") == current:
+            return BuildResult(True, True, time.monotonic() - start, dll)
+
+    build = subprocess.run(
+        [dotnet, "build", project, "--configuration", configuration],
+        capture_output=True, text=True, timeout=timeout,
+    )
+    seconds = time.monotonic() - start
+    output = f"{build.stdout[-2000:]}\n{build.stderr[-2000:]}"
+    if build.returncode != 0 or not os.path.exists(dll):
+        return BuildResult(False, False, seconds, dll, output)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        json.dump({"hash": current, "dll": dll, "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=2)
+    return BuildResult(True, False, seconds, dll, output)
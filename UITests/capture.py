@@ -0,0 +1,296 @@
+"""
+In-process screen capture for the BotOrNot GUI test harness.
+
+Backends return Frame objects (raw BGRX pixels of a screen region) from
+grab_frame(). On X11 the pixels come through the MIT-SHM extension into a
+shared-memory buffer that is reused between grabs, so a capture is a single
+XShmGetImage call with no process spawn and no copy through the X socket.
+Each thread grabs into buffers of its own, so the recorder's sampler never
+overwrites a frame the main thread is still reading. A caller that keeps
+several frames (latency.py) gets buffers it owns from frame_buffer() and
+captures into them with grab_into().
+
+PNG encoding is handed to ScreenshotWriter's thread pool, so the test flow
+never blocks on compression or disk I/O.
+"""
+
+import os
+import time
+import ctypes
+import ctypes.util
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+
+@dataclass
+class Frame:
+    """Raw pixels of a screen region. data is BGRX, `stride` bytes per row."""
+    width: int
+    height: int
+    stride: int
+    data: bytes | bytearray | memoryview
+    region: tuple[int, int, int, int]   # screen coordinates the frame was grabbed from
+    timestamp: float                     # time.monotonic() at grab
+
+    def copy(self) -> "Frame":
+        """Detach from a reusable capture buffer (needed before keeping it past the next grab)."""
+        if isinstance(self.data, bytes):
+            return self   # already owns its pixels
+        return Frame(self.width, self.height, self.stride, bytes(self.data), self.region, self.timestamp)
+
+    def crop(self, region: tuple[int, int, int, int]) -> "Frame":
+        """Sub-frame for a screen region inside this frame's region (copies the rows)."""
+        fx, fy, fw, fh = self.region
+        sx, sy = self.width / fw, self.height / fh   # >1 on Retina displays
+        x, y, w, h = region
+        left = max(0, int((x - fx) * sx))
+        top = max(0, int((y - fy) * sy))
+        right = min(self.width, int((x + w - fx) * sx))
+        bottom = min(self.height, int((y + h - fy) * sy))
+        view = memoryview(self.data)
+        rows = b"".join(view[r * self.stride + left * 4: r * self.stride + right * 4]
+                        for r in range(top, bottom))
+        return Frame(right - left, bottom - top, (right - left) * 4, rows, region, self.timestamp)
+
+
+_libc = ctypes.CDLL(None)
+_libc.memcmp.restype = ctypes.c_int
+_libc.memcmp.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+
+
+def same_pixels(a, b) -> bool:
+    """
+    Byte equality of two writable frame buffers (bytearray or a view of one
+    from grab_into()). memoryview == compares item by item, which costs
+    milliseconds per frame; memcmp keeps it well under one.
+    """
+    n = len(a)
+    if n != len(b):
+        return False
+    return _libc.memcmp((ctypes.c_char * n).from_buffer(a), (ctypes.c_char * n).from_buffer(b), n) == 0
+
+
+# ---------------------------------------------------------------------------
+# X11 MIT-SHM grabber (ctypes; no compiled dependencies)
+# ---------------------------------------------------------------------------
+
+class _XImage(ctypes.Structure):
+    # Only the leading fields we read; the struct is always allocated by Xlib
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+_ZPIXMAP = 2
+_ALL_PLANES = 0xFFFFFFFF
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+
+class ShmBuffer:
+    """A shared-memory image owned by one caller; XShmGrabber.grab_into() fills it in place."""
+
+    def __init__(self, image, info, buffer, width: int, height: int):
+        self.image = image
+        self.info = info
+        self.width = width
+        self.height = height
+        self.stride = image.contents.bytes_per_line
+        self.data = memoryview(buffer).cast("B")
+
+
+class XShmGrabber:
+    """
+    Grabs screen regions through MIT-SHM. One shared-memory image is kept per
+    thread and region size and reused, so repeated grabs of the same region
+    (waits, screenshots of the app window) set up nothing new and copy
+    nothing. A grabbed frame is valid until the same thread grabs a region of
+    the same size again; Frame.copy() keeps it longer.
+    """
+
+    def __init__(self, display_name: str):
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise OSError("libX11/libXext not found")
+        self._x11 = ctypes.CDLL(x11_path)
+        self._xext = ctypes.CDLL(xext_path)
+        self._libc = ctypes.CDLL(None, use_errno=True)
+
+        self._x11.XOpenDisplay.restype = ctypes.c_void_p
+        self._x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self._x11.XRootWindow.restype = ctypes.c_ulong
+        self._x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._x11.XDefaultVisual.restype = ctypes.c_void_p
+        self._x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self._xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        self._xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        self._xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+            ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+        ]
+        self._xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self._xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self._xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+        ]
+        self._x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        self._libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        self._libc.shmat.restype = ctypes.c_void_p
+        self._libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self._libc.shmdt.argtypes = [ctypes.c_void_p]
+        self._libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        self._dpy = self._x11.XOpenDisplay(display_name.encode())
+        if not self._dpy:
+            raise OSError(f"cannot open display {display_name}")
+        if not self._xext.XShmQueryExtension(self._dpy):
+            self._x11.XCloseDisplay(self._dpy)
+            raise OSError("X server has no MIT-SHM extension")
+        screen = self._x11.XDefaultScreen(self._dpy)
+        self._root = self._x11.XRootWindow(self._dpy, screen)
+        self._visual = self._x11.XDefaultVisual(self._dpy, screen)
+        self._depth = self._x11.XDefaultDepth(self._dpy, screen)
+        self._images = {}   # (thread id, w, h) -> (image, seginfo, buffer)
+        self._owned = []    # ShmBuffers handed out by buffer()
+        self._lock = threading.Lock()
+
+    def _image(self, w: int, h: int):
+        key = (threading.get_ident(), w, h)
+        if key not in self._images:
+            self._images[key] = self._create(w, h)
+        return self._images[key]
+
+    def _create(self, w: int, h: int):
+        info = _XShmSegmentInfo()
+        image = self._xext.XShmCreateImage(self._dpy, self._visual, self._depth, _ZPIXMAP, None,
+                                           ctypes.byref(info), w, h)
+        if not image:
+            raise OSError("XShmCreateImage failed")
+        size = image.contents.bytes_per_line * h
+        info.shmid = self._libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if info.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        info.shmaddr = self._libc.shmat(info.shmid, None, 0)
+        image.contents.data = info.shmaddr
+        info.readOnly = 0
+        self._xext.XShmAttach(self._dpy, ctypes.byref(info))
+        self._x11.XSync(self._dpy, 0)
+        # Segment is freed automatically once both sides detach
+        self._libc.shmctl(info.shmid, _IPC_RMID, None)
+        buffer = (ctypes.c_char * size).from_address(info.shmaddr)
+        return image, info, buffer
+
+    def grab(self, region: tuple[int, int, int, int]) -> Frame:
+        """Grab region into the calling thread's shared-memory image for its size (no copy)."""
+        x, y, w, h = region
+        with self._lock:
+            image, _info, buffer = self._image(w, h)
+            if not self._xext.XShmGetImage(self._dpy, self._root, image, x, y, _ALL_PLANES):
+                raise OSError("XShmGetImage failed")
+            data = memoryview(buffer).cast("B")
+            return Frame(w, h, image.contents.bytes_per_line, data, region, time.monotonic())
+
+    def buffer(self, w: int, h: int) -> ShmBuffer:
+        """A new shared-memory image for grab_into(), freed by close()."""
+        with self._lock:
+            target = ShmBuffer(*self._create(w, h), w, h)
+            self._owned.append(target)
+            return target
+
+    def release(self, target: ShmBuffer):
+        """Free a buffer from buffer() before close()."""
+        with self._lock:
+            if target in self._owned:
+                self._owned.remove(target)
+                self._free(target.image, target.info)
+
+    def _free(self, image, info):
+        self._xext.XShmDetach(self._dpy, ctypes.byref(info))
+        self._x11.XDestroyImage(image)
+        self._libc.shmdt(info.shmaddr)
+
+    def grab_into(self, region: tuple[int, int, int, int], target: ShmBuffer) -> Frame:
+        """Grab region into `target` (sized for it by buffer()); the frame is a view of target."""
+        x, y, w, h = region
+        with self._lock:
+            if not self._xext.XShmGetImage(self._dpy, self._root, target.image, x, y, _ALL_PLANES):
+                raise OSError("XShmGetImage failed")
+            return Frame(w, h, target.stride, target.data, region, time.monotonic())
+
+    def close(self):
+        with self._lock:
+            for image, info, _buffer in self._images.values():
+                self._free(image, info)
+            for target in self._owned:
+                self._free(target.image, target.info)
+            self._images.clear()
+            self._owned.clear()
+            if self._dpy:
+                self._x11.XCloseDisplay(self._dpy)
+                self._dpy = None
+
+
+# ---------------------------------------------------------------------------
+# Background PNG encoding
+# ---------------------------------------------------------------------------
+
+def encode_png(frame: Frame, path: str, compress_level: int = 1):
+    from PIL import Image
+    image = Image.frombuffer("RGB", (frame.width, frame.height), frame.data, "raw", "BGRX", frame.stride, 1)
+    image.save(path, compress_level=compress_level)
+
+
+class ScreenshotWriter:
+    """Encodes frames to PNG on a small thread pool. Call flush() before reading the files."""
+
+    def __init__(self, workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="png")
+        self._pending = []
+        self.written = 0
+        self.failed = []
+
+    def submit(self, frame: Frame, path: str):
+        self._pending.append((path, self._pool.submit(encode_png, frame.copy(), path)))
+
+    def flush(self) -> list[str]:
+        """Wait for queued writes. Returns the paths that failed (also kept in self.failed)."""
+        pending, self._pending = self._pending, []
+        for path, future in pending:
+            try:
+                future.result()
+                self.written += 1
+            except Exception as e:
+                print(f"  [screenshot] FAILED to write {os.path.basename(path)}: {e}")
+                self.failed.append(path)
+        return [p for p, _ in pending if p in self.failed]
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
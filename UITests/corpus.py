@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+BotOrNot corpus runner
+
+Runs the GUI harness (run_ui_test.py) over many replay files in parallel.
+Each worker owns its own Xvfb display and runs one harness process per
+replay, so every run gets its own app process, artifact directory and step
+counter. Results are merged into <out>/summary.json.
+
+On macOS there is only one real screen, so the Quartz backend always runs
+with a single worker.
+
+With --warm each worker instead starts one app and loads its whole share of
+the replays into it (run_ui_test.py's warm session), so .NET/Avalonia start-up
+is paid once per worker rather than once per replay.
+
+Usage:
+    python3 UITests/corpus.py path/to/replays/ [more.replay ...] [--workers N]
+                              [--out DIR] [--timeout SECONDS] [--warm] [--list]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import subprocess
+
+import build
+import expected
+from backends import VirtualDisplay, default_backend_name
+
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+HARNESS = os.path.join(UITESTS_DIR, "run_ui_test.py")
+DEFAULT_OUT = os.path.join(UITESTS_DIR, "corpus-results")
+DOTNET = os.path.expanduser("~/.dotnet/dotnet")
+DISPLAY_BASE = 100  # worker i uses display :(DISPLAY_BASE + i)
+
+
+def discover(paths: list[str]) -> list[str]:
+    """Expand files and directories (searched recursively) into a sorted list of .replay files."""
+    found = set()
+    for p in paths:
+        p = os.path.abspath(p)
+        if os.path.isdir(p):
+            for dirpath, _dirs, files in os.walk(p):
+                found.update(os.path.join(dirpath, f) for f in files if f.lower().endswith(".replay"))
+        elif os.path.isfile(p):
+            found.add(p)
+        else:
+            print(f"  WARNING: skipping missing path {p}")
+    # Biggest replays first so a slow straggler doesn't start last
+    return sorted(found, key=lambda f: (-os.path.getsize(f), f))
+
+
+def _slug(replay: str, index: int) -> str:
+    name = os.path.splitext(os.path.basename(replay))[0]
+    return f"{index:04d}_{re.sub(r'[^A-Za-z0-9._-]+', '_', name)[:80]}"
+
+
+class Worker(threading.Thread):
+    """Pulls replays off a shared queue and runs the harness for each on its own display."""
+
+    def __init__(self, index: int, jobs: queue.Queue, results: list, lock: threading.Lock,
+                 backend: str, out_dir: str, timeout: int, extra_args: list[str], warm: bool = False):
+        super().__init__(name=f"corpus-worker-{index}", daemon=True)
+        self.index = index
+        self.jobs = jobs
+        self.results = results
+        self.lock = lock
+        self.backend = backend
+        self.out_dir = out_dir
+        self.timeout = timeout
+        self.extra_args = extra_args
+        self.warm = warm   # jobs is this worker's own queue, run as one warm session
+
+    def run(self):
+        display = None
+        try:
+            if self.backend == "x11":
+                display = VirtualDisplay(DISPLAY_BASE + self.index).start()
+            if self.warm:
+                batch = []
+                while not self.jobs.empty():
+                    batch.append(self.jobs.get_nowait())
+                for result in self._run_session(batch, display):
+                    self._report(result)
+                return
+            while True:
+                try:
+                    index, replay = self.jobs.get_nowait()
+                except queue.Empty:
+                    return
+                self._report(self._run_one(index, replay, display))
+        finally:
+            if display:
+                display.stop()
+
+    def _report(self, result: dict):
+        with self.lock:
+            self.results.append(result)
+            done = len(self.results)
+        print(f"  [{done}] worker {self.index}: {result['status'].upper():<7} "
+              f"{result['seconds']:6.1f}s  {os.path.basename(result['replay'])}")
+
+    def _run_harness(self, replays: list[str], artifacts: str, display, timeout: int,
+                     extra: list[str]) -> tuple[int | None, dict, float]:
+        """Run run_ui_test.py once; returns (exit code or None on timeout, result JSON, seconds)."""
+        os.makedirs(artifacts, exist_ok=True)
+        result_path = os.path.join(artifacts, "result.json")
+        cmd = [sys.executable, HARNESS, *replays, "--backend", self.backend,
+               "--artifacts", artifacts, "--result-json", result_path] + extra + self.extra_args
+        if display:
+            cmd += ["--display", display.name]
+
+        start = time.monotonic()
+        with open(os.path.join(artifacts, "harness.log"), "w", encoding="utf-8") as log:
+            try:
+                proc = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+                exit_code = proc.returncode
+            except subprocess.TimeoutExpired:
+                exit_code = None
+        seconds = time.monotonic() - start
+
+        result = {}
+        if os.path.exists(result_path):
+            with open(result_path, encoding="utf-8") as f:
+                result = json.load(f)
+        return exit_code, result, seconds
+
+    def _run_session(self, batch: list[tuple[int, str]], display) -> list[dict]:
+        """Run the worker's replays through one warm harness session; one result per replay."""
+        if not batch:
+            return []
+        artifacts = os.path.join(self.out_dir, f"worker-{self.index:02d}-session")
+        replays = [replay for _index, replay in batch]
+        timeout = self.timeout * len(replays)
+        exit_code, session, _seconds = self._run_harness(replays, artifacts, display, timeout, ["--warm"])
+
+        by_replay = {r["replay"]: r for r in session.get("session", [])}
+        results = []
+        for replay in replays:
+            result = {"replay": replay}
+            if replay in by_replay:
+                result.update(by_replay[replay])
+            else:
+                # The session ended before reaching this replay
+                error = session.get("error") or ("harness timed out" if exit_code is None else "not reached")
+                result.update(status="timeout" if exit_code is None else "fail", error=error, seconds=0.0)
+            result.update(artifacts=artifacts, worker=self.index, exit_code=exit_code,
+                          launch_seconds=session.get("launch_seconds"))
+            results.append(result)
+        return results
+
+    def _run_one(self, index: int, replay: str, display) -> dict:
+        artifacts = os.path.join(self.out_dir, _slug(replay, index))
+        exit_code, harness_result, seconds = self._run_harness([replay], artifacts, display, self.timeout, [])
+
+        result = {"replay": replay}
+        result.update(harness_result)
+        if exit_code is None:
+            result.update(status="timeout", error=f"harness exceeded {self.timeout}s")
+        result.setdefault("status", "fail" if exit_code else "pass")
+        result.setdefault("artifacts", artifacts)
+        result.update(worker=self.index, seconds=round(seconds, 2), exit_code=exit_code)
+        return result
+
+
+def run_corpus(replays: list[str], workers: int, out_dir: str, backend: str,
+               timeout: int, extra_args: list[str], warm: bool = False) -> dict:
+    count = min(workers, len(replays))
+    if warm:
+        # Fixed shares, dealt round-robin from the biggest replay down so they even out
+        queues = [queue.Queue() for _ in range(count)]
+        for i, replay in enumerate(replays):
+            queues[i % count].put((i, replay))
+    else:
+        jobs = queue.Queue()
+        for i, replay in enumerate(replays):
+            jobs.put((i, replay))
+        queues = [jobs] * count
+
+    results, lock = [], threading.Lock()
+    start = time.monotonic()
+    pool = [Worker(i, queues[i], results, lock, backend, out_dir, timeout, extra_args, warm)
+            for i in range(count)]
+    for w in pool:
+        w.start()
+    for w in pool:
+        w.join()
+    wall = time.monotonic() - start
+
+    results.sort(key=lambda r: r["replay"])
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    serial = sum(r["seconds"] for r in results)
+    return {
+        "replays": len(replays),
+        "workers": len(pool),
+        "backend": backend,
+        "warm": warm,
+        "wall_seconds": round(wall, 2),
+        "serial_seconds": round(serial, 2),
+        "speedup": round(serial / wall, 2) if wall else None,
+        "counts": counts,
+        "results": results,
+    }
+
+
+def print_summary(summary: dict):
+    print(f"\n{'='*60}")
+    mode = ", warm sessions" if summary.get("warm") else ""
+    print(f"  Corpus: {summary['replays']} replays, {summary['workers']} workers ({summary['backend']}{mode})")
+    print(f"{'='*60}")
+    for r in summary["results"]:
+        detail = r.get("error") or (f"{r['rows']} rows" if "rows" in r else "")
+        print(f"  {r['status'].upper():<7} {r['seconds']:7.1f}s  {os.path.basename(r['replay'])}  {detail}")
+    counts = ", ".join(f"{k}={v}" for k, v in sorted(summary["counts"].items()))
+    print(f"\n  {counts}")
+    print(f"  Wall clock {summary['wall_seconds']:.1f}s vs {summary['serial_seconds']:.1f}s serial "
+          f"(x{summary['speedup']})")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the BotOrNot GUI harness over a replay corpus")
+    parser.add_argument("paths", nargs="+", help="replay files and/or directories to search")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="parallel workers, one Xvfb display each (default: half the cores)")
+    parser.add_argument("--backend", choices=["auto", "quartz", "x11"], default="auto")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="results directory")
+    parser.add_argument("--timeout", type=int, default=600, help="seconds allowed per replay")
+    parser.add_argument("--warm", action="store_true",
+                        help="one app per worker, loading its replays one after another")
+    parser.add_argument("--list", action="store_true",
+                        help="print the replays that would run, biggest first, and exit without building")
+    return parser.parse_args(argv)
+
+
+def parse_args_with_passthrough(argv=None):
+    """Arguments after `--` are passed through to every run_ui_test.py invocation."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra = []
+    if "--" in argv:
+        cut = argv.index("--")
+        argv, extra = argv[:cut], argv[cut + 1:]
+    return parse_args(argv), extra
+
+
+def prefetch_expected(replays: list[str], workers: int, extra: list[str]):
+    """Export the rows of every uncached replay up front, so no worker parses or builds DebugReplay."""
+    if "--no-expected" in extra:
+        return
+    start = time.monotonic()
+    try:
+        grids = expected.load(replays, expected.debug_replay_exporter(DOTNET), workers=workers)
+    except expected.ExportError as e:
+        print(f"  WARNING: no expected rows: {e}")
+        return
+    exported = sum(g.source != "cache" for g in grids.values())
+    print(f"  Expected rows for {len(grids)}/{len(replays)} replays ({exported} exported, "
+          f"{len(grids) - exported} cached) in {time.monotonic() - start:.1f}s")
+
+
+def main(argv=None) -> int:
+    args, extra = parse_args_with_passthrough(argv)
+    backend = default_backend_name() if args.backend == "auto" else args.backend
+    workers = args.workers
+    if backend == "quartz" and workers > 1:
+        print("  Quartz backend drives the one real screen; using 1 worker")
+        workers = 1
+
+    replays = discover(args.paths)
+    if not replays:
+        print("ERROR: no .replay files found")
+        return 1
+    if args.list:
+        for replay in replays:
+            print(f"  {os.path.getsize(replay) / 1024:>9.0f} KB  {replay}")
+        print(f"  {len(replays)} replays")
+        return 0
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Build once up front so the workers all find an up-to-date stamp (the stand-in needs none)
+    if "--fake-app" not in extra:
+        result = build.ensure_built(DOTNET, "Debug")
+        if not result.ok:
+            print(f"BUILD FAILED:\n{result.output}")
+            return 1
+        prefetch_expected(replays, workers, extra)
+
+    print(f"BotOrNot corpus run: {len(replays)} replays, {workers} workers → {out_dir}")
+    summary = run_corpus(replays, workers, out_dir, backend, args.timeout, extra, warm=args.warm)
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print_summary(summary)
+    return 0 if summary["counts"].get("pass", 0) == len(replays) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Expected PlayersGrid contents for the BotOrNot GUI test harness.
+
+The ground truth is DebugReplay --dump-rows: it parses a replay with the
+app's own ReplayService and writes its PlayerRows as JSON. Parsing a
+multi-megabyte replay takes seconds, so every export is cached in
+UITests/.expected-cache/ under the SHA-256 of the replay's content and the
+hash of the sources the export was built from (build.core_hash():
+BotOrNot.Core and DebugReplay). Corpus, benchmark and soak passes over the
+same replays read the cache and parse nothing. With --fake-app the stand-in
+exports its generated rows the same way (fakeapp.py --dump-rows).
+
+The export also carries, per sortable column, the modes successive header
+clicks go through and where the key changes in each mode's order, computed
+with the app's own PlayerRowSortComparer; a change to the comparer changes
+the expected order with it. The oracle only sees the grid as per-row pixel
+hashes (oracle.py), so the comparison is on those run starts: for the rows
+on screen, a new key must start exactly where the export says one does.
+Run lengths catch rows sorted into the wrong group, a wrong direction and a
+wrong row count, which the oracle's invariants alone can't. Unknown values ("", "unknown") tie in the comparer
+but render differently, so changes inside the unknown block aren't
+compared; for text columns a change that is expected but not seen is
+allowed (two long names truncated alike).
+
+Usage:
+    grids = expected.load(replays, expected.debug_replay_exporter(DOTNET))
+    expected.check(oracle_result, grids[replay], "Kills", states, modes)
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import hashlib
+import functools
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import build
+
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(UITESTS_DIR, ".expected-cache")
+FORMAT = 2              # DumpPlayerRows.Format; exports of another format are ignored
+EXPORT_TIMEOUT = 300
+
+# Header → (PlayerRow field as exported, numeric, bot) as in MainWindow.GetColumnSortInfo.
+# Platform and Death Cause cycle through groups (GroupCycleComparer) and aren't modelled.
+COLUMNS = {
+    "Id": ("id", False, False),
+    "Name": ("name", False, False),
+    "Level": ("level", True, False),
+    "Bot": ("bot", False, True),
+    "Kills": ("kills", True, False),
+    "Squad": ("teamIndex", True, False),
+    "Place": ("placement", True, False),
+    "Elim Time": ("elimTime", True, False),
+    "Pickaxe": ("pickaxe", False, False),
+    "Glider": ("glider", False, False),
+}
+
+
+class ExportError(Exception):
+    """A replay's rows could not be exported."""
+
+
+# ---------------------------------------------------------------------------
+# PlayerRowSortComparer, for the stand-in app (fakeapp.py)
+# ---------------------------------------------------------------------------
+
+def unknown(value: str | None) -> bool:
+    """PlayerRowSortComparer.IsUnknownOrEmpty."""
+    return not value or value.lower() == "unknown"
+
+
+def _int(value: str) -> int | None:
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
+
+
+def compare(a: str | None, b: str | None, numeric: bool, bot: bool, descending: bool,
+            unknowns_first: bool) -> int:
+    """PlayerRowSortComparer.Compare on two cell values."""
+    ua, ub = unknown(a), unknown(b)
+    if ua or ub:
+        if ua and ub:
+            return 0
+        return (-1 if ua else 1) if unknowns_first else (1 if ua else -1)
+    if bot:
+        rank = {"true": 0, "false": 1}
+        ra, rb = rank.get(a.lower(), 2), rank.get(b.lower(), 2)
+        result = (ra > rb) - (ra < rb)
+    elif numeric and (_int(a) is not None or _int(b) is not None):
+        ia, ib = _int(a), _int(b)
+        result = (ia > ib) - (ia < ib) if ia is not None and ib is not None else (-1 if ia is not None else 1)
+    else:
+        # StringComparison.OrdinalIgnoreCase compares upper-cased characters
+        ka, kb = a.upper(), b.upper()
+        result = (ka > kb) - (ka < kb)
+    return -result if descending else result
+
+
+def sorts(rows: list[dict]) -> dict:
+    """DumpPlayerRows' "sorts" block computed with compare(), for the stand-in's exports."""
+    out = {}
+    for column, (key, numeric, bot) in COLUMNS.items():
+        unknowns = sum(unknown(r.get(key)) for r in rows)
+        modes = []
+        for mode in ([1, 2, 0] if (numeric or bot) and unknowns else [1, 0]):
+            def cmp(a, b):
+                return compare(a.get(key), b.get(key), numeric, bot,
+                               descending=mode == 0, unknowns_first=mode == 2)
+            ordered = sorted(rows, key=functools.cmp_to_key(cmp))
+            modes.append({"mode": mode, "starts": [i for i in range(1, len(ordered))
+                                                   if cmp(ordered[i - 1], ordered[i]) != 0]})
+        out[column] = {"unknowns": unknowns, "modes": modes}
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Export and cache
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Exporter:
+    """How to export a replay's rows: `command(replay, out)` writes the JSON to `out`."""
+    name: str
+    identity: str            # hash of what the export depends on besides the replay
+    command: object
+    prepare: object = None   # called once before the first export (e.g. a build); may raise ExportError
+
+
+def debug_replay_exporter(dotnet: str) -> Exporter:
+    """DebugReplay --dump-rows, built on first use like the app (build.py)."""
+    def prepare():
+        with_build = build.ensure_debug_replay(dotnet)
+        if not with_build.ok:
+            raise ExportError(f"DebugReplay build failed:\n{with_build.output}")
+
+    dll = build.debug_replay_dll()
+    return Exporter("DebugReplay", build.core_hash(), lambda replay, out: [dotnet, dll, "--dump-rows", replay, out],
+                    prepare)
+
+
+def fake_exporter(fake_args: str) -> Exporter:
+    """fakeapp.py --dump-rows with the stand-in's own options (its --rows and --seed decide the rows)."""
+    fake = os.path.join(UITESTS_DIR, "fakeapp.py")
+    digest = hashlib.sha256(fake_args.encode())
+    with open(fake, "rb") as f:
+        digest.update(f.read())
+    return Exporter("fakeapp", digest.hexdigest(),
+                    lambda replay, out: [sys.executable, fake, "--dump-rows", out, *shlex.split(fake_args), replay])
+
+
+@dataclass
+class ExpectedGrid:
+    replay: str
+    players: list[dict]
+    owner_eliminations: list[dict] = field(default_factory=list)
+    sorts: dict = field(default_factory=dict)   # header → {unknowns, modes: [{mode, starts}]} as exported
+    source: str = "cache"    # "cache" or the exporter's name
+    seconds: float = 0.0     # hashing plus export (or cache read)
+
+    @property
+    def count(self) -> int:
+        return len(self.players)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(replay: str, exporter: Exporter, cache_dir: str = CACHE_DIR) -> str:
+    return os.path.join(cache_dir, f"{file_hash(replay)[:16]}-{exporter.identity[:12]}.json")
+
+
+def _read(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    ok = data.get("format") == FORMAT and isinstance(data.get("players"), list) and isinstance(data.get("sorts"), dict)
+    return data if ok else None
+
+
+def load_one(replay: str, exporter: Exporter, cache_dir: str = CACHE_DIR) -> ExpectedGrid:
+    """Cached rows of one replay, exporting them on a miss. Raises ExportError."""
+    start = time.monotonic()
+    path = cache_path(replay, exporter, cache_dir)
+    data = _read(path)
+    source = "cache"
+    if data is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Export next to the cache file and rename, so parallel harness runs never read half a file
+        partial = f"{path}.{os.getpid()}.tmp"
+        try:
+            done = subprocess.run(exporter.command(replay, partial), capture_output=True, text=True,
+                                  timeout=EXPORT_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ExportError(f"{exporter.name} export of {os.path.basename(replay)} failed: {e}") from e
+        data = _read(partial) if done.returncode == 0 else None
+        if data is None:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise ExportError(f"{exporter.name} export of {os.path.basename(replay)} failed "
+                              f"(exit {done.returncode}): {(done.stderr or done.stdout)[-500:].strip()}")
+        os.replace(partial, path)
+        source = exporter.name
+    return ExpectedGrid(replay, data["players"], data.get("ownerEliminations") or [], data["sorts"], source,
+                        time.monotonic() - start)
+
+
+def load(replays: list[str], exporter: Exporter, workers: int = 1,
+         cache_dir: str = CACHE_DIR) -> dict[str, ExpectedGrid]:
+    """
+    Expected rows per replay path, from the cache or exported `workers` at a
+    time. Replays whose export fails are left out with a warning; an exporter
+    that can't be prepared raises ExportError.
+    """
+    todo = list(dict.fromkeys(replays))
+    misses = [r for r in todo if _read(cache_path(r, exporter, cache_dir)) is None]
+    if misses and exporter.prepare:
+        exporter.prepare()
+
+    def one(replay: str) -> ExpectedGrid | None:
+        try:
+            return load_one(replay, exporter, cache_dir)
+        except ExportError as e:
+            print(f"  WARNING: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        grids = dict(zip(todo, pool.map(one, todo)))
+    return {replay: grid for replay, grid in grids.items() if grid}
+
+
+def print_summary(grids: dict[str, ExpectedGrid]):
+    for grid in grids.values():
+        print(f"  Expected rows: {os.path.basename(grid.replay)}: {grid.count} players "
+              f"({'cached' if grid.source == 'cache' else 'exported by ' + grid.source}, {grid.seconds:.2f}s)")
+
+
+# ---------------------------------------------------------------------------
+# Comparing with the rendered grid
+# ---------------------------------------------------------------------------
+
+def _starts(keys: list) -> set[int]:
+    """Positions where a new run of equal keys begins (the first row excluded)."""
+    return {i for i in range(1, len(keys)) if keys[i] != keys[i - 1]}
+
+
+def mode_cycle(truth: ExpectedGrid, column: str) -> list[int]:
+    """The modes successive clicks on `column` produce: 1=asc, [2=unknowns-first,] 0=desc."""
+    return [m["mode"] for m in truth.sorts[column]["modes"]]
+
+
+def expected_starts(truth: ExpectedGrid, column: str, mode: int) -> tuple[set[int], range]:
+    """Run starts of the exported order for `mode` and the positions of the unknown block."""
+    column_sorts = truth.sorts[column]
+    starts = next(m["starts"] for m in column_sorts["modes"] if m["mode"] == mode)
+    unknowns = column_sorts["unknowns"]
+    block = range(0, unknowns) if mode == 2 else range(truth.count - unknowns, truth.count)
+    return set(starts), block
+
+
+def compare_runs(truth: ExpectedGrid, column: str, mode: int, key_hashes: list[int]) -> tuple[bool, str]:
+    """Run starts of the rendered key cells against the exported order, over the rows on screen."""
+    _key, numeric, bot = COLUMNS[column]
+    want, block = expected_starts(truth, column, mode)
+    shown = len(key_hashes)
+    # Inside the unknown block anything goes; its edges still have to line up
+    inside = {i for i in block if i != block.start}
+    want = {i for i in want if i < shown and i not in inside}
+    seen = {i for i in _starts(key_hashes) if i not in inside}
+    extra, missing = sorted(seen - want), sorted(want - seen)
+    ok = not extra and (not missing or not (numeric or bot))
+    detail = f"{shown} rows compared, {len(want)} key changes expected"
+    if extra:
+        detail += f"; unexpected change at row {', '.join(str(i + 1) for i in extra[:5])}"
+    if missing and (numeric or bot):
+        detail += f"; no change at row {', '.join(str(i + 1) for i in missing[:5])}"
+    return ok, detail
+
+
+def check(result, truth: ExpectedGrid, column: str, states: list, modes: list[int]):
+    """
+    Add the expected-grid findings for one column to its oracle.OracleResult:
+    the mode cycle, and per clicked state (mode name, oracle.GridRows) the
+    row count and where the key changes.
+    """
+    if column not in truth.sorts:
+        return
+    cycle = mode_cycle(truth, column)
+    result.add("mode cycle as parsed", modes == cycle, f"app {modes}, parsed rows give {cycle}")
+    for (direction, rows), mode in zip(states, modes):
+        if not rows.key_hashes:
+            continue
+        if rows.complete:
+            result.add(f"{direction}: row count as parsed", len(rows.key_hashes) == truth.count,
+                       f"{len(rows.key_hashes)} rows on screen, {truth.count} parsed")
+        if mode not in cycle:
+            result.add(f"{direction}: key runs as parsed", False, f"mode {mode} is not in the parsed cycle {cycle}")
+            continue
+        ok, detail = compare_runs(truth, column, mode, rows.key_hashes)
+        result.add(f"{direction}: key runs as parsed", ok, detail)
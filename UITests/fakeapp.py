@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Stand-in BotOrNot window for self-tests of the GUI test harness.
+
+A tkinter window that looks to the harness like the real app: the same
+title, the same "Select Replay File" button position, both DataGrids drawn
+where layout.py puts them (from MainWindow.axaml), and the same status
+lines on stdout (applog.py). It takes the same command line as the app
+(a replay path or --replay PATH, --commands for the stdin command channel),
+so run_ui_test.py --fake-app drives it exactly like the real app without
+dotnet, a build or a replay parse.
+
+Rows are generated, not parsed: the same replay file name and --seed always
+give the same players. --dump-rows OUT writes them in DebugReplay
+--dump-rows' JSON format and exits, so the expected-grid check (expected.py)
+works against the stand-in too. Sorting follows PlayerRowSortComparer
+(expected.compare) and MainWindow's mode cycle (1=asc, 2=unknowns-first when
+the column has unknowns, 0=desc); every column sorts as a plain text or
+numeric column.
+
+Delays and faults make the harness's slow paths reproducible:
+
+    --startup-delay S   seconds before the window opens
+    --load-delay S      seconds from "replay loading" to "replay loaded"
+    --sort-delay S      seconds from a header click to the re-sorted grid
+    --fault slow-load   add --slow-load-seconds to every load
+    --fault new-window  replace the window (new window ID) after the file dialog
+    --fault bad-sort    render every descending sort with its top row moved to the bottom
+
+Usage:
+    python3 UITests/fakeapp.py [replay] [--commands] [--rows 98] [--seed 0] [delays] [--fault F ...]
+    python3 UITests/fakeapp.py --dump-rows rows.json [--rows 98] [--seed 0] replay
+    python3 UITests/run_ui_test.py --fake-app [--fake-args "--fault bad-sort"] [replay ...]
+"""
+
+import os
+import sys
+import json
+import queue
+import random
+import argparse
+import functools
+import threading
+
+import layout
+import expected
+from expected import compare, unknown
+
+FAULTS = ("slow-load", "new-window", "bad-sort")
+TITLE = "Bot or Not? vfake"
+ROW_HEIGHT = 28
+BUTTON = (48, 8, 248, 40)       # "Select Replay File" in client coordinates: after the 32px logo, 8px apart
+
+# Light Fluent theme, close enough for layout.confirm() and the sort oracle
+BACKGROUND = "#ffffff"
+HEADER_BACKGROUND = "#f3f3f3"
+SEPARATOR = "#a0a0a0"
+GRID_LINE = "#e0e0e0"
+BOT_ROW = "#ffe4e1"
+TEXT = "#1b1b1b"
+HINT = "#767676"
+
+# Header → (PlayerRow field as DebugReplay exports it, numeric, bot) as in MainWindow.GetColumnSortInfo,
+# with the group-cycle columns sorted as plain text
+COLUMNS = {**expected.COLUMNS, "Platform": ("platform", False, False), "Death Cause": ("deathCause", False, False)}
+
+PLATFORMS = ("WIN", "PSN", "XBL", "SWT", "IOS", "AND")
+DEATH_CAUSES = ("Shotgun", "Assault Rifle", "SMG", "Sniper", "Storm", "Fall", "Explosion")
+SYLLABLES = ("ka", "zu", "mi", "ro", "te", "vex", "lo", "ny", "qua", "sh", "ar", "dor", "fi", "gle")
+
+
+def status(event: str, detail: str | None = None):
+    """One StatusLog line ("[BotOrNot] event: detail"), flushed at once like the app's."""
+    print(f"[BotOrNot] {event}{': ' + detail if detail is not None else ''}", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Rows and sorting
+# ---------------------------------------------------------------------------
+
+def generate_rows(replay: str, count: int, seed: int) -> tuple[list[dict], list[dict]]:
+    """Players and the owner's eliminations for a replay file name; always the same for the same inputs."""
+    rng = random.Random(f"{seed}:{os.path.basename(replay)}")
+
+    def maybe(value: str, unknown: float) -> str:
+        return "unknown" if rng.random() < unknown else value
+
+    players = []
+    for i in range(count):
+        bot = rng.random() < 0.4
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        eliminated = i > 0 and rng.random() < 0.9
+        players.append({
+            "id": f"{rng.getrandbits(128):032x}",
+            "name": f"{name}{rng.randint(1, 999)}" if not bot else f"Bot{i:03d}",
+            "level": maybe(str(rng.randint(1, 200)), 0.15),
+            "bot": "true" if bot else "false",
+            "platform": rng.choice(PLATFORMS),
+            "kills": maybe(str(rng.choice((0, 0, 0, 1, 1, 2, 3, 5, 8))), 0.1),
+            "teamIndex": str(i // 4 + 1),
+            "placement": maybe(str(rng.randint(1, count // 4 + 1)), 0.1),
+            "deathCause": rng.choice(DEATH_CAUSES) if eliminated else "",
+            "elimTime": f"{rng.randint(0, 24):02d}:{rng.randint(0, 59):02d}" if eliminated else "",
+            "pickaxe": "Default",
+            "glider": "Default",
+        })
+    eliminations = rng.sample(players, min(len(players), rng.randint(0, 5)))
+    return players, eliminations
+
+
+def display(header: str, row: dict) -> str:
+    field, _numeric, _bot = COLUMNS[header]
+    value = row[field]
+    if header == "Bot":
+        return "BOT" if value == "true" else ""
+    if header == "Squad":
+        return f"Squad # {value}" if not unknown(value) else "—"
+    if header in ("Level", "Kills", "Place"):
+        return "-" if unknown(value) else value
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Window
+# ---------------------------------------------------------------------------
+
+class Grid:
+    """One DataGrid: its rows, the order on screen and the mode cycle of each column."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: list[dict] = []
+        self.order: list[dict] = []
+        self.modes: dict[str, int] = {}
+        self.sorted_by: str | None = None
+
+    def load(self, rows: list[dict]):
+        self.rows = list(rows)
+        self.order = list(rows)
+        self.sorted_by = None
+
+    def reset(self):
+        self.modes.clear()
+        self.order = list(self.rows)
+        self.sorted_by = None
+
+    def sort(self, header: str, bad: bool) -> int:
+        """Advance `header` to its next mode and re-sort; returns the mode. `bad` misorders descending sorts."""
+        field, numeric, bot = COLUMNS[header]
+        has_unknowns = (numeric or bot) and any(unknown(r[field]) for r in self.rows)
+        mode = (self.modes.get(header, 0) + 1) % (3 if has_unknowns else 2)
+        self.modes[header] = mode
+        key = functools.cmp_to_key(lambda a, b: compare(a[field], b[field], numeric, bot,
+                                                        descending=mode == 0, unknowns_first=mode == 2))
+        self.order = sorted(self.rows, key=key)
+        if bad and mode == 0 and len(self.order) > 1:
+            self.order.append(self.order.pop(0))
+        self.sorted_by = header
+        return mode
+
+
+class FakeApp:
+    def __init__(self, args: argparse.Namespace):
+        import tkinter
+        self.tk = tkinter
+        self.args = args
+        self.root = tkinter.Tk()
+        self.root.withdraw()   # the main window is a Toplevel so the new-window fault can replace it
+        width, height = layout.parse()["design_size"]
+        self.size = (int(width), int(height))
+        self.grids = {name: Grid(name) for name in ("OwnerEliminationsGrid", "PlayersGrid")}
+        self.geometry = layout.resolve((0, 0) + self.size).grids
+        self.window = self.canvas = self.dialog = None
+        self.replay: str | None = None
+        self.commands: queue.Queue[str] = queue.Queue()
+
+    # -- window -------------------------------------------------------------
+
+    def open_window(self):
+        old = self.window
+        self.window = self.tk.Toplevel(self.root)
+        self.window.title(f"{TITLE} - {os.path.basename(self.replay)}" if self.replay else TITLE)
+        self.window.geometry(f"{self.size[0]}x{self.size[1]}+40+40")
+        self.window.protocol("WM_DELETE_WINDOW", self.root.destroy)
+        self.canvas = self.tk.Canvas(self.window, width=self.size[0], height=self.size[1], background=BACKGROUND,
+                                     highlightthickness=0, borderwidth=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.canvas.bind("<Button-1>", self.on_click)
+        if old is None:
+            self.window.bind("<Map>", self.on_first_map)
+        else:
+            old.destroy()
+        self.draw()
+
+    def on_first_map(self, _event):
+        self.window.unbind("<Map>")
+        status("window opened", f"{self.size[0]}x{self.size[1]}")
+
+    def draw(self):
+        c = self.canvas
+        c.delete("all")
+        c.create_rectangle(8, 8, 40, 40, fill="#3b82f6", outline="")
+        x0, y0, x1, y1 = BUTTON
+        c.create_rectangle(x0, y0, x1, y1, fill="#e6e6e6", outline="#cfcfcf")
+        c.create_text((x0 + x1) / 2, (y0 + y1) / 2, text="Select Replay File", fill=TEXT)
+        c.create_text(x1 + 8, (y0 + y1) / 2, text="or drag & drop", fill=HINT, anchor="w")
+        c.create_rectangle(x1 + 110, y0, x1 + 190, y1, fill="#e6e6e6", outline="#cfcfcf")
+        c.create_text(x1 + 150, (y0 + y1) / 2, text="Columns", fill=TEXT)
+        if not self.replay or not self.grids["PlayersGrid"].rows:
+            return   # both grids are only visible with data, as in MainWindow.axaml
+        players, eliminations = self.grids["PlayersGrid"], self.grids["OwnerEliminationsGrid"]
+        c.create_text(8, 64, text=f"Filter:   ({len(players.rows)} players, {len(eliminations.rows)} eliminations)",
+                      fill=TEXT, anchor="w")
+        for grid in self.grids.values():
+            self.draw_grid(grid)
+
+    def draw_grid(self, grid: Grid):
+        c = self.canvas
+        g = self.geometry[grid.name]
+        label = "Players Seen" if grid.name == "PlayersGrid" else "Owner Eliminations"
+        c.create_text(g.x, g.y - 14, text=label, fill=TEXT, anchor="w", font=("TkDefaultFont", 11, "bold"))
+        top, bottom = g.y, g.y + g.height
+        c.create_rectangle(g.x, top, g.x + g.width, top + layout.HEADER_HEIGHT, fill=HEADER_BACKGROUND, outline="")
+        for col in g.columns:
+            c.create_text(col.x + 12, top + layout.HEADER_HEIGHT / 2, text=col.header, fill=TEXT, anchor="w")
+            right = col.x + col.width - 1
+            c.create_line(right, top, right, top + layout.HEADER_HEIGHT, fill=SEPARATOR)
+        y = g.rows_top
+        for row in grid.order:
+            if y + ROW_HEIGHT > bottom:
+                break
+            c.create_rectangle(g.x, y, g.x + g.width, y + ROW_HEIGHT - 1,
+                               fill=BOT_ROW if row["bot"] == "true" else BACKGROUND, outline="")
+            for col in g.columns:
+                c.create_text(col.x + 12, y + ROW_HEIGHT / 2, text=display(col.header, row)[:24], fill=TEXT,
+                              anchor="w")
+            c.create_line(g.x, y + ROW_HEIGHT - 1, g.x + g.width, y + ROW_HEIGHT - 1, fill=GRID_LINE)
+            y += ROW_HEIGHT
+
+    # -- input --------------------------------------------------------------
+
+    def on_click(self, event):
+        x0, y0, x1, y1 = BUTTON
+        if x0 <= event.x <= x1 and y0 <= event.y <= y1:
+            self.open_dialog()
+            return
+        for grid in self.grids.values():
+            if not grid.rows:
+                continue
+            g = self.geometry[grid.name]
+            if not g.y <= event.y < g.y + layout.HEADER_HEIGHT:
+                continue
+            for col in g.columns:
+                if col.x <= event.x < col.x + col.width and col.sortable:
+                    self.root.after(int(self.args.sort_delay * 1000), self.sort, grid, col.header)
+                    return
+
+    def sort(self, grid: Grid, header: str):
+        mode = grid.sort(header, bad="bad-sort" in self.args.fault)
+        self.draw()
+        status("grid sorted", f"{grid.name} {header} mode={mode}")
+
+    def open_dialog(self):
+        """A minimal file dialog: Ctrl+L (Cmd+Shift+G on macOS) focuses the path, Enter opens it."""
+        if self.dialog is not None:
+            return
+        self.dialog = dialog = self.tk.Toplevel(self.root)
+        dialog.title("Select Fortnite Replay File")
+        dialog.geometry("520x120+120+120")
+        entry = self.tk.Entry(dialog, width=60)
+        entry.pack(padx=12, pady=40)
+
+        def focus_path(_event=None):
+            entry.focus_set()
+            entry.select_range(0, "end")
+            return "break"
+
+        def accept(_event=None):
+            path = entry.get().strip()
+            if path:
+                self.close_dialog()
+                self.load(path, from_dialog=True)
+            return "break"
+
+        for sequence in ("<Control-l>", "<Command-Shift-G>", "<Command-Shift-g>"):
+            try:
+                dialog.bind_all(sequence, focus_path)
+            except self.tk.TclError:
+                pass   # no Command modifier outside macOS
+        entry.bind("<Return>", accept)
+        dialog.bind("<Escape>", lambda _e: self.close_dialog())
+        dialog.protocol("WM_DELETE_WINDOW", self.close_dialog)
+        dialog.focus_force()
+        entry.focus_set()
+
+    def close_dialog(self):
+        if self.dialog is not None:
+            for sequence in ("<Control-l>", "<Command-Shift-G>", "<Command-Shift-g>"):
+                try:
+                    self.dialog.unbind_all(sequence)
+                except self.tk.TclError:
+                    pass
+            self.dialog.destroy()
+            self.dialog = None
+
+    # -- loading and commands -----------------------------------------------
+
+    def load(self, path: str, from_dialog: bool = False):
+        path = os.path.abspath(path)
+        status("replay loading", path)
+        delay = self.args.load_delay + (self.args.slow_load_seconds if "slow-load" in self.args.fault else 0.0)
+        self.root.after(int(delay * 1000), self.finish_load, path, from_dialog)
+
+    def finish_load(self, path: str, from_dialog: bool):
+        if not os.path.isfile(path):
+            status("replay failed", f"Could not find file '{path}'.")
+            return
+        self.replay = path
+        players, eliminations = generate_rows(path, self.args.rows, self.args.seed)
+        self.grids["PlayersGrid"].load(players)
+        self.grids["OwnerEliminationsGrid"].load(eliminations)
+        if from_dialog and "new-window" in self.args.fault:
+            self.open_window()
+        else:
+            self.window.title(f"{TITLE} - {os.path.basename(path)}")
+            self.draw()
+        status("replay loaded", f"{os.path.basename(path)} ({len(players)} players, {len(eliminations)} eliminations)")
+        # Like the app's Background-priority post: once the redraw has been processed
+        self.root.after_idle(lambda: status("grid populated", f"{len(players)} rows"))
+
+    def reset_view(self):
+        for grid in self.grids.values():
+            grid.reset()
+        self.draw()
+
+    def describe_view(self) -> str:
+        sorts = sum(1 for g in self.grids.values() if g.sorted_by)
+        return (f'filter="" sorts={sorts} rows={len(self.grids["PlayersGrid"].rows)} '
+                f'eliminations={len(self.grids["OwnerEliminationsGrid"].rows)}')
+
+    def read_commands(self):
+        for line in sys.stdin:
+            if line.strip():
+                self.commands.put(line.strip())
+
+    def poll_commands(self):
+        while not self.commands.empty():
+            command = self.commands.get()
+            verb, _, argument = command.partition(" ")
+            if verb == "open" and argument.strip():
+                self.load(argument.strip())
+            elif verb == "reset":
+                self.reset_view()
+                status("view reset")
+            elif verb == "state":
+                status("view state", self.describe_view())
+            else:
+                status("unknown command", command)
+        self.root.after(20, self.poll_commands)
+
+    def start(self):
+        self.open_window()
+        if self.args.replay:
+            self.load(self.args.replay)
+        if self.args.commands:
+            threading.Thread(target=self.read_commands, name="command-channel", daemon=True).start()
+            self.poll_commands()
+
+    def run(self):
+        self.root.after(int(self.args.startup_delay * 1000), self.start)
+        self.root.mainloop()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stand-in BotOrNot window for harness self-tests")
+    parser.add_argument("path", nargs="?", default=None, help="replay to open on startup")
+    parser.add_argument("--replay", default=None, help="replay to open on startup")
+    parser.add_argument("--commands", action="store_true", help="read commands from stdin")
+    parser.add_argument("--rows", type=int, default=98, help="players per replay (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="row generator seed (default: %(default)s)")
+    parser.add_argument("--startup-delay", type=float, default=0.5, metavar="S")
+    parser.add_argument("--load-delay", type=float, default=0.3, metavar="S")
+    parser.add_argument("--sort-delay", type=float, default=0.05, metavar="S")
+    parser.add_argument("--slow-load-seconds", type=float, default=8.0, metavar="S",
+                        help="extra load time with --fault slow-load (default: %(default)s)")
+    parser.add_argument("--fault", action="append", choices=FAULTS, default=[],
+                        help="inject a fault; may be repeated")
+    parser.add_argument("--dump-rows", default=None, metavar="OUT",
+                        help="write the replay's rows as DebugReplay --dump-rows JSON and exit")
+    args = parser.parse_args(argv)
+    args.replay = args.replay or args.path
+    return args
+
+
+def dump_rows(replay: str, out: str, count: int, seed: int):
+    """The rows the stand-in would show for `replay`, in DebugReplay's export format (see expected.py)."""
+    players, eliminations = generate_rows(os.path.abspath(replay), count, seed)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"format": expected.FORMAT, "file": os.path.basename(replay), "owner": None,
+                   "players": players, "ownerEliminations": eliminations, "sorts": expected.sorts(players)}, f)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.dump_rows:
+        if not args.replay:
+            print("--dump-rows needs a replay", file=sys.stderr)
+            return 2
+        dump_rows(args.replay, args.dump_rows, args.rows, args.seed)
+        return 0
+    FakeApp(args).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+BotOrNot harness command line
+
+One entry point for the harness's tools. Each command imports only the
+modules it needs. report and compare read stored JSON and never load the
+automation or capture backends, so they start in tens of milliseconds on
+any machine. run, corpus and benchmark load the backends when they start
+driving the app.
+
+Usage:
+    python3 UITests/harness.py run [replay ...] [run_ui_test.py options]
+    python3 UITests/harness.py corpus DIR|replay ... [corpus.py options] [-- run options]
+    python3 UITests/harness.py benchmark replay ... [benchmark.py options] [-- run options]
+    python3 UITests/harness.py report RESULT.json [...]
+    python3 UITests/harness.py compare OLD.json NEW.json [--threshold 0.2]
+    python3 UITests/harness.py selftest [--only NAME ...] [-- run options]
+
+`python3 UITests/harness.py COMMAND --help` lists a command's options. The
+scripts themselves (run_ui_test.py, corpus.py, benchmark.py) still work as
+before.
+"""
+
+import sys
+import importlib
+
+# command → (module, function taking argv and returning the exit code, summary)
+COMMANDS = {
+    "run": ("run_ui_test", "cli", "build, launch and test the app with one or more replays"),
+    "corpus": ("corpus", "main", "run many replays in parallel, one display per worker"),
+    "benchmark": ("benchmark", "main", "repeat runs and check latency percentiles against a baseline"),
+    "report": ("results", "report_main", "print stored run, corpus or benchmark results"),
+    "compare": ("results", "compare_main", "compare two results and flag what got slower"),
+    "selftest": ("selftest", "main", "test the harness itself against the stand-in window in fakeapp.py"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: harness.py COMMAND [options]", "", "commands:"]
+    lines += [f"  {name:<10} {summary}" for name, (_module, _func, summary) in COMMANDS.items()]
+    lines += ["", "Run `harness.py COMMAND --help` for a command's options."]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"harness.py: unknown command {command!r}\n\n{usage()}")
+        return 2
+    module_name, func, _summary = COMMANDS[command]
+    return getattr(importlib.import_module(module_name), func)(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Header-click latency meter for the BotOrNot GUI test harness.
+
+A sort is measured from the moment the header click has been posted until
+PlayersGrid has been re-rendered with the new order:
+
+- first change — the first captured frame that differs from the grid before
+  the click (PlayerRowSortComparer has run and the DataGrid has repainted)
+- stable       — the last frame that still differed from the one before it,
+  once nothing has changed for `settle` seconds (the repaint is complete)
+
+The grid is captured in a tight loop straight into a ring of frame buffers
+the meter owns (backend.frame_buffer() / grab_into(); shared-memory images
+on X11), so the loop copies no pixels and change detection is a memcmp of
+two slots. When a click never repaints the grid or never settles, the ring
+still holds the last frames captured, and the harness saves them with the
+failure. Measurements are grouped per column and direction and
+summarized as percentiles and fixed-bucket histograms, across the repeats of
+one run (--sort-repeats) or across benchmark runs.
+"""
+
+import time
+import math
+from dataclasses import dataclass
+
+import timing
+import waits
+from capture import Frame, same_pixels
+
+RING_FRAMES = 16
+BUCKETS_MS = (8, 16, 33, 50, 100, 200, 500, 1000, 2000)   # upper edges; one more bucket for slower
+_BARS = " ▁▂▃▄▅▆▇█"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (no interpolation; p100 is the max)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class FrameRing:
+    """Fixed set of capture buffers filled round-robin, with the frame captured into each."""
+
+    def __init__(self, backend, region, size: int = RING_FRAMES):
+        self.backend = backend
+        self.region = region
+        self.buffers = [backend.frame_buffer(region) for _ in range(size)]
+        self.slots: list[Frame | None] = [None] * size
+        self.count = 0   # frames captured since the last reset()
+
+    def reset(self):
+        self.count = 0
+
+    def capture(self) -> Frame:
+        """Grab the region into the next buffer (overwriting the oldest) and return its frame."""
+        i = self.count % len(self.buffers)
+        frame = self.slots[i] = self.backend.grab_into(self.region, self.buffers[i])
+        self.count += 1
+        return frame
+
+    def previous(self) -> Frame | None:
+        """The frame captured before the latest one."""
+        if self.count < 2:
+            return None
+        return self.slots[(self.count - 2) % len(self.buffers)]
+
+    def close(self):
+        for buffer in self.buffers:
+            self.backend.release_buffer(buffer)
+        self.buffers, self.slots = [], []
+
+    def frames(self) -> list[Frame]:
+        """The frames still in the ring since the last reset(), oldest first."""
+        n = min(self.count, len(self.buffers))
+        return [self.slots[i % len(self.buffers)] for i in range(self.count - n, self.count)]
+
+
+@dataclass
+class Measurement:
+    column: str
+    direction: str
+    first_change: float | None   # seconds from the click; None if the grid never changed
+    stable: float | None         # seconds from the click to the last change
+    frames: int                  # frames captured while measuring
+    settled: bool                # False if the grid was still changing at the timeout
+
+    def to_dict(self) -> dict:
+        return {
+            "column": self.column,
+            "direction": self.direction,
+            "seconds": round(self.first_change, 4) if self.first_change is not None else None,
+            "stable_seconds": round(self.stable, 4) if self.stable is not None else None,
+            "frames": self.frames,
+            "settled": self.settled,
+        }
+
+
+class LatencyMeter:
+    """
+    Measures click → repaint for one screen region. Call reference() just
+    before the click and measure() right after it.
+    """
+
+    def __init__(self, backend, region, settle: float = 0.3, timeout: float = 3.0,
+                 interval: float = 0.004, ring_size: int = RING_FRAMES):
+        self.backend = backend
+        self.region = region
+        self.settle = settle
+        self.timeout = timeout
+        self.interval = interval       # minimum time between grabs, so the app keeps its CPU
+        self.ring_size = ring_size
+        self.ring: FrameRing | None = None
+        self._reference_buffer = None
+        self._reference: Frame | None = None
+
+    def reference(self):
+        """Capture the grid as it looks before the click."""
+        if self.ring is None:
+            self.ring = FrameRing(self.backend, self.region, self.ring_size)
+            self._reference_buffer = self.backend.frame_buffer(self.region)
+        self._reference = self.backend.grab_into(self.region, self._reference_buffer)
+
+    def close(self):
+        """Give the capture buffers back to the backend (shared memory on X11)."""
+        if self.ring is not None:
+            self.ring.close()
+            self.backend.release_buffer(self._reference_buffer)
+            self.ring = self._reference = self._reference_buffer = None
+
+    def measure(self, column: str, direction: str, clicked: float, label: str | None = None,
+                budget: float | None = None) -> Measurement:
+        """Capture until the grid has changed and then stopped changing; times are from `clicked`."""
+        label = label or f"sort {column} {direction}"
+        ring = self.ring
+        ring.reset()
+        first = last = None
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with timing.span(label, "sleep", timeout=self.timeout, budget=budget):
+            while True:
+                frame = ring.capture()
+                t = frame.timestamp
+                if first is None:
+                    if not same_pixels(frame.data, self._reference.data):
+                        first = last = t
+                elif not same_pixels(frame.data, ring.previous().data):
+                    last = t
+                if first is not None and t - last >= self.settle:
+                    settled = True
+                    break
+                if time.monotonic() >= deadline:
+                    settled = False
+                    break
+                time.sleep(self.interval)
+        waits.record(label, time.monotonic() - start, budget, first is not None and settled, self.timeout)
+        return Measurement(column, direction,
+                           first - clicked if first is not None else None,
+                           last - clicked if last is not None else None,
+                           ring.count, settled)
+
+
+# ---------------------------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------------------------
+
+def histogram(seconds: list[float]) -> list[int]:
+    """Counts per BUCKETS_MS bucket, plus a last bucket for anything slower."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for s in seconds:
+        ms = s * 1000
+        counts[next((i for i, edge in enumerate(BUCKETS_MS) if ms <= edge), len(BUCKETS_MS))] += 1
+    return counts
+
+
+def _describe(seconds: list[float]) -> dict:
+    if not seconds:
+        return {"n": 0}
+    return {
+        "n": len(seconds),
+        "p50": round(percentile(seconds, 50), 4),
+        "p95": round(percentile(seconds, 95), 4),
+        "max": round(max(seconds), 4),
+        "histogram": histogram(seconds),
+    }
+
+
+def summarize(latencies: list[dict]) -> list[dict]:
+    """Group Measurement.to_dict() entries by column and direction (in first-seen order)."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for entry in latencies:
+        groups.setdefault((entry["column"], entry["direction"]), []).append(entry)
+    out = []
+    for (column, direction), entries in groups.items():
+        out.append({
+            "column": column,
+            "direction": direction,
+            "first_change": _describe([e["seconds"] for e in entries if e.get("seconds") is not None]),
+            "stable": _describe([e["stable_seconds"] for e in entries if e.get("stable_seconds") is not None]),
+            "unsettled": sum(1 for e in entries if e.get("settled") is False),
+        })
+    return out
+
+
+def _bars(counts: list[int]) -> str:
+    top = max(counts) or 1
+    return "".join(_BARS[math.ceil(c / top * (len(_BARS) - 1))] for c in counts)
+
+
+def _ms(stats: dict, key: str) -> str:
+    return f"{stats[key] * 1000:.0f}" if stats["n"] else "-"
+
+
+def print_histograms(summary: list[dict], title: str = "Sort latency"):
+    if not summary:
+        return
+    edges = " ".join(str(e) for e in BUCKETS_MS)
+    print(f"\n  {title}: header click → first change / → stable, ms (histogram buckets ≤ {edges}, slower)")
+    print(f"  {'Column':<10} {'Direction':<15} {'n':>3} {'first p50':>9} {'p95':>5} {'stable p50':>10} {'p95':>5}"
+          f"  {'first':<10} {'stable':<10}")
+    for g in summary:
+        first, stable = g["first_change"], g["stable"]
+        note = f"  {g['unsettled']} unsettled" if g["unsettled"] else ""
+        print(f"  {g['column']:<10} {g['direction']:<15} {first['n']:>3} {_ms(first, 'p50'):>9} {_ms(first, 'p95'):>5}"
+              f" {_ms(stable, 'p50'):>10} {_ms(stable, 'p95'):>5}"
+              f"  {_bars(first.get('histogram', [0])):<10} {_bars(stable.get('histogram', [0])):<10}{note}")
@@ -0,0 +1,310 @@
+"""
+Click-target geometry for the BotOrNot GUI test harness.
+
+Positions of the two DataGrids (OwnerEliminationsGrid, PlayersGrid) and their
+column headers are derived from BotOrNot.Avalonia/Views/MainWindow.axaml
+rather than measured by hand: the window's row definitions, each grid's
+margin and every visible column's width come straight from the AXAML, so a
+column that is added, hidden, renamed or resized moves the click targets
+with it.
+
+The heights of the Auto rows above the grids depend on fonts and themes and
+can only be estimated from the markup. confirm() corrects the estimate
+against a live frame by matching the expected column separator pattern of
+a grid's header row.
+
+Geometry is computed in Avalonia logical pixels and mapped to screen
+coordinates with the window origin, title bar and scale factor.
+"""
+
+import os
+import functools
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field, replace
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_WINDOW_AXAML = os.path.join(PROJECT_ROOT, "BotOrNot.Avalonia", "Views", "MainWindow.axaml")
+
+_AVALONIA = "{https://github.com/avaloniaui}"
+_XAML = "{http://schemas.microsoft.com/winfx/2006/xaml}"
+
+# Rendered heights (logical px) of the Auto rows, keyed by the element that
+# sizes each row. Estimates for the default Fluent theme; confirm() measures
+# the real offset.
+AUTO_ROW_HEIGHTS = {
+    0: 48,   # top bar: 8px margin around 32px logo/buttons
+    1: 40,   # summary pills: 6px padding around one line of pills, 1px border
+    2: 42,   # filter box: 30px TextBox, 8px/4px margin
+    3: 31,   # "… Eliminations" header: 14pt bold, 8px/4px margin
+    5: 31,   # "Players Seen" header
+}
+HEADER_HEIGHT = 32      # DataGridColumnHeader min height in the Fluent theme
+SEARCH_RADIUS = 60      # logical px searched above/below the estimated header
+
+
+@dataclass(frozen=True)
+class Column:
+    header: str
+    x: float                # left edge, relative to the window client area
+    width: float
+    sortable: bool
+
+    @property
+    def center_x(self) -> float:
+        return self.x + self.width / 2
+
+
+@dataclass(frozen=True)
+class GridGeometry:
+    name: str
+    x: float
+    y: float                # top of the column header row, relative to the client area
+    width: float
+    height: float
+    columns: tuple[Column, ...]
+
+    @property
+    def header_center_y(self) -> float:
+        return self.y + HEADER_HEIGHT / 2
+
+    @property
+    def rows_top(self) -> float:
+        return self.y + HEADER_HEIGHT
+
+    def column(self, header: str) -> Column:
+        for col in self.columns:
+            if col.header == header:
+                return col
+        raise KeyError(f"{self.name} has no visible column {header!r} "
+                       f"(visible: {', '.join(c.header for c in self.columns)})")
+
+
+@dataclass
+class WindowLayout:
+    """Grid geometry for one window placement. All public coordinates are screen coordinates."""
+    origin: tuple[float, float]      # screen position of the client area's top-left corner
+    scale: float                     # screen units per logical pixel
+    grids: dict[str, GridGeometry]
+    confirmed: dict[str, bool] = field(default_factory=dict)
+
+    def grid(self, name: str) -> GridGeometry:
+        return self.grids[name]
+
+    def to_screen(self, x: float, y: float) -> tuple[int, int]:
+        return (int(round(self.origin[0] + x * self.scale)), int(round(self.origin[1] + y * self.scale)))
+
+    def header_target(self, grid: str, column: str) -> tuple[int, int]:
+        """Screen point to click to sort `grid` by `column`."""
+        g = self.grids[grid]
+        return self.to_screen(g.column(column).center_x, g.header_center_y)
+
+    def column_span(self, grid: str, column: str) -> tuple[int, int]:
+        """Screen x range of a column's cells."""
+        g = self.grids[grid]
+        col = g.column(column)
+        return (self.to_screen(col.x, 0)[0], self.to_screen(col.x + col.width, 0)[0])
+
+    def grid_region(self, grid: str) -> tuple[int, int, int, int]:
+        """Screen (x, y, w, h) of a grid including its header row."""
+        g = self.grids[grid]
+        x, y = self.to_screen(g.x, g.y)
+        return (x, y, int(round(g.width * self.scale)), int(round(g.height * self.scale)))
+
+    def rows_top(self, grid: str) -> int:
+        return self.to_screen(0, self.grids[grid].rows_top)[1]
+
+
+# ---------------------------------------------------------------------------
+# AXAML parsing (cached per file version)
+# ---------------------------------------------------------------------------
+
+def _thickness(value: str | None) -> tuple[float, float, float, float]:
+    """Avalonia Thickness: "u", "h,v" or "l,t,r,b" → (left, top, right, bottom)."""
+    if not value:
+        return (0.0, 0.0, 0.0, 0.0)
+    parts = [float(p) for p in value.replace(" ", ",").split(",") if p]
+    if len(parts) == 1:
+        return (parts[0],) * 4
+    if len(parts) == 2:
+        return (parts[0], parts[1], parts[0], parts[1])
+    return tuple(parts[:4])
+
+
+def _row_definitions(value: str) -> list[tuple[str, float]]:
+    """ "Auto,2*,40" → [("auto", 0), ("star", 2), ("pixel", 40)]"""
+    rows = []
+    for part in value.split(","):
+        part = part.strip()
+        if part.lower() == "auto":
+            rows.append(("auto", 0.0))
+        elif part.endswith("*"):
+            rows.append(("star", float(part[:-1] or 1)))
+        else:
+            rows.append(("pixel", float(part)))
+    return rows
+
+
+@functools.lru_cache(maxsize=8)
+def _parse(path: str, _mtime: float) -> dict:
+    root = ET.parse(path).getroot()
+    panel = root.find(f"{_AVALONIA}Grid")
+    if panel is None:
+        raise ValueError(f"{path}: no root Grid")
+    grids = []
+    for element in panel.iter(f"{_AVALONIA}DataGrid"):
+        columns = []
+        container = element.find(f"{_AVALONIA}DataGrid.Columns")
+        for col in (container if container is not None else []):
+            if col.get("IsVisible", "True").lower() == "false":
+                continue
+            columns.append((col.get("Header", ""), float(col.get("Width", "100")),
+                            col.get("CanUserSort", "True").lower() != "false"))
+        grids.append({
+            "name": element.get(f"{_XAML}Name"),
+            "row": int(element.get("Grid.Row", "0")),
+            "margin": _thickness(element.get("Margin")),
+            "columns": columns,
+        })
+    return {
+        "design_size": (float(root.get("Width", "0")), float(root.get("Height", "0"))),
+        "rows": _row_definitions(panel.get("RowDefinitions", "*")),
+        "grids": grids,
+    }
+
+
+def parse(path: str = MAIN_WINDOW_AXAML) -> dict:
+    """Rows, grids and visible columns of MainWindow.axaml. Re-parsed only when the file changes."""
+    return _parse(path, os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=32)
+def _logical_grids(path: str, mtime: float, client_w: float, client_h: float) -> dict[str, GridGeometry]:
+    spec = _parse(path, mtime)
+    rows = spec["rows"]
+    heights = [AUTO_ROW_HEIGHTS.get(i, 0.0) if kind == "auto" else (value if kind == "pixel" else 0.0)
+               for i, (kind, value) in enumerate(rows)]
+    stars = sum(value for kind, value in rows if kind == "star")
+    remaining = max(0.0, client_h - sum(heights))
+    for i, (kind, value) in enumerate(rows):
+        if kind == "star":
+            heights[i] = remaining * value / stars
+
+    grids = {}
+    for g in spec["grids"]:
+        left, top, right, bottom = g["margin"]
+        y = sum(heights[:g["row"]]) + top
+        x = left
+        columns = []
+        for header, width, sortable in g["columns"]:
+            columns.append(Column(header, x, width, sortable))
+            x += width
+        grids[g["name"]] = GridGeometry(
+            g["name"], left, y, client_w - left - right, heights[g["row"]] - top - bottom, tuple(columns),
+        )
+    return grids
+
+
+def resolve(bounds: tuple[int, int, int, int], scale: float = 1.0, title_bar: float = 0.0,
+            path: str = MAIN_WINDOW_AXAML) -> WindowLayout:
+    """
+    Estimated layout for a window at `bounds` (screen x, y, w, h as returned
+    by the backend). title_bar is the chrome above the client area included
+    in bounds; scale is screen units per logical pixel.
+    """
+    wx, wy, ww, wh = bounds
+    client_w = (ww / scale)
+    client_h = (wh - title_bar) / scale
+    grids = _logical_grids(path, os.path.getmtime(path), round(client_w, 1), round(client_h, 1))
+    return WindowLayout((wx, wy + title_bar), scale, dict(grids))
+
+
+# ---------------------------------------------------------------------------
+# Confirmation against a live frame
+# ---------------------------------------------------------------------------
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _separator_template(grid: GridGeometry, px_per_logical: float) -> list[int]:
+    """x offsets (frame pixels, relative to the grid) where header column separators are expected."""
+    return [int(round((c.x + c.width - grid.x) * px_per_logical)) - 1 for c in grid.columns]
+
+
+def match_header(frame, layout: WindowLayout, grid_name: str, search: float = SEARCH_RADIUS,
+                 max_shift: int = 12, min_edge: float = 8.0, min_hits: float = 0.6):
+    """
+    Find a grid's header row in `frame` (a capture of the whole window
+    region). The expected column separators form a comb template; it is
+    slid horizontally over the rows around the estimate, and the header is
+    the tallest band of rows with an edge at (most of) the comb's teeth.
+    Returns (dy, dx) in logical pixels, or None when no header is found.
+    """
+    np = _np()
+    g = layout.grids[grid_name]
+    fx, fy, fw, fh = frame.region
+    sx, sy = frame.width / fw, frame.height / fh                 # frame px per screen unit
+    px = sx * layout.scale                                       # frame px per logical px
+
+    gx, gy = layout.to_screen(g.x, g.y)
+    left = int((gx - fx) * sx)
+    top = max(0, int((gy - fy - search * layout.scale) * sy))
+    bottom = min(frame.height, int((gy - fy + (search + HEADER_HEIGHT) * layout.scale) * sy))
+    right = min(frame.width, left + int(g.width * px))
+    if bottom - top < 4 or right - left < 16:
+        return None
+
+    raw = np.frombuffer(frame.data, dtype=np.uint8, count=frame.stride * frame.height)
+    band = raw.reshape(frame.height, frame.stride // 4, 4)[top:bottom, left:right, :3].astype(np.int16)
+    edges = np.abs(np.diff(band.mean(axis=2), axis=1))          # (rows, width-1)
+
+    seps = np.array([s for s in _separator_template(g, px) if max_shift <= s < edges.shape[1] - max_shift])
+    if len(seps) < 2:
+        return None
+    shifts = np.arange(-max_shift, max_shift + 1)
+    # (rows, shifts): fraction of the expected separators with an edge on that pixel row
+    hits = (edges[:, seps[None, :] + shifts[:, None]] > min_edge).mean(axis=2) >= min_hits
+
+    # Header text also starts at a fixed offset from each separator, but the
+    # separators run much taller than the glyphs: take the shift with the
+    # longest vertical run of matching rows
+    best = None
+    for i in np.argsort(np.abs(shifts), kind="stable"):    # ties go to the smaller correction
+        shift = shifts[i]
+        rows = np.nonzero(hits[:, i])[0]
+        if len(rows) == 0:
+            continue
+        run = max(np.split(rows, np.nonzero(np.diff(rows) > 1)[0] + 1), key=len)
+        if best is None or len(run) > len(best[1]):
+            best = (int(shift), run)
+    if best is None or len(best[1]) < HEADER_HEIGHT * px * 0.4:
+        return None
+    best_shift, run = best
+    center_px = top + (run[0] + run[-1]) / 2
+    dy = (center_px / sy + fy - gy) / layout.scale - HEADER_HEIGHT / 2
+    dx = best_shift / px
+    return dy, dx
+
+
+def confirm(layout: WindowLayout, frame, grid_names=("OwnerEliminationsGrid", "PlayersGrid")) -> WindowLayout:
+    """
+    Return a copy of `layout` with each grid shifted to where its header row
+    actually is in `frame`. Grids whose header isn't found keep the estimate
+    and are marked unconfirmed.
+    """
+    grids, confirmed = dict(layout.grids), dict(layout.confirmed)
+    for name in grid_names:
+        if name not in grids:
+            continue
+        found = match_header(frame, layout, name)
+        confirmed[name] = found is not None
+        if found is None:
+            continue
+        dy, dx = found
+        g = grids[name]
+        grids[name] = replace(
+            g, x=g.x + dx, y=g.y + dy, height=g.height - dy,
+            columns=tuple(replace(c, x=c.x + dx) for c in g.columns),
+        )
+    return WindowLayout(layout.origin, layout.scale, grids, confirmed)
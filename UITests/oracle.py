@@ -0,0 +1,264 @@
+"""
+Sort-correctness oracle for the BotOrNot GUI test harness.
+
+Reads the PlayersGrid straight from captured pixels: the horizontal grid lines
+split the grid into one strip per row, each strip is reduced to its ink
+(pixels that stand out from the row background, so the bot/non-bot row colour
+doesn't matter) and hashed with vectorized NumPy. Two hashes are kept per row:
+the whole row, and the cell of the column being sorted (the "key").
+
+The header-click states (before, asc, unknowns-first, desc) are then checked
+against the rules of PlayerRowSortComparer:
+
+- every sorted state groups equal keys into one contiguous run
+- descending reverses the runs of ascending; unknowns stay at the bottom
+- unknowns-first (3rd mode of numeric columns with unknowns) moves the
+  bottom run of ascending to the top and keeps the rest in order
+- when the whole grid fits on screen, every state is a permutation of the
+  rows shown before the click
+
+Which mode a click produced comes from the app's "grid sorted … mode=N" line.
+When the replay's rows are known (DebugReplay's parse, see expected.py),
+expected.check() adds findings against the order they should sort into.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+# MainWindow's mode cycle: 1=asc, 2=unknowns-first (3-mode columns only), 0=desc
+MODE_NAMES = {1: "asc", 2: "unknowns_first", 0: "desc"}
+
+INK_THRESHOLD = 60     # contrast with the row background below which a strip holds no text
+LINE_MAX_STD = 6.0     # a grid line is a pixel row this uniform across the grid …
+LINE_MIN_DELTA = 6.0   # … and at least this different from the rows next to it
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def frame_pixels(frame):
+    """HxWx3 uint8 view of a capture.Frame (BGR order; the oracle doesn't care)."""
+    np = _np()
+    raw = np.frombuffer(frame.data, dtype=np.uint8, count=frame.stride * frame.height)
+    return raw.reshape(frame.height, frame.stride // 4, 4)[:, :frame.width, :3]
+
+
+@dataclass
+class GridRows:
+    row_hashes: list[int]
+    key_hashes: list[int]
+    pitch: float
+    complete: bool          # blank space below the last row: every row is on screen
+
+    def key_runs(self) -> list[int]:
+        """Keys with consecutive duplicates collapsed."""
+        runs = []
+        for key in self.key_hashes:
+            if not runs or runs[-1] != key:
+                runs.append(key)
+        return runs
+
+
+@dataclass
+class Finding:
+    check: str
+    ok: bool
+    detail: str = ""
+
+
+@dataclass
+class OracleResult:
+    column: str
+    findings: list[Finding] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(f.ok for f in self.findings)
+
+    def add(self, check: str, ok: bool, detail: str = ""):
+        self.findings.append(Finding(check, ok, detail))
+
+    def to_dict(self) -> dict:
+        return {
+            "column": self.column,
+            "ok": self.ok,
+            "ms": round(self.seconds * 1000, 2),
+            "findings": [{"check": f.check, "ok": f.ok, "detail": f.detail} for f in self.findings],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Reading rows from pixels
+# ---------------------------------------------------------------------------
+
+def grid_lines(pixels, top: int = 0, max_thickness: int = 3) -> list[int]:
+    """
+    y offsets of horizontal grid lines at or below `top`: thin runs of uniform
+    pixel rows that differ from the uniform rows on both sides of them. Only
+    the left part of the grid is looked at, which keeps the scrollbar out.
+    """
+    np = _np()
+    grey = pixels[top:, :max(1, pixels.shape[1] * 3 // 5)].astype(np.float32).mean(axis=2)
+    uniform = grey.std(axis=1) < LINE_MAX_STD
+    level = grey.mean(axis=1)
+
+    lines, y, n = [], 0, len(level)
+    while y < n:
+        if not uniform[y]:
+            y += 1
+            continue
+        end = y
+        while end + 1 < n and uniform[end + 1] and abs(level[end + 1] - level[y]) < LINE_MIN_DELTA:
+            end += 1
+        if (end - y + 1 <= max_thickness and y > 0 and end + 1 < n
+                and uniform[y - 1] and uniform[end + 1]
+                and abs(level[y] - level[y - 1]) > LINE_MIN_DELTA
+                and abs(level[y] - level[end + 1]) > LINE_MIN_DELTA):
+            lines.append(y + top)
+        y = end + 1
+    return lines
+
+
+def _ink(strip):
+    """
+    Boolean mask of text pixels. Each pixel's contrast with the strip's
+    background (median colour) is divided by the strongest contrast in the
+    strip, which recovers the glyph coverage independently of the row colour,
+    so the same text on a bot row and a normal row gives the same mask.
+    """
+    np = _np()
+    background = np.median(strip.reshape(-1, 3), axis=0)
+    delta = np.abs(strip.astype(np.int16) - background.astype(np.int16)).max(axis=2)
+    strongest = int(delta.max())
+    if strongest < INK_THRESHOLD:
+        return np.zeros(delta.shape, dtype=bool)
+    return delta * 2 > strongest
+
+
+def _align(mask, height: int):
+    """Shift a mask so its first inked pixel row is at the top, padded/cut to `height`."""
+    np = _np()
+    rows = np.nonzero(mask.any(axis=1))[0]
+    out = np.zeros((height, mask.shape[1]), dtype=bool)
+    if len(rows):
+        part = mask[rows[0]:rows[0] + height]
+        out[:part.shape[0]] = part
+    return out
+
+
+def _hash_masks(masks) -> list[int]:
+    """Polynomial hash of each (h, w) mask in an (n, h, w) stack, all at once."""
+    np = _np()
+    if len(masks) == 0:
+        return []
+    packed = np.packbits(masks.reshape(len(masks), -1), axis=1).astype(np.uint64)
+    weights = np.random.default_rng(0x5EED).integers(1, 2**63, size=packed.shape[1], dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        return [int(h) for h in (packed * weights).sum(axis=1, dtype=np.uint64)]
+
+
+def read_rows(pixels, rows_top: int, key_span: tuple[int, int]) -> GridRows:
+    """
+    Split the grid image into row strips below `rows_top` (just under the
+    column header) and hash each row and its key cell. key_span is the
+    sorted column's (x0, x1) in the same pixel coordinates.
+    """
+    np = _np()
+    lines = grid_lines(pixels, rows_top)
+    if len(lines) < 2:
+        return GridRows([], [], 0.0, False)
+    pitch = float(np.median(np.diff(lines)))
+    if lines[0] - rows_top >= 0.8 * pitch:
+        # No separator under the header: the first row starts at rows_top
+        lines.insert(0, rows_top - 1)
+    strips = [(a + 1, b) for a, b in zip(lines, lines[1:]) if b - a >= 0.8 * pitch]
+
+    inks = [_ink(pixels[a:b]) for a, b in strips]
+    rows = [(ink, (a, b)) for ink, (a, b) in zip(inks, strips) if ink.any()]
+    # Below the last row the grid is empty background: no strips left there means it's all on screen
+    complete = (pixels.shape[0] - lines[-1]) > 1.5 * pitch
+    if not rows:
+        return GridRows([], [], pitch, complete)
+
+    height = int(min(b - a for _ink_mask, (a, b) in rows))
+    x0, x1 = key_span
+    row_masks = np.stack([_align(ink, height) for ink, _span in rows])
+    key_masks = np.stack([_align(ink[:, x0:x1], height) for ink, _span in rows])
+    return GridRows(_hash_masks(row_masks), _hash_masks(key_masks), pitch, complete)
+
+
+# ---------------------------------------------------------------------------
+# Invariants
+# ---------------------------------------------------------------------------
+
+def _grouped(keys: list[int]) -> bool:
+    seen, last = set(), None
+    for key in keys:
+        if key != last and key in seen:
+            return False
+        seen.add(key)
+        last = key
+    return True
+
+
+def check_sort(column: str, before: GridRows, states: list[tuple[str, GridRows]],
+               has_unknowns: bool | None = None) -> OracleResult:
+    """
+    Check the states produced by successive header clicks (mode name, rows)
+    against the state before the first click. has_unknowns is True when the
+    app used its 3-mode cycle for the column (known from the mode numbers).
+    """
+    start = time.perf_counter()
+    result = OracleResult(column)
+    by_mode = dict(states)
+    asc, desc, first = by_mode.get("asc"), by_mode.get("desc"), by_mode.get("unknowns_first")
+
+    if not before.row_hashes:
+        result.add("rows detected", False, "no grid rows found before sorting")
+        result.seconds = time.perf_counter() - start
+        return result
+
+    for mode, rows in states:
+        result.add(f"{mode}: rows detected", bool(rows.row_hashes), f"{len(rows.row_hashes)} rows")
+        if rows.row_hashes:
+            result.add(f"{mode}: equal keys contiguous", _grouped(rows.key_hashes),
+                       f"{len(rows.key_runs())} distinct keys on screen")
+        if before.complete and rows.complete:
+            result.add(f"{mode}: same rows as before", sorted(rows.row_hashes) == sorted(before.row_hashes),
+                       f"{len(rows.row_hashes)} vs {len(before.row_hashes)} rows")
+
+    if asc and desc and asc.row_hashes and desc.row_hashes:
+        asc_runs, desc_runs = asc.key_runs(), desc.key_runs()
+        if len(asc_runs) > 1:
+            result.add("desc differs from asc", desc.row_hashes != asc.row_hashes)
+        if asc.complete and desc.complete and len(asc_runs) > 1:
+            reversed_all = desc_runs == asc_runs[::-1]
+            # Unknowns (last run of asc) stay at the bottom in both directions
+            reversed_known = desc_runs[:-1] == asc_runs[:-1][::-1] and desc_runs[-1] == asc_runs[-1]
+            if has_unknowns:
+                ok, expect = reversed_known, "known values reversed, unknowns last"
+            else:
+                ok, expect = reversed_all or reversed_known, "values reversed"
+            result.add("desc reverses asc", ok, expect)
+
+    if first and asc and first.row_hashes and asc.complete and first.complete:
+        asc_runs = asc.key_runs()
+        expected = [asc_runs[-1]] + asc_runs[:-1]
+        result.add("unknowns-first moves unknowns to top", first.key_runs() == expected)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def print_summary(results: list[OracleResult]):
+    if not results:
+        return
+    print(f"\n  Sort oracle")
+    for r in results:
+        print(f"  {r.column:<12} {'PASS' if r.ok else 'FAIL'} ({r.seconds * 1000:.1f} ms)")
+        for f in r.findings:
+            if not f.ok:
+                print(f"      FAILED {f.check}{': ' + f.detail if f.detail else ''}")
@@ -0,0 +1,292 @@
+"""
+App process sampling for the BotOrNot GUI test harness.
+
+A background thread reads the app process's CPU time, resident memory and
+thread count at a fixed rate while the test runs:
+
+- Linux  — /proc/<pid>/stat and /proc/<pid>/statm, kept open and re-read
+           with pread, so a sample is two syscalls and no process spawn
+- macOS  — proc_pidinfo(PROC_PIDTASKINFO) from libproc through ctypes
+
+Samples are timestamped with time.perf_counter(), the clock timing.py uses,
+so each one falls inside the step that was running when it was taken. The
+run gets a per-step table of peak/average RSS, CPU and threads, a CSV time
+series, counter tracks in the Chrome trace, and optional ceilings that
+fail the run.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import threading
+from dataclasses import dataclass
+
+import timing
+
+MB = 1024 * 1024
+
+
+@dataclass
+class Sample:
+    t: float              # time.perf_counter()
+    cpu_seconds: float    # user + system CPU time used by the process so far
+    rss: int              # resident set size in bytes
+    threads: int
+    cpu_pct: float = 0.0  # CPU use since the previous sample (100 = one core busy)
+
+
+# ---------------------------------------------------------------------------
+# Platform readers: read() -> (cpu_seconds, rss_bytes, threads), or None once the process is gone
+# ---------------------------------------------------------------------------
+
+class _ProcReader:
+    """Linux /proc reader."""
+
+    def __init__(self, pid: int):
+        self._stat = os.open(f"/proc/{pid}/stat", os.O_RDONLY)
+        self._statm = os.open(f"/proc/{pid}/statm", os.O_RDONLY)
+        self._tick = os.sysconf("SC_CLK_TCK")
+        self._page = os.sysconf("SC_PAGE_SIZE")
+
+    def read(self) -> tuple[float, int, int] | None:
+        try:
+            stat = os.pread(self._stat, 4096, 0)
+            statm = os.pread(self._statm, 256, 0)
+        except OSError:
+            return None
+        if not stat:
+            return None
+        # The command name (field 2) may contain spaces; everything after its ')' is fixed
+        fields = stat[stat.rindex(b")") + 2:].split()
+        utime, stime, threads = int(fields[11]), int(fields[12]), int(fields[17])
+        rss_pages = int(statm.split()[1])
+        return (utime + stime) / self._tick, rss_pages * self._page, threads
+
+    def close(self):
+        for fd in (self._stat, self._statm):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class _TaskInfo(ctypes.Structure):
+    # struct proc_taskinfo from <sys/proc_info.h>
+    _fields_ = [
+        ("pti_virtual_size", ctypes.c_uint64),
+        ("pti_resident_size", ctypes.c_uint64),
+        ("pti_total_user", ctypes.c_uint64),
+        ("pti_total_system", ctypes.c_uint64),
+        ("pti_threads_user", ctypes.c_uint64),
+        ("pti_threads_system", ctypes.c_uint64),
+        ("pti_policy", ctypes.c_int32),
+        ("pti_faults", ctypes.c_int32),
+        ("pti_pageins", ctypes.c_int32),
+        ("pti_cow_faults", ctypes.c_int32),
+        ("pti_messages_sent", ctypes.c_int32),
+        ("pti_messages_received", ctypes.c_int32),
+        ("pti_syscalls_mach", ctypes.c_int32),
+        ("pti_syscalls_unix", ctypes.c_int32),
+        ("pti_csw", ctypes.c_int32),
+        ("pti_threadnum", ctypes.c_int32),
+        ("pti_numrunning", ctypes.c_int32),
+        ("pti_priority", ctypes.c_int32),
+    ]
+
+
+class _TimebaseInfo(ctypes.Structure):
+    _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+
+class _LibprocReader:
+    """macOS libproc reader."""
+
+    PROC_PIDTASKINFO = 4
+
+    def __init__(self, pid: int):
+        self._pid = pid
+        self._libproc = ctypes.CDLL(ctypes.util.find_library("proc") or "/usr/lib/libproc.dylib")
+        self._libproc.proc_pidinfo.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_uint64,
+                                               ctypes.c_void_p, ctypes.c_int]
+        self._info = _TaskInfo()
+        # Task times are in Mach absolute time units (nanoseconds on Intel, not on Apple silicon)
+        timebase = _TimebaseInfo()
+        ctypes.CDLL(None).mach_timebase_info(ctypes.byref(timebase))
+        self._to_seconds = timebase.numer / timebase.denom / 1e9
+
+    def read(self) -> tuple[float, int, int] | None:
+        size = ctypes.sizeof(self._info)
+        got = self._libproc.proc_pidinfo(self._pid, self.PROC_PIDTASKINFO, 0, ctypes.byref(self._info), size)
+        if got != size:
+            return None
+        info = self._info
+        cpu = (info.pti_total_user + info.pti_total_system) * self._to_seconds
+        return cpu, info.pti_resident_size, info.pti_threadnum
+
+    def close(self):
+        pass
+
+
+def open_reader(pid: int):
+    """The reader for this platform, or None when the process can't be sampled here."""
+    try:
+        if sys.platform.startswith("linux"):
+            return _ProcReader(pid)
+        if sys.platform == "darwin":
+            return _LibprocReader(pid)
+    except OSError as e:
+        print(f"  WARNING: can't sample process {pid}: {e}")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Sampler
+# ---------------------------------------------------------------------------
+
+class Sampler(threading.Thread):
+    """Samples one process every `interval` seconds until stop() or the process exits."""
+
+    def __init__(self, pid: int, interval: float):
+        super().__init__(name="procstats", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: list[Sample] = []
+        self._reader = open_reader(pid)
+        self._stopping = threading.Event()
+
+    @property
+    def supported(self) -> bool:
+        return self._reader is not None
+
+    def start(self) -> "Sampler":
+        if self.supported:
+            super().start()
+        return self
+
+    def run(self):
+        next_at = time.perf_counter()
+        while not self._stopping.is_set():
+            if not self._take():
+                return
+            # Fixed schedule, so a slow read doesn't stretch every later interval
+            next_at += self.interval
+            self._stopping.wait(max(0.0, next_at - time.perf_counter()))
+
+    def _take(self) -> bool:
+        values = self._reader.read()
+        if values is None:
+            return False
+        now = time.perf_counter()
+        sample = Sample(now, *values)
+        if self.samples:
+            prev = self.samples[-1]
+            if now > prev.t:
+                sample.cpu_pct = (sample.cpu_seconds - prev.cpu_seconds) / (now - prev.t) * 100
+        self.samples.append(sample)
+        timing.counter("app process", now, rss_mb=round(sample.rss / MB, 1),
+                       cpu_pct=round(sample.cpu_pct, 1), threads=sample.threads)
+        return True
+
+    def stop(self) -> list[Sample]:
+        """Take a last sample, stop the thread and return all samples. Safe to call twice."""
+        if not self.supported:
+            return self.samples
+        if self.is_alive():
+            self._stopping.set()
+            self.join()
+            self._take()
+        self._reader.close()
+        self._reader = None
+        return self.samples
+
+
+# ---------------------------------------------------------------------------
+# Summaries and ceilings
+# ---------------------------------------------------------------------------
+
+def _stats(samples: list[Sample]) -> dict:
+    wall = samples[-1].t - samples[0].t
+    cpu = samples[-1].cpu_seconds - samples[0].cpu_seconds
+    return {
+        "samples": len(samples),
+        "rss_peak_mb": round(max(s.rss for s in samples) / MB, 1),
+        "rss_avg_mb": round(sum(s.rss for s in samples) / len(samples) / MB, 1),
+        "rss_growth_mb": round((samples[-1].rss - samples[0].rss) / MB, 1),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_avg_pct": round(cpu / wall * 100, 1) if wall > 0 else 0.0,
+        "cpu_peak_pct": round(max(s.cpu_pct for s in samples[1:]), 1) if len(samples) > 1 else 0.0,
+        "threads_peak": max(s.threads for s in samples),
+    }
+
+
+def step_stats(samples: list[Sample], steps: list["timing.Span"]) -> list[dict]:
+    """Samples grouped by the step they were taken in (steps without samples are left out)."""
+    rows, i = [], 0
+    for s in steps:
+        end = s.end if s.end is not None else float("inf")
+        while i < len(samples) and samples[i].t < s.start:
+            i += 1
+        j = i
+        while j < len(samples) and samples[j].t < end:
+            j += 1
+        if j > i:
+            rows.append({"step": s.name, **_stats(samples[i:j])})
+        i = j
+    return rows
+
+
+def summarize(samples: list[Sample], steps: list["timing.Span"]) -> dict:
+    if not samples:
+        return {"samples": 0, "steps": []}
+    return {**_stats(samples), "steps": step_stats(samples, steps)}
+
+
+@dataclass
+class Ceilings:
+    rss_mb: float | None = None        # peak resident memory
+    cpu_pct: float | None = None       # average CPU over any one step
+    threads: int | None = None         # peak thread count
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in (self.rss_mb, self.cpu_pct, self.threads))
+
+    def check(self, summary: dict) -> list[str]:
+        """Human-readable violations, naming the step that went over."""
+        out = []
+        limits = (("rss_peak_mb", self.rss_mb, "peak RSS", "MB"),
+                  ("cpu_avg_pct", self.cpu_pct, "average CPU", "%"),
+                  ("threads_peak", self.threads, "threads", ""))
+        for key, limit, label, unit in limits:
+            if limit is None:
+                continue
+            worst = max(summary["steps"], key=lambda row: row[key], default=None)
+            if worst and worst[key] > limit:
+                out.append(f"{label} {worst[key]}{unit} > {limit}{unit} during {worst['step']!r}")
+        return out
+
+
+def write_csv(path: str, samples: list[Sample], steps: list["timing.Span"]) -> str:
+    """The raw time series, one row per sample, labelled with its step."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    origin = samples[0].t if samples else 0.0
+    k = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("seconds,step,rss_mb,cpu_pct,threads\n")
+        for s in samples:
+            while k < len(steps) and steps[k].end is not None and steps[k].end <= s.t:
+                k += 1
+            step = steps[k].name if k < len(steps) and steps[k].start <= s.t else ""
+            f.write(f"{s.t - origin:.3f},\"{step}\",{s.rss / MB:.1f},{s.cpu_pct:.1f},{s.threads}\n")
+    return path
+
+
+def print_summary(summary: dict):
+    if not summary.get("samples"):
+        return
+    print(f"\n  {'App process by step':<40} {'RSS peak':>9} {'RSS avg':>9} {'CPU avg':>8} {'CPU peak':>9} {'Threads':>8}")
+    print(f"  {'-'*40} {'-'*9} {'-'*9} {'-'*8} {'-'*9} {'-'*8}")
+    for row in summary["steps"] + [{**summary, "step": "WHOLE RUN"}]:
+        print(f"  {row['step'][:40]:<40} {row['rss_peak_mb']:>7.1f}MB {row['rss_avg_mb']:>7.1f}MB "
+              f"{row['cpu_avg_pct']:>7.1f}% {row['cpu_peak_pct']:>8.1f}% {row['threads_peak']:>8}")
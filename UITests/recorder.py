@@ -0,0 +1,203 @@
+"""
+Video recording for the BotOrNot GUI test harness.
+
+FrameRecorder feeds the harness's own in-process captures (capture.py) to a
+single long-lived ffmpeg process as rawvideo on stdin. The video runs at a
+constant `fps`, and each frame goes into the slot its own grab timestamp
+falls in, so video time lines up with harness time (and with the chapters)
+to within one frame. Only changed frames are grabbed into the queue; the
+slots between them repeat the previous frame, which x264 encodes as skips,
+so idle stretches cost next to nothing.
+
+Every step() of the run becomes a chapter in the final mp4, and the same
+markers are written to <video>.chapters.json.
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+import subprocess
+
+
+class FrameRecorder:
+    """
+    Records a fixed screen region. A sampler thread grabs the region at up to
+    `fps` frames per second and queues changed frames; a writer thread pipes
+    them into ffmpeg at the slot of their grab time. The queue is small and drops frames when ffmpeg falls
+    behind, so memory stays bounded no matter how long the run is.
+    """
+
+    def __init__(self, ffmpeg: str, grab_frame, region: tuple[int, int, int, int], out_path: str,
+                 fps: int = 10, queue_size: int = 6):
+        self.ffmpeg = ffmpeg
+        self.grab_frame = grab_frame
+        self.region = region
+        self.out_path = out_path
+        self.fps = fps
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.chapters = []        # (seconds since start, label)
+        self.encoded = 0
+        self.repeated = 0         # slots filled with the previous frame
+        self.dropped = 0
+        self.unchanged = 0
+        self._size = None
+        self._last_digest = None
+        self._offer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._process = None
+        self._threads = []
+        self._start = 0.0
+        self._end = None
+        self._raw_path = os.path.splitext(out_path)[0] + ".raw.mp4"
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> "FrameRecorder":
+        first = self.grab_frame(self.region)
+        self._size = (first.width, first.height)
+        self._process = subprocess.Popen(
+            [
+                self.ffmpeg, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "bgr0",
+                "-s", f"{first.width}x{first.height}",
+                # Frame n is at n / fps; _write places frames by their grab time
+                "-framerate", str(self.fps),
+                "-i", "-",
+                # libx264 needs even dimensions
+                "-vf", "crop=trunc(iw/2)*2:trunc(ih/2)*2",
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "28", "-preset", "ultrafast",
+                self._raw_path,
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        self._start = first.timestamp
+        self.offer(first)
+        self._threads = [
+            threading.Thread(target=self._sample, name="recorder-sample", daemon=True),
+            threading.Thread(target=self._write, name="recorder-write", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def mark(self, label: str):
+        """Start a new chapter at the current time (called from step())."""
+        self.chapters.append((time.monotonic() - self._start, label))
+
+    def stop(self) -> str | None:
+        """Finish encoding, add chapters, and return the final video path (None on failure)."""
+        self._end = time.monotonic()
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=15)
+        if not self._process:
+            return None
+        stderr = b""
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=30)
+            stderr = self._process.stderr.read()
+        except (BrokenPipeError, subprocess.TimeoutExpired):
+            self._process.kill()
+        if self._process.returncode != 0 or not os.path.exists(self._raw_path):
+            print(f"  [recorder] ffmpeg failed: {stderr.decode(errors='replace').strip()[-500:]}")
+            return None
+
+        self._write_chapters(self._end - self._start)
+        return self.out_path
+
+    # -- frame flow ---------------------------------------------------------
+
+    def offer(self, frame):
+        """Queue a frame if it differs from the previous one. Safe to call from any thread."""
+        if (frame.width, frame.height) != self._size:
+            return
+        digest = hashlib.blake2b(frame.data, digest_size=16).digest()
+        with self._offer_lock:
+            if digest == self._last_digest:
+                self.unchanged += 1
+                return
+            self._last_digest = digest
+        try:
+            self.frames.put_nowait(frame.copy())
+        except queue.Full:
+            self.dropped += 1
+
+    def _sample(self):
+        interval = 1.0 / self.fps
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.offer(self.grab_frame(self.region))
+            except Exception as e:
+                print(f"  [recorder] grab failed: {e}")
+            next_at += interval
+            self._stop.wait(max(0.0, next_at - time.monotonic()))
+
+    def _slot(self, timestamp: float) -> int:
+        return round((timestamp - self._start) * self.fps)
+
+    def _write(self):
+        row_bytes = self._size[0] * 4
+        next_slot = 0     # slot the next write to ffmpeg lands in
+        previous = None
+        try:
+            while not (self._stop.is_set() and self.frames.empty()):
+                try:
+                    frame = self.frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                slot = self._slot(frame.timestamp)
+                if slot < next_slot - 1:
+                    # Its slot is long written (a burst of offers); placing it
+                    # later would push video time away from harness time
+                    self.dropped += 1
+                    continue
+                for _ in range(slot - next_slot):
+                    self._process.stdin.write(previous)
+                    self.repeated += 1
+                data = frame.data
+                if frame.stride != row_bytes:
+                    view = memoryview(data)
+                    data = b"".join(view[r * frame.stride: r * frame.stride + row_bytes]
+                                    for r in range(frame.height))
+                self._process.stdin.write(data)
+                self.encoded += 1
+                next_slot = max(slot, next_slot) + 1
+                previous = data
+            # Hold the last frame until stop() so the video is as long as the chapters
+            for _ in range(self._slot(self._end) - next_slot if previous is not None else 0):
+                self._process.stdin.write(previous)
+                self.repeated += 1
+        except (BrokenPipeError, ValueError):
+            return
+
+    # -- chapters -----------------------------------------------------------
+
+    def _write_chapters(self, duration: float):
+        marks = self.chapters or [(0.0, "run")]
+        with open(os.path.splitext(self.out_path)[0] + ".chapters.json", "w", encoding="utf-8") as f:
+            json.dump([{"start": round(t, 3), "label": label} for t, label in marks], f, indent=2)
+
+        meta_path = os.path.splitext(self.out_path)[0] + ".ffmeta"
+        with open(meta_path, "w", encoding="utf-8") as f:
+            f.write(";FFMETADATA1\n")
+            for i, (t, label) in enumerate(marks):
+                end = marks[i + 1][0] if i + 1 < len(marks) else duration
+                title = label.replace("\\", "\\\\").replace("=", "\\=").replace(";", "\\;").replace("#", "\\#")
+                f.write(f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={int(t * 1000)}\nEND={int(end * 1000)}\ntitle={title}\n")
+
+        mux = subprocess.run(
+            [self.ffmpeg, "-y", "-loglevel", "error", "-i", self._raw_path, "-i", meta_path,
+             "-map_metadata", "1", "-map_chapters", "1", "-c", "copy", self.out_path],
+            capture_output=True, timeout=60,
+        )
+        if mux.returncode == 0:
+            os.remove(self._raw_path)
+        else:
+            # Keep the chapterless video rather than nothing
+            os.replace(self._raw_path, self.out_path)
+        os.remove(meta_path)
@@ -0,0 +1,232 @@
+"""
+Offline reports on BotOrNot harness results.
+
+Reads the JSON files the other commands write, without a display, the app
+or an automation backend:
+
+- run result       — run_ui_test.py --result-json
+- corpus summary   — corpus.py's <out>/summary.json
+- benchmark result — benchmark.py's benchmark.json
+
+`report` prints any of them. `compare` puts two run results (or two
+benchmark results) side by side and flags every figure that got slower by
+more than the threshold, with the benchmark's regression rule. Only the
+standard library and the harness's own formatting helpers are imported, so
+both start in tens of milliseconds on any machine.
+
+Usage:
+    python3 UITests/harness.py report RESULT.json [RESULT.json ...]
+    python3 UITests/harness.py compare OLD.json NEW.json [--threshold 0.2]
+"""
+
+import os
+import re
+import json
+import argparse
+from dataclasses import dataclass
+
+DEFAULT_THRESHOLD = 0.2    # same defaults as benchmark.py
+MIN_DELTA = {"s": 0.02, "MB": 5.0}
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def kind(data: dict) -> str:
+    """"run", "corpus" or "benchmark" — which command wrote this file."""
+    if "counts" in data and "results" in data:
+        return "corpus"
+    if "repeats" in data and "replays" in data:
+        return "benchmark"
+    if "exit_code" in data or "steps" in data:
+        return "run"
+    raise ValueError("not a run result, corpus summary or benchmark result")
+
+
+# ---------------------------------------------------------------------------
+# report
+# ---------------------------------------------------------------------------
+
+def report_run(result: dict):
+    import timing
+    import latency
+    import soak
+    import procstats
+    import scheduler
+
+    replays = result.get("replays") or [result.get("replay", "?")]
+    print(f"  {result.get('status', '?').upper()}  {', '.join(os.path.basename(r) for r in replays)}"
+          f"  ({result.get('steps', '?')} steps, artifacts {result.get('artifacts', '-')})")
+    if result.get("error"):
+        print(f"  ERROR {result['error']}")
+    figures = [(label, result[key]) for label, key in (("build", "build_seconds"), ("launch", "launch_seconds"),
+                                                       ("load", "load_seconds")) if key in result]
+    if figures:
+        print("  " + " | ".join(f"{label} {seconds:.2f}s" for label, seconds in figures))
+    if result.get("startup"):
+        scheduler.print_summary(result["startup"])
+    if result.get("timing"):
+        timing.print_summary(result["timing"])
+    for entry in result.get("session", []):
+        print(f"  {entry['status'].upper():<5} {os.path.basename(entry['replay'])}"
+              f"{'  ' + entry['error'] if entry.get('error') else ''}")
+    oracle = result.get("sort_oracle", [])
+    if oracle:
+        print(f"\n  Sort oracle: {sum(r['ok'] for r in oracle)}/{len(oracle)} columns pass")
+        for r in oracle:
+            for f in r["findings"]:
+                if not f["ok"]:
+                    print(f"      FAILED {r['column']}: {f['check']}{': ' + f['detail'] if f['detail'] else ''}")
+    summary = result.get("sort_latency_summary") or latency.summarize(result.get("sort_latencies", []))
+    latency.print_histograms(summary)
+    if result.get("soak"):
+        soak.print_summary(result["soak"])
+    if result.get("process"):
+        procstats.print_summary(result["process"])
+        for violation in result["process"].get("ceiling_violations", []):
+            print(f"  OVER CEILING: {violation}")
+    visual = result.get("visual", [])
+    if visual:
+        counts = {}
+        for v in visual:
+            counts[v["status"]] = counts.get(v["status"], 0) + 1
+        print(f"\n  Visual: {', '.join(f'{k}={n}' for k, n in sorted(counts.items()))}")
+
+
+def report(path: str):
+    data = load(path)
+    what = kind(data)
+    print(f"\n{'='*60}\n  {path} ({what})\n{'='*60}")
+    if what == "run":
+        report_run(data)
+    elif what == "corpus":
+        import corpus
+        corpus.print_summary(data)
+    else:
+        import benchmark
+        benchmark.print_report(data, benchmark.compare(data, {}), data.get("threshold", DEFAULT_THRESHOLD))
+        for r in data.get("regressions", []):
+            print(f"  REGRESSED when recorded: {os.path.basename(r['replay'])} {r['metric']} {r['stat']} "
+                  f"{r['current']:.3f}s vs {r['baseline']:.3f}s")
+
+
+# ---------------------------------------------------------------------------
+# compare
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Delta:
+    figure: str
+    unit: str              # "s" or "MB"
+    old: float
+    new: float
+
+    @property
+    def change(self) -> float | None:
+        return self.new / self.old - 1 if self.old else None
+
+    def regressed(self, threshold: float) -> bool:
+        return self.new > self.old * (1 + threshold) and self.new - self.old > MIN_DELTA[self.unit]
+
+
+def _step_name(name: str) -> str:
+    """Step names without their number, so runs with different step counts still line up."""
+    return re.sub(r"^\d+\.\s*", "", name)
+
+
+def run_figures(result: dict) -> dict[str, tuple[str, float]]:
+    """The comparable numbers of one run result: name → (unit, value)."""
+    import latency
+
+    out = {}
+    for key in ("launch_seconds", "load_seconds"):
+        if result.get(key) is not None:
+            out[key.replace("_seconds", "")] = ("s", result[key])
+    for row in result.get("timing", []):
+        out[f"step: {_step_name(row['step'])}"] = ("s", row["seconds"])
+    summary = result.get("sort_latency_summary") or latency.summarize(result.get("sort_latencies", []))
+    for g in summary:
+        for stat in ("first_change", "stable"):
+            if g[stat]["n"]:
+                out[f"sort {g['column']} {g['direction']} {stat} p50"] = ("s", g[stat]["p50"])
+    process = result.get("process") or {}
+    if process.get("samples"):
+        out["app peak RSS"] = ("MB", process["rss_peak_mb"])
+        out["app CPU time"] = ("s", process["cpu_seconds"])
+    return out
+
+
+def compare_runs(old: dict, new: dict, threshold: float) -> list[Delta]:
+    a, b = run_figures(old), run_figures(new)
+    deltas = [Delta(name, unit, a[name][1], value) for name, (unit, value) in b.items() if name in a]
+    print(f"\n  {'Figure':<48} {'Old':>10} {'New':>10} {'Change':>8}")
+    print(f"  {'-'*48} {'-'*10} {'-'*10} {'-'*8}")
+    for d in deltas:
+        change = f"{d.change:+.0%}" if d.change is not None else "-"
+        flag = "  REGRESSED" if d.regressed(threshold) else ""
+        old, new = (f"{v:.3f}s" if d.unit == "s" else f"{v:.1f}MB" for v in (d.old, d.new))
+        print(f"  {d.figure[:48]:<48} {old:>10} {new:>10} {change:>8}{flag}")
+    only = sorted(set(a) ^ set(b))
+    if only:
+        print(f"  ({len(only)} figure(s) in only one of the runs, e.g. {only[0]!r})")
+    return deltas
+
+
+def compare(old_path: str, new_path: str, threshold: float = DEFAULT_THRESHOLD) -> int:
+    """Print the comparison. Returns 2 if anything regressed, else 0."""
+    old, new = load(old_path), load(new_path)
+    kinds = kind(old), kind(new)
+    if kinds[0] != kinds[1]:
+        print(f"ERROR: can't compare a {kinds[0]} file with a {kinds[1]} file")
+        return 1
+    print(f"  Comparing {new_path} against {old_path} (threshold {threshold:.0%})")
+    if kinds[0] == "run":
+        regressed = [d for d in compare_runs(old, new, threshold) if d.regressed(threshold)]
+    elif kinds[0] == "benchmark":
+        import benchmark
+        comparisons = benchmark.compare(new, benchmark.baseline_from(old))
+        benchmark.print_report(new, comparisons, threshold)
+        regressed = [c for c in comparisons if c.regressed(threshold)]
+    else:
+        print("ERROR: corpus summaries can't be compared; compare the runs' result.json files instead")
+        return 1
+    if regressed:
+        print(f"\n  REGRESSION: {len(regressed)} figure(s) more than {threshold:.0%} slower")
+        return 2
+    print("\n  No regressions")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Command line (see harness.py)
+# ---------------------------------------------------------------------------
+
+def report_main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="harness.py report",
+                                     description="Print stored run, corpus or benchmark results")
+    parser.add_argument("results", nargs="+", help="result JSON files")
+    args = parser.parse_args(argv)
+    for path in args.results:
+        try:
+            report(path)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {path}: {e}")
+            return 1
+    return 0
+
+
+def compare_main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="harness.py compare",
+                                     description="Compare two run results or two benchmark results")
+    parser.add_argument("old", help="result to compare against")
+    parser.add_argument("new", help="result to check")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        return compare(args.old, args.new, args.threshold)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
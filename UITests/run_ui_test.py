@@ -3,31 +3,62 @@
 BotOrNot GUI Test Harness
 
 Builds and launches the BotOrNot Avalonia app, opens a replay file via the
-macOS file dialog, verifies the player grid loads, clicks column headers to
+native file dialog, verifies the player grid loads, clicks column headers to
 test sorting, and captures screenshots at every major step.
 
-Optionally stitches screenshots into an mp4 if ffmpeg is available.
+Runs against a logged-in macOS session (Quartz backend) or a headless Xvfb
+display on Linux (X11 backend); see backends.py.
+
+Optionally records the run to an mp4 if ffmpeg is available.
 
 Usage:
-    python3 UITests/run_ui_test.py [path/to/replay]
+    python3 UITests/run_ui_test.py [path/to/replay] [--backend auto|quartz|x11]
+                                   [--display :99] [--screen-size 1920x1080]
+
+    python3 UITests/run_ui_test.py --direct path/to/replay   # no file dialog
+    python3 UITests/run_ui_test.py a.replay b.replay c.replay   # one app, replay after replay
+    python3 UITests/run_ui_test.py --benchmark 10 [--bench-threshold 0.2]
+    python3 UITests/run_ui_test.py --max-rss 600 --max-threads 80   # fail on process ceilings
+    python3 UITests/run_ui_test.py --locator pixels   # ignore the accessibility tree
+    python3 UITests/run_ui_test.py --fake-app --fake-args "--fault bad-sort"   # self-test (fakeapp.py)
+    python3 UITests/run_ui_test.py --soak 2h a.replay b.replay   # repeat load + sort, watch for leaks (soak.py)
 
 Exit codes:
     0 = success
     1 = failure
+    2 = benchmark slower than its baseline (--benchmark only)
+    130 = interrupted (Ctrl-C or SIGTERM); everything started is still stopped
 """
 
 import os
 import sys
 import time
 import glob
-import signal
+import json
+import shlex
 import shutil
+import argparse
+import threading
 import subprocess
 
-import pyautogui
-
-# Quartz (CoreGraphics) for window listing without Accessibility permissions
-import Quartz
+import a11y
+import build
+import waits
+import applog
+import visual
+import oracle
+import expected
+import layout
+import timing
+import soak
+import session
+import latency
+import procstats
+import scheduler
+import benchmark
+from capture import ScreenshotWriter
+from recorder import FrameRecorder
+from backends import VirtualDisplay, WindowTracker, create_backend, default_backend_name
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -35,320 +66,292 @@ import Quartz
 
 DOTNET = os.path.expanduser("~/.dotnet/dotnet")
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-SLN_PATH = os.path.join(PROJECT_ROOT, "BotOrNot.sln")
-AVALONIA_PROJECT = os.path.join(PROJECT_ROOT, "BotOrNot.Avalonia")
-SCREENSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshots")
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOT_DIR = os.path.join(UITESTS_DIR, "screenshots")  # overridden by --artifacts
+VIDEO_PATH = os.path.join(UITESTS_DIR, "test_run.mp4")      # overridden by --artifacts
 DEFAULT_REPLAY = os.path.join(
     PROJECT_ROOT,
     "BotOrNot.Tests", "TestData",
     "UnsavedReplay-2026.01.31-15.34.27.replay",
 )
-SCREENCAPTURE = "/usr/sbin/screencapture"
-FFMPEG = "/opt/homebrew/bin/ffmpeg"
-
-# Columns to click for sort testing (visible columns, left-to-right)
-SORT_COLUMNS = ["Name", "Level", "Kills", "Placement"]
+FAKE_APP = os.path.join(UITESTS_DIR, "fakeapp.py")          # stand-in window for --fake-app
+FFMPEG = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+XVFB_DISPLAY = 99  # display number used when the harness starts its own Xvfb
 
-# pyautogui settings
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.3
+# PlayersGrid column headers to click for sort testing (as in MainWindow.axaml)
+SORT_COLUMNS = ["Name", "Level", "Kills", "Place"]
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+_backend = None        # AutomationBackend for this run (see backends.py)
+_display = None        # VirtualDisplay when running headless under Xvfb
 _app_process = None   # holds the subprocess so we can kill on exit
-_app_window_id = None  # Quartz window ID for targeted capture
-_record_process = None  # ffmpeg screen recording process
+_app_output = None    # applog.AppOutputReader draining the app's stdout/stderr
+_tracker = None       # WindowTracker caching the app window's bounds
+_locator = None       # a11y.Locator over the app's accessibility tree, when it has one
+_window_bounds = None  # last known (x, y, w, h) of the app window; screenshots crop to it
+_writer = ScreenshotWriter()  # encodes screenshots to PNG off the main thread
+_recorder = None       # FrameRecorder streaming captured frames into ffmpeg
+_sampler = None        # procstats.Sampler reading the app's CPU, RSS and threads
+_sort_repeats = 1      # header-click cycles per column (--sort-repeats); extra cycles are only timed
+_shots = []           # (label, path) of every screenshot, for the visual check
+_ring = None          # soak.DiskRing that screenshots go to during --soak
+_expected = {}        # expected.ExpectedGrid per replay path: the rows DebugReplay parsed from it
+_expected_thread = None  # background export filling _expected (start_expected / join_expected)
 _step = 0
-
-
-def _cleanup(*_args):
-    """Kill the app and recording processes on exit."""
-    global _app_process, _record_process
-    if _record_process and _record_process.poll() is None:
-        print("\n[cleanup] Stopping screen recording …")
-        _record_process.terminate()
-        try:
-            _record_process.wait(timeout=10)
-        except subprocess.TimeoutExpired:
-            _record_process.kill()
-    if _app_process and _app_process.poll() is None:
-        print("\n[cleanup] Terminating app process …")
-        _app_process.terminate()
-        try:
-            _app_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            _app_process.kill()
-    sys.exit(1)
-
-
-signal.signal(signal.SIGINT, _cleanup)
-signal.signal(signal.SIGTERM, _cleanup)
+_result = {}  # outcome of this run, written to --result-json (see corpus.py)
+_teardown = scheduler.Teardown()  # how to stop everything the run started, unwound in __main__
 
 
 def step(msg: str):
-    """Print a numbered status line."""
+    """
+    Print a numbered status line and start timing the step. The step's span
+    runs until the next step() (see timing.py); clicks, captures, focusing
+    and waits inside it become its sub-spans.
+    """
     global _step
     _step += 1
+    timing.begin_step(f"{_step}. {msg}")
     print(f"\n{'='*60}")
     print(f"  Step {_step}: {msg}")
     print(f"{'='*60}")
+    if _recorder:
+        _recorder.mark(f"Step {_step}: {msg}")
 
 
-def screenshot(label: str) -> str:
-    """Take a screenshot using macOS screencapture. Returns the file path.
-    Uses -l <windowID> to capture the app window across any Space."""
+def screenshot(label: str, region=None) -> str:
+    """
+    Capture the app window (or `region`, or the full screen before the window
+    is known) in-process and queue it for PNG encoding. Returns the file path;
+    the file exists once _writer.flush() has run.
+    """
     os.makedirs(SCREENSHOT_DIR, exist_ok=True)
-    ts = time.strftime("%H%M%S")
-    fname = f"{_step:02d}_{label}_{ts}.png"
-    path = os.path.join(SCREENSHOT_DIR, fname)
+    if _ring:
+        path = _ring.path(label)
+        fname = f"{os.path.basename(path)} ({label})"
+    else:
+        fname = f"{_step:02d}_{label}_{time.strftime('%H%M%S')}.png"
+        path = os.path.join(SCREENSHOT_DIR, fname)
+    if not _backend:
+        print(f"  [screenshot] FAILED to save {fname} (no backend)")
+        return path
     try:
-        # Always use full-screen capture — window-targeted (-l) requires Screen Recording
-        # permission for the specific window ID and can fail silently
-        cmd = [SCREENCAPTURE, "-x", path]
-        subprocess.run(cmd, capture_output=True, timeout=10)
-        if os.path.exists(path):
-            print(f"  [screenshot] {fname}")
-        else:
-            print(f"  [screenshot] FAILED to save {fname}")
+        region = region or _window_bounds or ((0, 0) + _backend.screen_size())
+        start = time.perf_counter()
+        with timing.span(f"screenshot {label}", "io"):
+            frame = _backend.grab_frame(region)
+            _writer.submit(frame, path)
+        _shots.append((label, path))
+        if _recorder and frame.region == _recorder.region:
+            _recorder.offer(frame)
+        print(f"  [screenshot] {fname} ({(time.perf_counter() - start) * 1000:.0f} ms)")
     except Exception as e:
         print(f"  [screenshot] ERROR: {e}")
     return path
 
 
-def run_applescript(script: str) -> str:
-    """Execute an AppleScript snippet and return stdout."""
-    result = subprocess.run(
-        ["osascript", "-e", script],
-        capture_output=True, text=True, timeout=30,
-    )
-    if result.returncode != 0:
-        print(f"  [applescript stderr] {result.stderr.strip()}")
-    return result.stdout.strip()
-
-
-def get_window_info_quartz(owner_hint: str = "BotOrNot") -> dict | None:
+def get_window_info(fresh: bool = False) -> dict | None:
     """
     Return dict with keys: x, y, w, h, window_id
-    Searches ALL windows (all Spaces) so we find the app even if it's on a
-    different Space. Uses kCGWindowListOptionAll instead of OnScreenOnly.
 
-    If _app_window_id is set, prefer matching by window ID for accuracy.
+    Served from the WindowTracker cache unless it was invalidated (focus,
+    dialogs) or fresh=True; see backends.WindowTracker.
     """
-    # Search all windows across all spaces
-    windows = Quartz.CGWindowListCopyWindowInfo(
-        Quartz.kCGWindowListOptionAll | Quartz.kCGWindowListExcludeDesktopElements,
-        Quartz.kCGNullWindowID,
-    )
-
-    # If we have a known window ID, prefer that for re-queries
-    if _app_window_id:
-        for w in windows:
-            if w.get("kCGWindowNumber") == _app_window_id:
-                b = w.get("kCGWindowBounds")
-                if b:
-                    width = int(b.get("Width", 0))
-                    height = int(b.get("Height", 0))
-                    if width > 200 and height > 200:
-                        return {
-                            "x": int(b.get("X", 0)),
-                            "y": int(b.get("Y", 0)),
-                            "w": width,
-                            "h": height,
-                            "window_id": _app_window_id,
-                        }
-
-    # Fall back to name-based search (used during initial discovery)
-    for w in windows:
-        # Must be owned by BotOrNot process exactly
-        owner = (w.get("kCGWindowOwnerName") or "")
-        title = (w.get("kCGWindowName") or "").lower()
-        layer = w.get("kCGWindowLayer", 0)
-
-        if layer != 0:
-            continue
-
-        if owner == "BotOrNot" or "bot or not" in title:
-            b = w.get("kCGWindowBounds")
-            if b:
-                x = int(b.get("X", 0))
-                y = int(b.get("Y", 0))
-                width = int(b.get("Width", 0))
-                height = int(b.get("Height", 0))
-                # Must be a real app window (not a menu bar strip or tiny overlay)
-                if width > 200 and height > 200:
-                    return {
-                        "x": x, "y": y, "w": width, "h": height,
-                        "window_id": w.get("kCGWindowNumber"),
-                    }
-    return None
+    global _window_bounds
+    if not _tracker:
+        return None
+    info = _tracker.refresh() if fresh else _tracker.bounds()
+    if info:
+        _window_bounds = (info["x"], info["y"], info["w"], info["h"])
+    return info
 
 
-def get_window_bounds_quartz(owner_hint: str = "BotOrNot") -> tuple[int, int, int, int] | None:
-    info = get_window_info_quartz(owner_hint)
+def get_window_bounds() -> tuple[int, int, int, int] | None:
+    info = get_window_info()
     if info:
         return (info["x"], info["y"], info["w"], info["h"])
     return None
 
 
+def wait_for_log(pattern: str, label: str, timeout: float, since: int = 0, budget: float | None = None):
+    """Wait for an app status line (see applog.py). Returns the re.Match or None."""
+    start = time.monotonic()
+    with timing.span(label, "sleep", timeout=timeout, budget=budget):
+        match = _app_output.wait_for(pattern, timeout=timeout, since=since)
+    waits.record(label, time.monotonic() - start, budget, match is not None, timeout)
+    return match
+
+
 def wait_for_window(timeout: int = 60) -> tuple[int, int, int, int]:
     """Block until the app window appears at its real size. Returns bounds and stores window ID."""
-    global _app_window_id
     print(f"  Waiting up to {timeout}s for window …")
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        info = get_window_info_quartz()
-        if info:
-            # Wait for the window to reach a real layout size (Avalonia starts at ~500x500)
-            # Real window is typically 800x600 or larger
-            if info["w"] >= 600 and info["h"] >= 400:
-                _app_window_id = info["window_id"]
-                print(f"  Window found: id={_app_window_id} pos=({info['x']},{info['y']}) size=({info['w']}x{info['h']})")
-                return (info["x"], info["y"], info["w"], info["h"])
-            else:
-                print(f"  Window at placeholder size ({info['w']}x{info['h']}), waiting for layout…")
-        time.sleep(1)
-    raise TimeoutError("App window did not appear")
-
-
-def focus_app():
-    """Bring the BotOrNot window to front using osascript (no Accessibility needed)."""
-    # Try activating by process name first, then by window title
-    # dotnet-based Avalonia apps may show up as 'dotnet' in the process list
-    script = 'tell application "System Events" to set frontmost of first process whose name contains "dotnet" to true'
-    result = subprocess.run(
-        ["osascript", "-e", script],
-        capture_output=True, text=True, timeout=5,
+    # The app announces its window once Avalonia has opened it, so the window
+    # lookup below normally succeeds on the first query instead of polling
+    if not wait_for_log(applog.WINDOW_OPENED, "window opened (app log)", timeout):
+        print("  No 'window opened' line from the app; falling back to window polling")
+    seen_placeholder = []
+
+    def window_ready():
+        info = get_window_info(fresh=True)
+        if not info:
+            return None
+        # Wait for the window to reach a real layout size (Avalonia starts at ~500x500)
+        # Real window is typically 800x600 or larger
+        if info["w"] >= 600 and info["h"] >= 400:
+            return info
+        if not seen_placeholder:
+            seen_placeholder.append(info)
+            print(f"  Window at placeholder size ({info['w']}x{info['h']}), waiting for layout…")
+        return None
+
+    info = waits.wait_until(window_ready, timeout=timeout, poll=0.1, label="app window", required=True)
+    print(f"  Window found: id={info['window_id']} pos=({info['x']},{info['y']}) size=({info['w']}x{info['h']})")
+    return (info["x"], info["y"], info["w"], info["h"])
+
+
+def toolbar_region(bounds) -> tuple[int, int, int, int]:
+    """Title bar + toolbar row with the "Select Replay File" button."""
+    wx, wy, ww, wh = bounds
+    return (wx, wy, ww, min(100, wh))
+
+
+def players_grid_region(bounds) -> tuple[int, int, int, int]:
+    """Lower part of the window holding the "Players Seen" header and PlayersGrid."""
+    wx, wy, ww, wh = bounds
+    top = int(wh * 0.55)
+    return (wx, wy + top, ww, wh - top)
+
+
+def settle(label: str, budget: float, region=None, timeout: float | None = None):
+    """Wait until region (default: the whole screen) stops changing.
+    Replaces a fixed time.sleep(budget)."""
+    if region is None:
+        region = (0, 0) + _backend.screen_size()
+    return waits.wait_until(
+        waits.region_stable(_backend.grab, region),
+        timeout=timeout or max(3 * budget, 2.0), poll=0.05, label=label, budget=budget,
     )
-    if result.returncode != 0:
-        # Fallback: use the PID to find and activate
-        if _app_process:
-            script2 = f'tell application "System Events" to set frontmost of first process whose unix id is {_app_process.pid} to true'
-            subprocess.run(
-                ["osascript", "-e", script2],
-                capture_output=True, text=True, timeout=5,
-            )
-    time.sleep(0.5)
 
 
-def move_window_to_current_space(x: int = 100, y: int = 100):
+def resolve_layout(bounds) -> "layout.WindowLayout":
+    """Grid geometry for the window at `bounds`, confirmed against a live capture."""
+    estimate = layout.resolve(bounds, _backend.scale_factor(), _backend.title_bar_height)
+    start = time.perf_counter()
+    geometry = layout.confirm(estimate, _backend.grab_frame(bounds))
+    for name, ok in geometry.confirmed.items():
+        moved = geometry.grid(name).y - estimate.grid(name).y
+        status = f"confirmed, {moved:+.0f}px from estimate" if ok else "NOT confirmed, using estimate"
+        print(f"  [layout] {name} header: {status}")
+    print(f"  [layout] resolved in {(time.perf_counter() - start) * 1000:.0f} ms")
+    _result["layout_confirmed"] = geometry.confirmed
+    return geometry
+
+
+def read_grid_rows(region, rows_top: int, key_span: tuple[int, int]) -> "oracle.GridRows":
     """
-    Bring the BotOrNot window to the current Space and raise it above all other windows.
-    Does NOT maximize — keeps the window at its natural size so coordinate tracking works.
+    Capture `region` and read its grid rows for the sort oracle. rows_top and
+    key_span are screen coordinates; they are mapped into the frame's pixels.
     """
-    if not _app_process:
-        return
-    pid = _app_process.pid
-
-    script = f'''
-tell application "System Events"
-    set theProcess to first process whose unix id is {pid}
-    set frontmost of theProcess to true
-    tell theProcess
-        if (count of windows) > 0 then
-            tell window 1
-                perform action "AXRaise"
-            end tell
-        end if
-    end tell
-end tell
-'''
-    result = subprocess.run(["osascript", "-e", script], capture_output=True, text=True, timeout=10)
-    if result.returncode != 0:
-        print(f"  [move_window] AppleScript error: {result.stderr.strip()}")
-    else:
-        print(f"  Window raised to front")
-    time.sleep(0.5)
+    frame = _backend.grab_frame(region)
+    rx, ry, rw, rh = region
+    sx, sy = frame.width / rw, frame.height / rh   # >1 on Retina displays
+    return oracle.read_rows(
+        oracle.frame_pixels(frame), int((rows_top - ry) * sy),
+        (max(0, int((key_span[0] - rx) * sx)), int((key_span[1] - rx) * sx)),
+    )
 
 
 def focus_app_by_pid():
     """Focus and RAISE the BotOrNot window above all others."""
     if not _app_process:
         return
-    pid = _app_process.pid
-
-    # Method 1: NSRunningApplication activate
-    try:
-        from AppKit import NSRunningApplication, NSApplicationActivateIgnoringOtherApps
-        app = NSRunningApplication.runningApplicationWithProcessIdentifier_(pid)
-        if app:
-            app.activateWithOptions_(NSApplicationActivateIgnoringOtherApps)
-            time.sleep(0.3)
-    except Exception:
-        pass
-
-    # Method 2: AppleScript — set frontmost AND raise the window
-    script = f'''
-tell application "System Events"
-    set theProcess to first process whose unix id is {pid}
-    set frontmost of theProcess to true
-    tell theProcess
-        if (count of windows) > 0 then
-            perform action "AXRaise" of window 1
-        end if
-    end tell
-end tell
-'''
-    subprocess.run(["osascript", "-e", script], capture_output=True, text=True, timeout=10)
-    time.sleep(0.3)
-
-
-def click_at(x: int, y: int, label: str = ""):
-    """Click at absolute coordinates with a log message."""
+    # Quartz focuses through its osascript session; X11 talks to the X server directly
+    with timing.span("focus", "subprocess" if _backend.name == "quartz" else "io") as s:
+        raised = _backend.focus(_app_process.pid)
+        s.args["raised"] = raised
+    if raised and _tracker:
+        # Raising can move the window (e.g. across Spaces); re-query on next use
+        _tracker.invalidate()
+        if _locator:
+            _locator.invalidate()
+
+
+def click_at(x: int, y: int, label: str = "") -> float:
+    """Click at absolute coordinates with a log message. Returns time.monotonic() once the click was posted."""
     print(f"  [click] ({x}, {y}){' – ' + label if label else ''}")
-    pyautogui.click(x, y)
-    time.sleep(0.5)
-
-
-def start_recording(crop: dict | None = None) -> str:
-    """Start ffmpeg screen recording. Returns output path.
-    crop: optional dict with x, y, w, h to crop to window bounds."""
-    global _record_process
-    out = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_run.mp4")
-
-    vf_filters = []
-    if crop:
-        # Ensure even dimensions (required by libx264)
-        cw = crop["w"] if crop["w"] % 2 == 0 else crop["w"] - 1
-        ch = crop["h"] if crop["h"] % 2 == 0 else crop["h"] - 1
-        vf_filters.append(f"crop={cw}:{ch}:{crop['x']}:{crop['y']}")
-        print(f"  Cropping to window: x={crop['x']} y={crop['y']} w={cw} h={ch}")
-
-    cmd = [
-        FFMPEG, "-y",
-        "-f", "avfoundation",
-        "-framerate", "10",
-        "-i", "0",  # Capture screen 0
-    ]
-    if vf_filters:
-        cmd += ["-vf", ",".join(vf_filters)]
-    cmd += [
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
-        "-crf", "28",
-        "-preset", "ultrafast",
-        out,
-    ]
-    print(f"  Starting screen recording → {out}")
-    _record_process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    time.sleep(1)  # let ffmpeg spin up
-    return out
-
-
-def stop_recording(out_path: str):
-    """Stop ffmpeg recording gracefully."""
-    global _record_process
-    if _record_process and _record_process.poll() is None:
-        print("  Stopping screen recording …")
-        _record_process.terminate()
-        try:
-            _record_process.wait(timeout=15)
-        except subprocess.TimeoutExpired:
-            _record_process.kill()
-        _record_process = None
-    if os.path.exists(out_path):
-        print(f"  Video saved ({os.path.getsize(out_path)} bytes): {out_path}")
+    with timing.span(f"click {label}" if label else "click", "io", x=x, y=y):
+        _backend.click(x, y)
+        return time.monotonic()
+
+
+def start_locator(args: argparse.Namespace):
+    """Index the app's accessibility tree (see a11y.py). --locator a11y makes a missing tree fatal."""
+    global _locator
+    if args.locator == "pixels":
+        print("  Locator: pixel layout (--locator pixels)")
+        return
+    with timing.span("index accessibility tree", "io"):
+        _locator, note = a11y.create_locator(_app_process.pid)
+    if _locator is None:
+        if args.locator == "a11y":
+            raise RuntimeError(f"no accessibility tree: {note}")
+        print(f"  Locator: pixel layout ({note})")
+        return
+    _teardown.push("accessibility tree", _locator.close)
+    print(f"  Locator: {note}")
+
+
+def tree_rows_match(grid: str, rows: int) -> bool | None:
+    """Wait until the accessibility tree shows `rows` rows in `grid`. None without a tree."""
+    if not _locator:
+        return None
+    last = []
+
+    def shown():
+        state = _locator.grid_state(grid)
+        last[:] = [state.rows if state else None]
+        return state is not None and state.rows == rows
+
+    ok = waits.wait_until(shown, timeout=2, poll=0.02, label=f"{grid} rows (a11y)")
+    print(f"  [a11y] {grid}: {last[0] if last[0] is not None else 'no'} rows in the accessibility tree")
+    return ok
+
+
+def send_command(command: str):
+    """Send one line to the app's stdin command channel (the app runs with --commands)."""
+    _app_process.stdin.write(f"{command}\n".encode())
+    _app_process.stdin.flush()
+
+
+def start_recording(region) -> bool:
+    """Start recording `region` (the app window) through FrameRecorder. Returns False without ffmpeg."""
+    global _recorder
+    if not os.path.exists(FFMPEG):
+        print(f"  ffmpeg not found at {FFMPEG}; skipping video")
+        return False
+    print(f"  Recording window region {region} → {VIDEO_PATH}")
+    with timing.span("start ffmpeg", "subprocess"):
+        _recorder = FrameRecorder(FFMPEG, _backend.grab_frame, region, VIDEO_PATH).start()
+    _teardown.push("stop recording", stop_recording)
+    _recorder.mark(f"Step {_step}: recording started")
+    return True
+
+
+def stop_recording():
+    """Finish the video and report how many frames were encoded vs skipped."""
+    global _recorder
+    if not _recorder:
+        return
+    print("  Stopping screen recording …")
+    rec, _recorder = _recorder, None
+    with timing.span("finish video", "subprocess"):
+        out = rec.stop()
+    print(f"  Frames encoded: {rec.encoded}, unchanged (skipped): {rec.unchanged}, "
+          f"repeated: {rec.repeated}, dropped: {rec.dropped}")
+    if out and os.path.exists(out):
+        print(f"  Video saved ({os.path.getsize(out)} bytes, {len(rec.chapters)} chapters): {out}")
     else:
         print("  WARNING: video file not found")
 
@@ -357,48 +360,741 @@ def stop_recording(out_path: str):
 # Main test flow
 # ---------------------------------------------------------------------------
 
-def main():
-    global _app_process
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="BotOrNot GUI test harness")
+    parser.add_argument("replays", nargs="*", metavar="replay", default=[DEFAULT_REPLAY],
+                        help="replay file(s) to open (default: bundled test replay); "
+                             "several replays are loaded into one app (see --warm)")
+    parser.add_argument("--backend", choices=["auto", "quartz", "x11"], default="auto",
+                        help="automation backend (default: quartz on macOS, x11 elsewhere)")
+    parser.add_argument("--display", default=None,
+                        help="existing X display to use (x11 only); default starts a private Xvfb")
+    parser.add_argument("--screen-size", default="1920x1080",
+                        help="Xvfb screen size when the harness starts its own display")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="build even if no app sources changed since the last build")
+    parser.add_argument("--artifacts", default=None,
+                        help="directory for screenshots, logs and video (default: UITests/screenshots)")
+    parser.add_argument("--result-json", default=None,
+                        help="write a machine-readable summary of the run to this file")
+    parser.add_argument("--baselines", default=visual.BASELINE_DIR,
+                        help="golden screenshot directory for the visual check")
+    parser.add_argument("--update-baselines", action="store_true",
+                        help="write new and mismatching screenshots as the golden images")
+    parser.add_argument("--no-visual", action="store_true", help="skip the visual regression check")
+    parser.add_argument("--no-expected", action="store_true",
+                        help="don't check the sorted grid against DebugReplay's parse of the replay (expected.py)")
+    parser.add_argument("--warm", action="store_true",
+                        help="load the replay(s) through the app's command channel in one app process, "
+                             "checking for state left over between loads (implied by several replays)")
+    parser.add_argument("--direct", action="store_true",
+                        help="pass the replay on the app's command line instead of using the file dialog")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="run the whole test N times and report latency percentiles (see benchmark.py)")
+    parser.add_argument("--bench-baseline", default=None,
+                        help="benchmark baseline JSON (default: UITests/benchmarks/<backend>.json)")
+    parser.add_argument("--bench-threshold", type=float, default=benchmark.DEFAULT_THRESHOLD,
+                        help="allowed slowdown vs the baseline as a fraction (default: %(default)s)")
+    parser.add_argument("--update-bench-baseline", action="store_true",
+                        help="store this benchmark's results as the new baseline")
+    parser.add_argument("--sort-repeats", type=int, default=1, metavar="N",
+                        help="click each column's sort cycle N times for the latency histograms (default: 1)")
+    parser.add_argument("--sample-rate", type=float, default=10, metavar="HZ",
+                        help="app CPU/RSS/thread samples per second; 0 turns sampling off (default: %(default)s)")
+    parser.add_argument("--max-rss", type=float, default=None, metavar="MB",
+                        help="fail if the app's resident memory peaks above this")
+    parser.add_argument("--max-cpu", type=float, default=None, metavar="PCT",
+                        help="fail if the app's average CPU over any step is above this (100 = one core)")
+    parser.add_argument("--max-threads", type=int, default=None, metavar="N",
+                        help="fail if the app runs more threads than this")
+    parser.add_argument("--locator", choices=["auto", "a11y", "pixels"], default="auto",
+                        help="find controls in the accessibility tree (a11y), the screen (pixels), "
+                             "or the tree when the app has one (default)")
+    parser.add_argument("--fake-app", action="store_true",
+                        help="drive the stand-in window in fakeapp.py instead of building and launching BotOrNot "
+                             "(harness self-test; implies --no-visual and, unless given, --locator pixels)")
+    parser.add_argument("--fake-args", default="", metavar="ARGS",
+                        help='options for fakeapp.py with --fake-app, e.g. "--load-delay 2 --fault bad-sort"')
+    parser.add_argument("--soak", type=soak.parse_duration, default=None, metavar="DURATION",
+                        help="repeat the load and sort cycle over the replays for this long (e.g. 30m, 2h) "
+                             "in one app, checking memory and timings for trends (see soak.py)")
+    parser.add_argument("--soak-iterations", type=int, default=0, metavar="N",
+                        help="soak for N iterations (with --soak: whichever ends first)")
+    parser.add_argument("--ring-frames", type=int, default=60, metavar="N",
+                        help="screenshots kept on disk during a soak, oldest overwritten (default: %(default)s)")
+    parser.add_argument("--keep-after", type=int, default=10, metavar="N",
+                        help="screenshots kept after a failed soak iteration, besides the ring (default: %(default)s)")
+    parser.add_argument("--max-rss-slope", type=float, default=soak.DEFAULT_RSS_SLOPE, metavar="MB",
+                        help="fail a soak whose app memory grows faster than this per iteration "
+                             "(default: %(default)s)")
+    parser.add_argument("--max-drift", type=float, default=soak.DEFAULT_DRIFT, metavar="FRACTION",
+                        help="fail a soak whose load, sort or iteration time grows by more than this "
+                             "fraction over the run (default: %(default)s)")
+    parser.add_argument("--trace", default=None,
+                        help="Chrome trace-event file for the step timings (default: <artifacts>/trace.json)")
+    args = parser.parse_args(argv)
+    args.replay = args.replays[0]
+    args.soaking = args.soak is not None or args.soak_iterations > 0
+    # A soak is a long warm session; its screenshots are overwritten, so there is nothing to compare
+    args.warm = args.warm or args.soaking or len(args.replays) > 1
+    args.no_visual = args.no_visual or args.soaking
+    if args.fake_app:
+        # The stand-in looks nothing like the visual baselines and has no accessibility tree to wait for
+        args.no_visual = True
+        if args.locator == "auto":
+            args.locator = "pixels"
+    return args
+
+
+def write_result(path: str, code: int):
+    """Dump _result plus the wait records as JSON (consumed by corpus.py)."""
+    _result.update({
+        "exit_code": code,
+        "status": "pass" if code == 0 else "fail",
+        "steps": _step,
+        "artifacts": SCREENSHOT_DIR,
+        "waits": [{"label": r.label, "seconds": round(r.elapsed, 3), "budget": r.budget, "ok": r.ok}
+                  for r in waits.records()],
+        "timing": timing.step_summary(),
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_result, f, indent=2)
+
+
+def check_visual(args: argparse.Namespace, replay_path: str, shots=None) -> list["visual.VisualResult"]:
+    """Compare screenshots (default: all of this run's) with the replay's golden images."""
+    replay_name = os.path.splitext(os.path.basename(replay_path))[0]
+    store = visual.BaselineStore(_backend.name, replay_name, args.baselines)
+    # Only the last screenshot per label counts (sorting may revisit a label)
+    latest = dict(_shots if shots is None else shots)
+    results = visual.check(list(latest.items()), store, update=args.update_baselines)
+    visual.print_summary(results)
+    return results
+
+
+def report_sort_latency():
+    """Per column and direction percentiles and histograms of this run's header-click latencies."""
+    summary = latency.summarize(_result.get("sort_latencies", []))
+    _result["sort_latency_summary"] = summary
+    latency.print_histograms(summary)
+
+
+def finish_sampler(args: argparse.Namespace) -> list[str]:
+    """Stop sampling the app, store and print its per-step stats. Returns ceiling violations."""
+    global _sampler
+    if not _sampler:
+        return []
+    sampler, _sampler = _sampler, None
+    samples = sampler.stop()
+    steps = timing.steps()
+    summary = procstats.summarize(samples, steps)
+    if samples:
+        summary["csv"] = procstats.write_csv(os.path.join(SCREENSHOT_DIR, "process.csv"), samples, steps)
+    procstats.print_summary(summary)
+    ceilings = procstats.Ceilings(args.max_rss, args.max_cpu, args.max_threads)
+    over = ceilings.check(summary) if ceilings and samples else []
+    summary["ceiling_violations"] = over
+    _result["process"] = summary
+    for violation in over:
+        print(f"  OVER CEILING: {violation}")
+    return over
+
+
+def start_backend(args: argparse.Namespace):
+    """Create the automation backend, starting Xvfb first when running headless."""
+    global _backend, _display
+    name = default_backend_name() if args.backend == "auto" else args.backend
+    display_name = args.display
+    if name == "x11" and not display_name:
+        _display = VirtualDisplay(XVFB_DISPLAY, size=args.screen_size).start()
+        _teardown.push("stop Xvfb", _display.stop)
+        display_name = _display.name
+        print(f"  Started Xvfb on {display_name} ({args.screen_size})")
+    _backend = create_backend(name, display_name)
+    _teardown.push("close backend", _backend.close)
+    # Pay for the capture path's first use (X connection, Quartz frameworks) while the build runs
+    with timing.span("warm capture", "io"):
+        _backend.grab_frame((0, 0, 16, 16))
+    print(f"  Backend: {_backend.name}")
+
+
+def clean_screenshots():
+    """Remove screenshots left by a previous run."""
+    if os.path.isdir(SCREENSHOT_DIR):
+        for f in glob.glob(os.path.join(SCREENSHOT_DIR, "*.png")):
+            os.remove(f)
+
 
-    replay_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_REPLAY
-    replay_path = os.path.abspath(replay_path)
+def build_app(args: argparse.Namespace) -> "build.BuildResult":
+    """Build the app unless its sources are unchanged. Raises if the build fails."""
+    if args.fake_app:
+        print(f"  Using the stand-in window {FAKE_APP}; nothing to build")
+        return build.BuildResult(ok=True, skipped=True, seconds=0.0, dll=FAKE_APP)
+    with timing.span("dotnet build", "subprocess", forced=args.rebuild) as s:
+        result = build.ensure_built(DOTNET, "Debug", force=args.rebuild)
+        s.args["cached"] = result.skipped
+    _result["build_seconds"] = round(result.seconds, 3)
+    _result["build_cached"] = result.skipped
+    if not result.ok:
+        print(f"  BUILD FAILED:\n{result.output}")
+        _result["error"] = "build failed"
+        raise RuntimeError("build failed")
+    if result.skipped:
+        print(f"  Sources unchanged, reusing {result.dll} ({result.seconds:.2f}s)")
+    else:
+        print(f"  Build succeeded in {result.seconds:.1f}s")
+    return result
+
+
+def start_expected(args: argparse.Namespace):
+    """
+    Load the expected rows on a background thread. A cache miss builds
+    DebugReplay and parses every replay, which must not count as launch
+    time, so nothing waits for it until join_expected() before the first load.
+    """
+    global _expected_thread
+    if args.no_expected:
+        return
+    _expected_thread = threading.Thread(target=load_expected, args=(args,), name="expected-rows", daemon=True)
+    _expected_thread.start()
+
+
+def join_expected():
+    """Wait for start_expected()'s export to finish."""
+    if _expected_thread:
+        with timing.span("wait for expected rows", "sleep"):
+            _expected_thread.join()
+
+
+def load_expected(args: argparse.Namespace) -> dict:
+    """The rows each replay should show, from the expected-grid cache or an export (see expected.py)."""
+    global _expected
+    exporter = expected.fake_exporter(args.fake_args) if args.fake_app else expected.debug_replay_exporter(DOTNET)
+    try:
+        with timing.span("expected rows", "subprocess"):
+            _expected = expected.load(args.replays, exporter)
+    except (expected.ExportError, OSError) as e:
+        # Ground truth is extra: without it the sort oracle's own invariants still run
+        print(f"  WARNING: no expected rows, the sorted grid is only checked for consistency: {e}")
+        return {}
+    expected.print_summary(_expected)
+    _result["expected"] = [{"replay": g.replay, "players": g.count, "source": g.source,
+                            "seconds": round(g.seconds, 3)} for g in _expected.values()]
+    return _expected
+
+
+def launch_app(args: argparse.Namespace, dll: str) -> float:
+    """Start the built app and everything that watches it. Returns time.monotonic() at the spawn."""
+    global _app_process, _app_output, _tracker, _sampler
+    # Run the built assembly directly; `dotnet run` would re-evaluate the project first
+    launch_start = time.monotonic()
+    if args.warm:
+        app_args = ["--commands"]   # replays are sent one by one over stdin
+    elif args.direct:
+        app_args = ["--replay", args.replays[0]]
+    else:
+        app_args = []
+    if args.fake_app:
+        command = [sys.executable, dll] + shlex.split(args.fake_args) + app_args
+    else:
+        command = [DOTNET, dll] + app_args
+    with timing.span("spawn app", "subprocess"):
+        _app_process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if args.warm else None,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env=os.environ.copy(),  # carries DISPLAY when running under Xvfb
+        )
+    print(f"  PID: {_app_process.pid}")
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    _app_output = applog.AppOutputReader(_app_process, os.path.join(SCREENSHOT_DIR, "app_output.log")).start()
+    # The reader only finishes once the app is gone, so it is closed after stop_app
+    _teardown.push("close app output", _app_output.close)
+    _teardown.push("stop app", stop_app)
+    _tracker = WindowTracker(_backend, pid=_app_process.pid)
+    print(f"  App output → {_app_output.log_path}")
+    if args.sample_rate > 0:
+        _sampler = procstats.Sampler(_app_process.pid, 1 / args.sample_rate).start()
+        _teardown.push("stop process sampler", lambda: finish_sampler(args))
+        if not _sampler.supported:
+            print("  WARNING: app process sampling isn't available on this platform")
+    return launch_start
+
+
+def stop_app():
+    """Terminate the app if it is still running."""
+    if _app_process and _app_process.poll() is None:
+        _app_process.terminate()
+        try:
+            _app_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _app_process.kill()
+        print("  App terminated")
 
-    if not os.path.isfile(replay_path):
-        print(f"ERROR: Replay file not found: {replay_path}")
+
+def start_up(args: argparse.Namespace) -> tuple["build.BuildResult", float] | None:
+    """
+    Steps 1-2 as a dependency graph (see scheduler.py): clean-up, display and
+    build at once, then the launch. Returns (build result, launch time) or
+    None if a task failed.
+    """
+    graph = scheduler.StepGraph()
+    graph.add("clean screenshots", clean_screenshots, kind="io")
+    graph.add("display + backend", lambda: start_backend(args))
+    graph.add("build", lambda: build_app(args))
+    graph.add("launch", lambda: launch_app(args, graph.tasks["build"].result.dll),
+              after=("build", "display + backend"))
+    # After the app build, as DebugReplay builds from the same BotOrNot.Core; only started here
+    graph.add("start expected rows", lambda: start_expected(args), after=("build",))
+    try:
+        results = graph.run()
+    except scheduler.TaskFailed as e:
+        print(f"  FAILED: {e}")
+        _result.setdefault("error", str(e))
+        return None
+    finally:
+        graph.print_summary()
+        _result["startup"] = graph.summary()
+    return results["build"], results["launch"]
+
+
+def click_header(meter: "latency.LatencyMeter", col_name: str, col_x: int, header_y: int,
+                 fallback_mode: int) -> tuple[int, "latency.Measurement"]:
+    """
+    Click a PlayersGrid header once and time the repaint. Returns the sort mode
+    the app reported (fallback_mode if it reported none) and the latency
+    measurement. The mode is read from the grid's accessibility element when
+    there is a tree, else from the app's status line.
+    """
+    # Re-focus before every click to ensure BotOrNot is frontmost
+    focus_app_by_pid()
+    mark = _app_output.mark()
+    before = _locator.grid_state("PlayersGrid") if _locator else None
+    meter.reference()
+    clicked = click_at(col_x, header_y, f"{col_name} header")
+    # Capture straight away; the sort state is read once the grid has settled
+    measured = meter.measure(col_name, "?", clicked, label=f"sort {col_name}", budget=1.8)
+    if before is not None:
+        def sorted_state():
+            state = _locator.grid_state("PlayersGrid")
+            return state if state is not None and state != before and state.column == col_name else None
+
+        state = waits.wait_until(sorted_state, timeout=3, poll=0.02, label=f"sort {col_name} (a11y)")
+        mode = state.mode if state else fallback_mode
+    else:
+        sorted_line = wait_for_log(applog.GRID_SORTED, f"sort {col_name} (app log)", timeout=3, since=mark)
+        mode = int(sorted_line.group("mode")) if sorted_line else fallback_mode
+    measured.direction = oracle.MODE_NAMES[mode]
+    if measured.first_change is not None:
+        print(f"  {col_name} {measured.direction}: first change {measured.first_change * 1000:.0f} ms, "
+              f"stable {measured.stable * 1000:.0f} ms ({measured.frames} frames)")
+    else:
+        print(f"  {col_name} {measured.direction}: the grid did not change")
+    if measured.first_change is None or not measured.settled:
+        save_latency_frames(meter, f"sort_{col_name}_{measured.direction}")
+    return mode, measured
+
+
+def save_latency_frames(meter: "latency.LatencyMeter", label: str):
+    """Queue the frames still in the meter's ring as PNGs, for a click that never repainted or settled."""
+    frames = meter.ring.frames()
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    for i, frame in enumerate(frames):
+        name = f"{label}_ring{i:02d}"
+        path = _ring.path(name) if _ring else os.path.join(SCREENSHOT_DIR, f"{_step:02d}_{name}.png")
+        _writer.submit(frame, path)
+    print(f"  [latency] kept the last {len(frames)} captured frames ({label}_ringNN)")
+
+
+def test_sorting(bounds, latencies: list, truth: "expected.ExpectedGrid | None" = None) -> list["oracle.OracleResult"]:
+    """
+    Click each of SORT_COLUMNS through its sort cycle and check every state
+    with the sort oracle, and against the replay's parsed rows (`truth`)
+    when there are any. Header-click latencies (latency.Measurement dicts)
+    are appended to `latencies`; with --sort-repeats N the cycle is clicked
+    N-1 more times per column for timing only.
+    """
+    # Query window bounds BEFORE focusing (focus can temporarily confuse the window list)
+    info = get_window_info()
+    if info:
+        bounds = (info["x"], info["y"], info["w"], info["h"])
+        print(f"  Window bounds for sorting: {bounds}")
+    else:
+        print(f"  WARNING: could not re-query bounds, using last known: {bounds}")
+    focus_app_by_pid()
+
+    # Click targets come from MainWindow.axaml, confirmed against the live window
+    geometry = resolve_layout(bounds)
+    grid = geometry.grid_region("PlayersGrid")
+    rows_top = geometry.rows_top("PlayersGrid")
+    meter = latency.LatencyMeter(_backend, grid)
+
+    sort_results = []
+    try:
+        for col_name in SORT_COLUMNS:
+            # The header's own accessibility element when there is a tree, else the resolved layout
+            target = _locator.header_target("PlayersGrid", col_name) if _locator else None
+            col_x, header_y = target or geometry.header_target("PlayersGrid", col_name)
+            key_span = geometry.column_span("PlayersGrid", col_name)
+            before_rows = read_grid_rows(grid, rows_top, key_span)
+            states, modes = [], []
+            # Click through the column's mode cycle: asc, [unknowns-first,] desc
+            for click in range(3):
+                print(f"\n  Sorting by {col_name} (click {click + 1}) …")
+                # No status line: assume the 2-mode cycle
+                mode, measured = click_header(meter, col_name, col_x, header_y, 1 if click == 0 else 0)
+                latencies.append(measured.to_dict())
+                screenshot(f"sort_{col_name}_{measured.direction}")
+                states.append((measured.direction, read_grid_rows(grid, rows_top, key_span)))
+                modes.append(mode)
+                if mode == 0:
+                    break
+            checked = oracle.check_sort(col_name, before_rows, states, has_unknowns=2 in modes)
+            if truth:
+                expected.check(checked, truth, col_name, states, modes)
+            sort_results.append(checked)
+
+            for repeat in range(1, _sort_repeats):
+                print(f"\n  Timing {col_name} sort cycle again ({repeat + 1}/{_sort_repeats}) …")
+                for mode in modes:
+                    _mode, measured = click_header(meter, col_name, col_x, header_y, mode)
+                    latencies.append(measured.to_dict())
+    finally:
+        meter.close()
+    return sort_results
+
+
+def load_in_session(replay_path: str, bounds, previous: str | None) -> "session.ReplayOutcome":
+    """
+    Load one replay into the running app through its command channel and
+    check it the way a cold run would, plus for state left from `previous`
+    (the replay loaded before it, if any). See session.py.
+    """
+    outcome = session.ReplayOutcome(replay_path)
+    first_shot = len(_shots)
+    grid = players_grid_region(bounds)
+
+    # Back to what a fresh window shows: no filter, no sort
+    mark = _app_output.mark()
+    send_command("reset")
+    outcome.add("view reset", wait_for_log(applog.VIEW_RESET, "view reset", timeout=5, since=mark) is not None)
+
+    before = waits.region_fingerprint(_backend.grab, grid)
+    mark = _app_output.mark()
+    send_command(f"open {replay_path}")
+    done = wait_for_log(f"{applog.GRID_POPULATED}|{applog.REPLAY_FAILED}", "replay loaded + grid populated",
+                        timeout=120, since=mark, budget=5)
+    if done is None or done.group("error") is not None:
+        outcome.error = "replay load timed out" if done is None else f"replay load error: {done.group('error')}"
+        print(f"  FAILED: {outcome.error}")
+        screenshot("replay_load_failed")
+        outcome.shots = _shots[first_shot:]
+        return outcome
+
+    outcome.rows = int(done.group("rows"))
+    loaded = _app_output.find(applog.REPLAY_LOADED, since=mark)
+    replay_name = os.path.basename(replay_path)
+    outcome.add("requested file loaded", loaded is not None and loaded.group("file") == replay_name,
+                f"app loaded {loaded.group('file') if loaded else 'nothing'}, expected {replay_name}")
+    players = int(loaded.group("players")) if loaded else None
+    outcome.add("every player shown", outcome.rows == players, f"{outcome.rows} rows for {players} players")
+    truth = _expected.get(replay_path)
+    if truth:
+        outcome.add("rows as parsed", outcome.rows == truth.count, f"{outcome.rows} rows, {truth.count} players parsed")
+    if _locator:
+        outcome.add("rows in the accessibility tree", tree_rows_match("PlayersGrid", outcome.rows),
+                    f"PlayersGrid's accessibility element doesn't show {outcome.rows} rows")
+    loading = _app_output.find_line(applog.REPLAY_LOADING, since=mark)
+    populated = _app_output.find_line(applog.GRID_POPULATED, since=mark)
+    if loading and populated:
+        outcome.load_seconds = round(populated.time - loading.time, 3)
+        print(f"  Load command → grid populated: {outcome.load_seconds:.2f}s, {outcome.rows} rows")
+
+    focus_app_by_pid()
+    settle("grid painted", 0.5, region=grid)
+    if previous and os.path.abspath(previous) != os.path.abspath(replay_path):
+        outcome.add("grid repainted", waits.region_fingerprint(_backend.grab, grid) != before,
+                    f"PlayersGrid still shows {os.path.basename(previous)}")
+
+    mark = _app_output.mark()
+    send_command("state")
+    state = wait_for_log(applog.VIEW_STATE, "view state", timeout=5, since=mark)
+    if state:
+        clean = state.group("filter") == "" and state.group("sorts") == "0"
+        outcome.add("no filter or sort left over", clean,
+                    f"filter={state.group('filter')!r} sorts={state.group('sorts')}")
+    else:
+        outcome.add("no filter or sort left over", False, "no view state line from the app")
+
+    screenshot("replay_loaded")
+    outcome.sort_results = test_sorting(bounds, outcome.sort_latencies, truth)
+    outcome.shots = _shots[first_shot:]
+    return outcome
+
+
+def open_replay_via_dialog(bounds, replay_path: str) -> int:
+    """
+    Steps 4-5: click "Select Replay File" and type the path into the native
+    file dialog. Returns the app log mark taken just before the click.
+    """
+    step("Clicking 'Select Replay File' button")
+
+    # Get bounds BEFORE focusing (focus can temporarily confuse the window list)
+    info = get_window_info()
+    if info:
+        bounds = (info["x"], info["y"], info["w"], info["h"])
+        print(f"  Fresh window bounds: {bounds}")
+    wx, wy, _ww, _wh = bounds
+    focus_app_by_pid()
+    # Only status lines printed after this point belong to the replay we are about to open
+    load_mark = _app_output.mark()
+
+    target = _locator.target("OpenButton") if _locator else None
+    if target:
+        btn_x, btn_y = target
+    else:
+        # The button "Select Replay File" is on the left side of the toolbar,
+        # below the title bar (~28px on macOS, none on a bare X server).
+        btn_x = wx + 148   # "Select Replay File" button center (~148px from left edge)
+        btn_y = wy + _backend.title_bar_height + 24   # toolbar row: 8px margin, 32px tall
+    click_at(btn_x, btn_y, "Select Replay File" if target else "Select Replay File area")
+    settle("file dialog opened", 2)
+    screenshot("after_button_click")
+
+    step("Entering replay file path in file dialog")
+    with timing.span("type path into dialog", "io"):
+        _backend.open_path_in_dialog(replay_path, snapshot=screenshot,
+                                     settle=lambda label, budget: settle(label, budget))
+    _tracker.invalidate()
+    screenshot("file_dialog_confirmed")
+    return load_mark
+
+
+def load_and_sort(args: argparse.Namespace, replay_path: str, bounds) -> list["oracle.OracleResult"] | None:
+    """Steps 4-7 of a cold run: open the replay, wait for it, test sorting. None if it didn't load."""
+    if args.direct:
+        # The app was started with the replay on its command line and is loading it already
+        load_mark = 0
+    else:
+        load_mark = open_replay_via_dialog(bounds, replay_path)
+
+    step("Waiting for replay to load")
+    # Large replays can take well over the old fixed 5 s, small ones far less.
+    # The app reports "grid populated" after binding and layout, or "replay failed".
+    done = wait_for_log(f"{applog.GRID_POPULATED}|{applog.REPLAY_FAILED}", "replay loaded + grid populated",
+                        timeout=120, since=load_mark, budget=5)
+    if done is None:
+        print("  FAILED: the app never reported the replay as loaded")
+        _result["error"] = "replay load timed out"
+        screenshot("replay_load_timeout")
+        return None
+    if done.group("error") is not None:
+        print(f"  FAILED: replay load error: {done.group('error')}")
+        _result["error"] = f"replay load error: {done.group('error')}"
+        screenshot("replay_load_failed")
+        return None
+    print(f"  PlayersGrid populated with {done.group('rows')} rows")
+    _result["rows"] = int(done.group("rows"))
+    truth = _expected.get(replay_path)
+    if truth and truth.count != _result["rows"]:
+        print(f"  FAILED: {truth.count} players parsed from the replay, {_result['rows']} rows in PlayersGrid")
+        _result["error"] = "grid row count differs from the parsed replay"
+        screenshot("rows_not_as_parsed")
+        return None
+    # The app logs "replay loading" as soon as the dialog hands it the path
+    loading = _app_output.find_line(applog.REPLAY_LOADING, since=load_mark)
+    populated = _app_output.find_line(applog.GRID_POPULATED, since=load_mark)
+    if loading and populated:
+        _result["load_seconds"] = round(populated.time - loading.time, 3)
+        print(f"  File selected → grid populated: {_result['load_seconds']:.2f}s")
+    focus_app_by_pid()
+    settle("grid painted", 0.5, region=players_grid_region(bounds))
+    # Rediscover the window in case its ID changed after the dialog closed
+    _tracker.invalidate(rediscover=True)
+    if _locator:
+        _locator.invalidate()
+        _result["tree_rows_match"] = tree_rows_match("PlayersGrid", _result["rows"])
+        if not _result["tree_rows_match"]:
+            print(f"  FAILED: PlayersGrid's accessibility element doesn't show {_result['rows']} rows")
+            _result["error"] = "accessibility tree row count differs from the grid"
+            return None
+    info = get_window_info()
+    if info:
+        print(f"  Refreshed window ID: {info['window_id']} bounds=({info['x']},{info['y']},{info['w']},{info['h']})")
+    screenshot("replay_loaded")
+
+    step("Testing column header sorting")
+    _result["sort_latencies"] = []
+    return test_sorting(bounds, _result["sort_latencies"], truth)
+
+
+def run_session(replays: list[str], bounds) -> list["session.ReplayOutcome"]:
+    """Warm mode: load every replay into the one running app, one step each (see session.py)."""
+    outcomes, previous = [], None
+    for i, replay in enumerate(replays, 1):
+        step(f"Warm session {i}/{len(replays)}: {os.path.basename(replay)}")
+        start = time.monotonic()
+        if _app_process.poll() is not None:
+            outcome = session.ReplayOutcome(replay, error=f"app exited with code {_app_process.returncode}")
+            print(f"  FAILED: {outcome.error}")
+        else:
+            outcome = load_in_session(replay, bounds, previous)
+        outcome.seconds = time.monotonic() - start
+        outcomes.append(outcome)
+        previous = replay
+    return outcomes
+
+
+def finish_session(args: argparse.Namespace, outcomes: list["session.ReplayOutcome"]) -> int:
+    """Visual check and summary of a warm session. Returns the exit code."""
+    if not args.no_visual:
+        with timing.span("visual check"):
+            for outcome in outcomes:
+                if outcome.shots:
+                    print(f"\n  {outcome.name}")
+                    outcome.visual = check_visual(args, outcome.replay, outcome.shots)
+    session.print_summary(outcomes)
+    _result["session"] = [o.to_dict() for o in outcomes]
+    _result["sort_latencies"] = [lat for o in outcomes for lat in o.sort_latencies]
+    report_sort_latency()
+    if not all(o.ok for o in outcomes):
+        print(f"\nWARM SESSION FAILED for {sum(not o.ok for o in outcomes)} of {len(outcomes)} replays "
+              f"(see the table above)")
         return 1
+    print(f"\nAll {len(outcomes)} replays passed in one app. Screenshots in: {SCREENSHOT_DIR}")
+    return 0
 
-    # Clean screenshots from previous runs
-    if os.path.isdir(SCREENSHOT_DIR):
-        for f in glob.glob(os.path.join(SCREENSHOT_DIR, "*.png")):
-            os.remove(f)
+
+def run_soak(args: argparse.Namespace, bounds) -> tuple[list["soak.Iteration"], bool]:
+    """
+    --soak: load the replays round-robin into the one running app until the
+    duration or iteration count runs out, recording each iteration's app RSS
+    and timings (see soak.py). Ctrl-C ends the soak early but still reports
+    it. Returns the iterations and whether the soak was interrupted.
+    """
+    global _ring
+    _ring = soak.DiskRing(SCREENSHOT_DIR, args.ring_frames, args.keep_after)
+    reader = procstats.open_reader(_app_process.pid)
+    deadline = time.monotonic() + args.soak if args.soak is not None else None
+    limit = args.soak_iterations or None
+    what = " and ".join(filter(None, [f"{args.soak:.0f}s" if deadline else "", f"{limit} iterations" if limit else ""]))
+    step(f"Soak: {what} over {len(args.replays)} replay(s)")
+
+    iterations, previous, interrupted = [], None, False
+    try:
+        while (limit is None or len(iterations) < limit) and (deadline is None or time.monotonic() < deadline):
+            i = len(iterations)
+            replay = args.replays[i % len(args.replays)]
+            _ring.iteration = i
+            _shots.clear()
+            print(f"\n  --- Soak iteration {i}: {os.path.basename(replay)} ---")
+            start = time.monotonic()
+            with timing.span(f"soak iteration {i}"):
+                if _app_process.poll() is not None:
+                    outcome = session.ReplayOutcome(replay, error=f"app exited with code {_app_process.returncode}")
+                else:
+                    outcome = load_in_session(replay, bounds, previous)
+            record = soak.Iteration(i, replay, outcome.ok, time.monotonic() - start,
+                                    load_seconds=outcome.load_seconds, error=outcome.error)
+            firsts = sorted(lat["seconds"] for lat in outcome.sort_latencies if lat["seconds"] is not None)
+            if firsts:
+                record.sort_seconds = firsts[len(firsts) // 2]
+            values = reader.read() if reader else None
+            if values:
+                record.rss_mb = values[1] / procstats.MB
+            iterations.append(record)
+            _result.setdefault("sort_latencies", []).extend(outcome.sort_latencies)
+
+            # Frames on disk before keep() copies them; earlier failures collect theirs here too
+            _writer.flush()
+            if not outcome.ok:
+                reason = outcome.error or "; ".join([c.check for c in outcome.checks if not c.ok]
+                                                    + [f"{r.column} sort order" for r in outcome.sort_results
+                                                       if not r.ok])
+                kept = _ring.keep(reason, _app_output.tail())
+                print(f"  FAILED: {reason}; kept the last {len(_ring.frames())} frames in {kept}")
+            _ring.sync()
+            print(f"  Iteration {i}: {record.seconds:.2f}s, "
+                  f"RSS {f'{record.rss_mb:.0f} MB' if record.rss_mb is not None else 'n/a'}")
+            if _app_process.poll() is not None:
+                print(f"  App exited with code {_app_process.returncode}; ending the soak")
+                break
+            previous = replay
+    except KeyboardInterrupt:
+        print(f"\n  Soak interrupted after {len(iterations)} iterations; reporting what ran")
+        interrupted = True
+    finally:
+        if reader:
+            reader.close()
+    return iterations, interrupted
+
+
+def finish_soak(args: argparse.Namespace, iterations: list["soak.Iteration"], interrupted: bool) -> int:
+    """Trend analysis and summary of a soak. Returns the exit code."""
+    _writer.flush()
+    _ring.sync()
+    analysis = soak.analyze(iterations, args.max_rss_slope, args.max_drift)
+    analysis["kept"] = _ring.kept
+    analysis["interrupted"] = interrupted
+    analysis["csv"] = soak.write_csv(os.path.join(SCREENSHOT_DIR, "soak.csv"), iterations)
+    soak.print_summary(analysis)
+    _result["soak"] = analysis
+    report_sort_latency()
+    failed = analysis["failed"]
+    if not iterations:
+        print("\nSOAK RAN NO ITERATIONS")
+        return 1
+    if failed:
+        print(f"\nSOAK FAILED in {failed} of {len(iterations)} iterations. Frames around each failure in: "
+              f"{_ring.failures_dir}")
+        return 1
+    if analysis["flags"]:
+        print("\nSOAK TRENDS OVER THEIR LIMITS (see above)")
+        return 1
+    if interrupted:
+        return 130
+    print(f"\n{len(iterations)} soak iterations passed without a leak or slowdown. Ring in: {_ring.dir}")
+    return 0
+
+
+def main(args: argparse.Namespace):
+    global _sort_repeats, SCREENSHOT_DIR, VIDEO_PATH
+
+    args.replays = [os.path.abspath(r) for r in args.replays]
+    _sort_repeats = max(1, args.sort_repeats)
+    replay_path = args.replays[0]
+    _result["replay"] = replay_path
+    if args.warm:
+        _result["replays"] = args.replays
+    if args.artifacts:
+        SCREENSHOT_DIR = os.path.abspath(args.artifacts)
+        VIDEO_PATH = os.path.join(SCREENSHOT_DIR, "test_run.mp4")
+
+    missing = [r for r in args.replays if not os.path.isfile(r)]
+    if missing:
+        print(f"ERROR: Replay file not found: {', '.join(missing)}")
+        _result["error"] = "replay file not found"
+        return 1
 
     print(f"BotOrNot GUI Test Harness")
-    print(f"  Replay : {replay_path}")
+    if args.soaking:
+        print(f"  Replays: {len(args.replays)}, loaded round-robin into one app (soak)")
+    elif args.warm:
+        print(f"  Replays: {len(args.replays)}, loaded into one app (warm session)")
+    else:
+        print(f"  Replay : {replay_path}")
     print(f"  Project: {PROJECT_ROOT}")
     print(f"  Screenshots: {SCREENSHOT_DIR}")
 
     # ------------------------------------------------------------------
-    # 1. Build
+    # 1-2. Build, start the display and clean up at once, then launch
     # ------------------------------------------------------------------
-    step("Building the solution")
-    build = subprocess.run(
-        [DOTNET, "build", SLN_PATH, "--configuration", "Debug"],
-        capture_output=True, text=True, timeout=120,
-    )
-    if build.returncode != 0:
-        print(f"  BUILD FAILED:\n{build.stdout[-2000:]}\n{build.stderr[-2000:]}")
+    step("Building and launching BotOrNot")
+    started = start_up(args)
+    if started is None:
         return 1
-    print("  Build succeeded")
-
-    # ------------------------------------------------------------------
-    # 2. Launch the app
-    # ------------------------------------------------------------------
-    step("Launching BotOrNot")
-    _app_process = subprocess.Popen(
-        [DOTNET, "run", "--project", AVALONIA_PROJECT, "--no-build"],
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-    )
-    print(f"  PID: {_app_process.pid}")
+    result, launch_start = started
 
     # ------------------------------------------------------------------
     # 3. Wait for the window, then start recording cropped to it
@@ -408,32 +1104,31 @@ def main():
         bounds = wait_for_window(timeout=30)
     except TimeoutError as e:
         print(f"  FAILED: {e}")
+        _result["error"] = str(e)
         screenshot("timeout_no_window")
         # Dump process info for debugging
         if _app_process:
             print(f"  Process alive: {_app_process.poll() is None}")
+            print("  Last app output:")
+            for line in _app_output.tail():
+                print(f"    {line}")
         # List all windows for debugging
-        windows = Quartz.CGWindowListCopyWindowInfo(
-            Quartz.kCGWindowListOptionOnScreenOnly,
-            Quartz.kCGNullWindowID,
-        )
         print("  Visible windows:")
-        for w in windows:
-            owner = w.get("kCGWindowOwnerName", "?")
-            title = w.get("kCGWindowName", "")
-            layer = w.get("kCGWindowLayer", -1)
-            b = w.get("kCGWindowBounds", {})
-            print(f"    {owner} | {title!r} | layer={layer} | {b}")
+        for w in _backend.list_windows():
+            print(f"    {w['owner']} | {w['title']!r} | layer={w['layer']} | {w['bounds']}")
         return 1
+    launch_seconds = time.monotonic() - launch_start
+    _result["launch_seconds"] = round(launch_seconds, 3)
+    print(f"  Launch → window: {launch_seconds:.2f}s")
 
-    time.sleep(2)  # let the UI finish rendering
+    settle("initial render", 2, region=bounds)  # let the UI finish rendering
 
     # Try to raise/focus the window (best-effort; AppleScript may fail for dotnet)
-    move_window_to_current_space()
-    time.sleep(1.5)
+    focus_app_by_pid()
+    settle("window raised", 1.5, region=bounds)
 
     # Always re-query the ACTUAL window position fresh — never trust stale bounds
-    info = get_window_info_quartz()
+    info = get_window_info()
     if info:
         bounds = (info["x"], info["y"], info["w"], info["h"])
         print(f"  Window at: {bounds}")
@@ -441,131 +1136,36 @@ def main():
         print(f"  WARNING: could not re-query window bounds, using initial: {bounds}")
 
     focus_app_by_pid()
+    try:
+        start_locator(args)
+    except RuntimeError as e:
+        print(f"  FAILED: {e}")
+        _result["error"] = str(e)
+        return 1
 
-    # Start recording — full screen (no crop, avoids coordinate mismatch issues)
-    step("Starting screen recording (full screen)")
-    video_path = start_recording()
-
-    screenshot("app_launched")
-
-    # ------------------------------------------------------------------
-    # 4. Click "Select Replay File" button
-    # ------------------------------------------------------------------
-    step("Clicking 'Select Replay File' button")
-
-    # Get bounds BEFORE focusing (focus can temporarily confuse Quartz)
-    info = get_window_info_quartz()
-    if info:
-        bounds = (info["x"], info["y"], info["w"], info["h"])
-        print(f"  Fresh window bounds: {bounds}")
-    wx, wy, ww, wh = bounds
-    focus_app_by_pid()
-    time.sleep(0.5)
-
-    # The button is near the top of the window. Avalonia on macOS has a
-    # title-bar of ~28px.  The toolbar area with the button is just below.
-    # The button "Select Replay File" is on the left side of the toolbar.
-    btn_x = wx + 148   # "Select Replay File" button center (~148px from left edge)
-    btn_y = wy + 50    # toolbar row, ~50px below window top
-    click_at(btn_x, btn_y, "Select Replay File area")
-    time.sleep(2)
-    screenshot("after_button_click")
-
-    # ------------------------------------------------------------------
-    # 5. Type the replay path into the macOS file dialog
-    # ------------------------------------------------------------------
-    step("Entering replay file path in file dialog")
-    time.sleep(1)
-
-    # In macOS file dialog, Cmd+Shift+G opens "Go to Folder" sheet
-    # where we can type an arbitrary path.
-    pyautogui.hotkey("command", "shift", "g")
-    time.sleep(1.5)
-    screenshot("go_to_folder_sheet")
-
-    # Type the full path to the replay file
-    pyautogui.typewrite(replay_path, interval=0.01)
-    time.sleep(0.5)
-    screenshot("path_typed")
-
-    # Press Enter/Go to navigate to the path
-    pyautogui.press("enter")
-    time.sleep(1)
-
-    # Now the dialog should show the file or its parent directory.
-    # Press Enter again to open/confirm the selected file.
-    pyautogui.press("enter")
-    time.sleep(1)
-    screenshot("file_dialog_confirmed")
+    # Record the window region; only changed frames are encoded
+    step("Starting screen recording")
+    if args.soaking:
+        print("  Not recording during a soak; screenshots go to a ring of "
+              f"{args.ring_frames} frames in {os.path.join(SCREENSHOT_DIR, 'ring')}")
+    else:
+        start_recording(bounds)
 
-    # ------------------------------------------------------------------
-    # 6. Wait for the replay to load
-    # ------------------------------------------------------------------
-    step("Waiting for replay to load")
-    time.sleep(5)  # give it time to parse
-    focus_app_by_pid()
-    # Refresh window ID in case it changed after dialog closed
-    # Clear the cached ID first to force a name-based search
-    _app_window_id = None
-    info = get_window_info_quartz()
-    if info:
-        _app_window_id = info["window_id"]
-        print(f"  Refreshed window ID: {_app_window_id} bounds=({info['x']},{info['y']},{info['w']},{info['h']})")
-    screenshot("replay_loaded")
+    if not args.direct or args.warm:
+        # With --direct the replay may be half loaded here, so the shot wouldn't be stable
+        screenshot("app_launched")
 
-    # ------------------------------------------------------------------
-    # 7. Click column headers to test sorting
-    # ------------------------------------------------------------------
-    step("Testing column header sorting")
+    # The window is up and timed; the replay checks need the expected rows from here on
+    join_expected()
 
-    # Query window bounds BEFORE focusing (focus can temporarily confuse Quartz)
-    info = get_window_info_quartz()
-    if info:
-        wx, wy, ww, wh = (info["x"], info["y"], info["w"], info["h"])
-        print(f"  Window bounds for sorting: ({wx}, {wy}, {ww}, {wh})")
+    if args.soaking:
+        iterations, interrupted = run_soak(args, bounds)
+    elif args.warm:
+        outcomes = run_session(args.replays, bounds)
     else:
-        print(f"  WARNING: could not re-query bounds, using last known: {(wx, wy, ww, wh)}")
-    focus_app_by_pid()
-
-    # The DataGrid in "Players Seen" starts below:
-    #   - Title bar (~28px)
-    #   - Toolbar row (~60px)
-    #   - File info/metadata panel (~75px)
-    #   - "ModPackDad's Eliminations" section header (~25px)
-    #   - Column headers + 6 data rows (~240px)
-    #   - "Players Seen" section header (~30px)
-    #   - Column header row
-    # Measured from actual screenshot: Players Seen column header is ~465px from window top
-    header_y = wy + 465
-
-    # Column approximate X offsets within the window (from the AXAML widths):
-    #   Name(195) | Level(104) | Bot(78) | Platform(130) | Kills(91) | Squad(70) | Placement(90) | Death Cause(156)
-    # Starting X ≈ wx + 10 (small left margin)
-    col_positions = {
-        "Name": wx + 10 + 97,         # center of Name col (195px wide)
-        "Level": wx + 10 + 195 + 52,  # center of Level col
-        "Kills": wx + 10 + 195 + 104 + 78 + 130 + 45,  # center of Kills col
-        "Placement": wx + 10 + 195 + 104 + 78 + 130 + 91 + 70 + 45,  # center of Placement col
-    }
-
-    for col_name in SORT_COLUMNS:
-        col_x = col_positions.get(col_name)
-        if col_x is None:
-            continue
-        # Re-focus before every column to ensure BotOrNot is frontmost
-        focus_app_by_pid()
-        time.sleep(0.3)
-        print(f"\n  Sorting by {col_name} (ascending) …")
-        click_at(col_x, header_y, f"{col_name} header")
-        time.sleep(1)
-        screenshot(f"sort_{col_name}_asc")
-
-        focus_app_by_pid()
-        time.sleep(0.3)
-        print(f"  Sorting by {col_name} (descending) …")
-        click_at(col_x, header_y, f"{col_name} header")
-        time.sleep(1)
-        screenshot(f"sort_{col_name}_desc")
+        sort_results = load_and_sort(args, replay_path, bounds)
+        if sort_results is None:
+            return 1
 
     # ------------------------------------------------------------------
     # 8. Final screenshot
@@ -578,34 +1178,122 @@ def main():
     # 9. Stop recording
     # ------------------------------------------------------------------
     step("Stopping screen recording")
-    stop_recording(video_path)
+    stop_recording()
 
     # ------------------------------------------------------------------
     # 10. Exit cleanly
     # ------------------------------------------------------------------
     step("Shutting down")
-    if _app_process and _app_process.poll() is None:
-        _app_process.terminate()
-        try:
-            _app_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            _app_process.kill()
-        print("  App terminated")
+    over = finish_sampler(args)
+    stop_app()
+
+    print(f"\n  Build: {result.seconds:.2f}s{' (cached)' if result.skipped else ''}"
+          f" | Launch → window: {launch_seconds:.2f}s")
+    if args.soaking:
+        timed_out = [r for r in waits.records() if not r.ok]
+        print(f"  Waits: {len(waits.records())}, {len(timed_out)} timed out")
+    else:
+        waits.print_summary()
+    tracker_stats = _tracker.stats()
+    _result["window_tracker"] = tracker_stats
+    print(f"  Window queries: {tracker_stats['queries']} ({tracker_stats['cache_hits']} cached, "
+          f"{tracker_stats['refreshes']} by ID, {tracker_stats['enumerations']} full enumerations)")
+    _result["focus"] = {"skipped": _backend.focus_skipped, "raised": _backend.focus_raised}
+    print(f"  Focus: {_backend.focus_skipped} already frontmost, {_backend.focus_raised} raised")
+    if _locator:
+        tree_stats = _locator.stats()
+        _result["a11y"] = tree_stats
+        print(f"  Accessibility lookups: {tree_stats['lookups']} ({tree_stats['cache_hits']} cached, "
+              f"{tree_stats['subtree_walks']} subtree walks, {tree_stats['walks']} full walks, "
+              f"{tree_stats['nodes']} nodes)")
+    with timing.span("flush screenshots", "io"):
+        failed = _writer.flush()
+    print(f"  Screenshots written: {_writer.written}, failed: {len(failed)}")
+
+    if args.soaking or args.warm:
+        code = finish_soak(args, iterations, interrupted) if args.soaking else finish_session(args, outcomes)
+        if code == 0 and over:
+            print("\nAPP PROCESS OVER ITS CEILINGS (see the table above)")
+            return 1
+        return code
+
+    oracle.print_summary(sort_results)
+    report_sort_latency()
+    _result["sort_oracle"] = [r.to_dict() for r in sort_results]
+    if not all(r.ok for r in sort_results):
+        print("\nSORT ORDER CHECK FAILED (see the sort oracle table above)")
+        return 1
 
+    if not args.no_visual:
+        with timing.span("visual check"):
+            results = check_visual(args, replay_path)
+        _result["visual"] = [r.to_dict() for r in results]
+        if any(r.status in ("fail", "error") for r in results):
+            print(f"\nVISUAL REGRESSION. Diff heatmaps (*.diff.png) in: {SCREENSHOT_DIR}")
+            return 1
+    if over:
+        print("\nAPP PROCESS OVER ITS CEILINGS (see the table above)")
+        return 1
     print(f"\nAll steps complete. Screenshots in: {SCREENSHOT_DIR}")
     return 0
 
 
-if __name__ == "__main__":
+def run_benchmark(args: argparse.Namespace) -> int:
+    """--benchmark N: repeat the whole run N times in fresh harness processes (see benchmark.py)."""
+    harness_args = ["--screen-size", args.screen_size]
+    if args.direct:
+        harness_args.append("--direct")
+    if args.sort_repeats > 1:
+        harness_args += ["--sort-repeats", str(args.sort_repeats)]
+    if args.display:
+        harness_args += ["--display", args.display]
+    if args.fake_app:
+        harness_args += ["--fake-app", "--fake-args", args.fake_args]
+    if args.no_expected:
+        harness_args.append("--no-expected")
+    return benchmark.run_and_report(
+        [os.path.abspath(r) for r in args.replays], args.benchmark,
+        out_dir=os.path.abspath(args.artifacts or os.path.join(UITESTS_DIR, "benchmark-results")),
+        backend=default_backend_name() if args.backend == "auto" else args.backend,
+        baseline=args.bench_baseline, threshold=args.bench_threshold,
+        update_baseline=args.update_bench_baseline, result_json=args.result_json,
+        rebuild=args.rebuild, harness_args=harness_args,
+    )
+
+
+def cli(argv=None) -> int:
+    """Parse the command line, run the test and always clean up. Returns the exit code."""
+    scheduler.interrupt_on_sigterm()
+    args = parse_args(argv)
+    if args.benchmark:
+        return run_benchmark(args)
+    code = 1
+    _teardown.push("close screenshot writer", _writer.close)
     try:
-        code = main()
+        code = main(args)
+    except KeyboardInterrupt as exc:
+        print(f"\nInterrupted ({exc or 'Ctrl-C'}); cleaning up …")
+        _result["error"] = "interrupted"
+        code = 130
     except Exception as exc:
+        _result["error"] = f"fatal: {exc}"
         print(f"\nFATAL: {exc}")
         import traceback
         traceback.print_exc()
         screenshot("fatal_error")
         code = 1
     finally:
-        if _app_process and _app_process.poll() is None:
-            _app_process.terminate()
-    sys.exit(code)
+        # Recorder, process sampler, app, its output reader, backend, Xvfb: newest first.
+        # A failed run still reports what the app was doing (finish_sampler).
+        _teardown.close()
+        timing.end_step()
+        timing.print_summary()
+        trace_path = timing.write_chrome_trace(args.trace or os.path.join(SCREENSHOT_DIR, "trace.json"))
+        print(f"  Timing trace: {trace_path}")
+        if args.result_json:
+            write_result(args.result_json, code)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,202 @@
+"""
+Concurrent start-up and teardown for the BotOrNot GUI test harness.
+
+The start of a run is a small dependency graph, not a fixed sequence.
+Removing old screenshots, starting Xvfb and the automation backend (and
+warming its capture path), and `dotnet build` don't depend on each other,
+so they run at the same time. The app launch waits for the build and the
+display. StepGraph runs such a graph on a thread pool, times every task as
+a span (timing.py), and reports the critical path and how much time the
+overlap saved.
+
+Teardown replaces the old global signal handler. Every resource the run
+starts (Xvfb, the backend, the app, its output reader, the recorder, …)
+registers how to stop it as soon as it exists. The harness unwinds the
+stack once, newest first, from its `finally`. Ctrl-C and SIGTERM raise
+KeyboardInterrupt in the main thread. A run interrupted mid-graph still
+waits for the tasks already running, then stops whatever they started.
+"""
+
+import time
+import signal
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import timing
+
+
+class TaskFailed(Exception):
+    """A StepGraph task raised; `error` is the original exception."""
+
+    def __init__(self, task: str, error: BaseException):
+        super().__init__(f"{task}: {error}")
+        self.task = task
+        self.error = error
+
+
+@dataclass
+class Task:
+    name: str
+    fn: object                       # callable taking no arguments
+    after: tuple[str, ...] = ()
+    kind: str | None = None          # timing.py span kind
+    start: float | None = None       # time.perf_counter()
+    end: float | None = None
+    result: object = None
+    error: BaseException | None = None
+
+    @property
+    def seconds(self) -> float:
+        if self.start is None:
+            return 0.0
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def status(self) -> str:
+        if self.start is None:
+            return "skipped"
+        if self.end is None:
+            return "running"
+        return "failed" if self.error is not None else "ok"
+
+
+class StepGraph:
+    """Tasks with dependencies, each started as soon as everything it runs after has succeeded."""
+
+    def __init__(self):
+        self.tasks: dict[str, Task] = {}
+        self._start: float | None = None
+        self._end: float | None = None
+
+    def add(self, name: str, fn, after: tuple[str, ...] = (), kind: str | None = None) -> Task:
+        """Add a task. Its dependencies must already be in the graph, which keeps it acyclic."""
+        unknown = [d for d in after if d not in self.tasks]
+        if unknown:
+            raise ValueError(f"{name} runs after unknown task(s): {', '.join(unknown)}")
+        task = Task(name, fn, tuple(after), kind)
+        self.tasks[name] = task
+        return task
+
+    def _ready(self, task: Task) -> bool:
+        return all(self.tasks[d].status == "ok" for d in task.after)
+
+    def _run_task(self, task: Task):
+        task.start = time.perf_counter()
+        try:
+            with timing.span(task.name, task.kind, task=True):
+                task.result = task.fn()
+        except BaseException as e:
+            task.error = e
+        finally:
+            task.end = time.perf_counter()
+
+    def run(self) -> dict[str, object]:
+        """
+        Run the graph and return each task's result. After the first failure
+        nothing new is started; tasks already running are waited for, then
+        TaskFailed is raised. An interrupt (KeyboardInterrupt) also waits for
+        the running tasks before it propagates.
+        """
+        self._start = time.perf_counter()
+        pending = dict(self.tasks)
+        running = {}
+        failed = None
+        pool = ThreadPoolExecutor(max_workers=max(1, len(self.tasks)), thread_name_prefix="startup")
+        try:
+            while pending or running:
+                if failed is None:
+                    for name, task in list(pending.items()):
+                        if self._ready(task):
+                            del pending[name]
+                            running[pool.submit(self._run_task, task)] = task
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    if task.error is not None and failed is None:
+                        failed = task
+        finally:
+            # Also on an interrupt: let running tasks finish so what they started gets torn down
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._end = time.perf_counter()
+        if failed:
+            raise TaskFailed(failed.name, failed.error) from failed.error
+        return {name: task.result for name, task in self.tasks.items()}
+
+    def critical_path(self) -> list[Task]:
+        """The chain of tasks that decided when the graph finished, first to last."""
+        finished = [t for t in self.tasks.values() if t.end is not None]
+        if not finished:
+            return []
+        task = max(finished, key=lambda t: t.end)
+        path = [task]
+        while task.after:
+            task = max((self.tasks[d] for d in task.after), key=lambda t: t.end or 0.0)
+            path.append(task)
+        return path[::-1]
+
+    def summary(self) -> dict:
+        wall = (self._end or time.perf_counter()) - (self._start or time.perf_counter())
+        work = sum(t.seconds for t in self.tasks.values())
+        return {
+            "wall_seconds": round(wall, 3),
+            "work_seconds": round(work, 3),
+            "saved_seconds": round(max(0.0, work - wall), 3),
+            "critical_path": [t.name for t in self.critical_path()],
+            "tasks": [{
+                "name": t.name,
+                "after": list(t.after),
+                "status": t.status,
+                "start": round(t.start - self._start, 3) if t.start is not None and self._start else None,
+                "seconds": round(t.seconds, 3),
+            } for t in self.tasks.values()],
+        }
+
+    def print_summary(self):
+        print_summary(self.summary())
+
+
+def print_summary(s: dict):
+    """Print a StepGraph.summary() (also used for the "startup" entry of a stored result)."""
+    print(f"\n  {'Start-up task':<24} {'After':<24} {'Start':>7} {'Time':>8}  Status")
+    print(f"  {'-'*24} {'-'*24} {'-'*7} {'-'*8}  {'-'*7}")
+    for t in s["tasks"]:
+        start = f"{t['start']:.2f}s" if t["start"] is not None else "-"
+        print(f"  {t['name'][:24]:<24} {', '.join(t['after'])[:24]:<24} {start:>7} {t['seconds']:>7.2f}s  {t['status']}")
+    print(f"  {s['work_seconds']:.2f}s of work in {s['wall_seconds']:.2f}s (overlap saved {s['saved_seconds']:.2f}s); "
+          f"critical path: {' → '.join(s['critical_path']) or '-'}")
+
+
+class Teardown:
+    """Stack of cleanup callbacks, run newest first, each exactly once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stack: list[tuple[str, object]] = []
+
+    def push(self, label: str, fn):
+        """Register fn to run at close(). Safe to call from any thread; returns fn."""
+        with self._lock:
+            self._stack.append((label, fn))
+        return fn
+
+    def close(self):
+        """Run every registered callback. Failures (and a second Ctrl-C) are reported, not raised."""
+        while True:
+            with self._lock:
+                if not self._stack:
+                    return
+                label, fn = self._stack.pop()
+            try:
+                fn()
+            except BaseException as e:
+                print(f"  [cleanup] {label} failed: {e!r}")
+
+
+def interrupt_on_sigterm():
+    """Make SIGTERM behave like Ctrl-C: KeyboardInterrupt in the main thread, so `finally` blocks run."""
+    def handler(signum, _frame):
+        raise KeyboardInterrupt(signal.Signals(signum).name)
+    signal.signal(signal.SIGTERM, handler)
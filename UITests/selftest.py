@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Self-tests of the BotOrNot GUI test harness
+
+Runs run_ui_test.py against the stand-in window in fakeapp.py once per
+scenario and checks that the harness reached the expected verdict: a clean
+run passes, delays and a replaced window are waited out, and a misrendered
+sort is caught by the sort oracle. No dotnet, build or replay parsing is
+involved, so the whole set takes seconds per scenario under Xvfb.
+
+Usage:
+    python3 UITests/harness.py selftest [--only NAME ...] [--out DIR] [-- run_ui_test.py options]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import subprocess
+from dataclasses import dataclass
+
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(UITESTS_DIR)
+HARNESS = os.path.join(UITESTS_DIR, "run_ui_test.py")
+DEFAULT_OUT = os.path.join(UITESTS_DIR, "selftest-results")
+TIMEOUT = 180
+
+
+def _sort_ok(result: dict) -> str | None:
+    failed = [r["column"] for r in result.get("sort_oracle", []) if not r["ok"]]
+    if not result.get("sort_oracle"):
+        return "no sort oracle results"
+    return f"sort oracle failed for {', '.join(failed)}" if failed else None
+
+
+def _sort_caught(result: dict) -> str | None:
+    if not any(not r["ok"] for r in result.get("sort_oracle", [])):
+        return "the misrendered sort was not caught by the sort oracle"
+    return None
+
+
+def _load_at_least(seconds: float):
+    def check(result: dict) -> str | None:
+        load = result.get("load_seconds")
+        if load is None or load < seconds:
+            return f"load took {load}s, the fake app was told to take at least {seconds}s"
+        return _sort_ok(result)
+    return check
+
+
+def _session_ok(result: dict) -> str | None:
+    failed = [os.path.basename(e["replay"]) for e in result.get("session", []) if e["status"] != "pass"]
+    if len(result.get("session", [])) < 2:
+        return "the warm session did not load every replay"
+    return f"session failed for {', '.join(failed)}" if failed else None
+
+
+@dataclass
+class Scenario:
+    name: str
+    fake_args: str
+    expect_code: int
+    check: object                 # callable(result dict) -> problem or None
+    harness_args: tuple[str, ...] = ()
+    replays: int = 1
+
+
+SCENARIOS = [
+    Scenario("clean", "", 0, _sort_ok),
+    Scenario("direct", "", 0, _sort_ok, ("--direct",)),
+    Scenario("slow", "--startup-delay 3 --load-delay 2 --sort-delay 0.4", 0, _load_at_least(2.0)),
+    Scenario("slow-load", "--fault slow-load --slow-load-seconds 6", 0, _load_at_least(6.0)),
+    Scenario("new-window", "--fault new-window", 0, _sort_ok),
+    Scenario("bad-sort", "--fault bad-sort", 1, _sort_caught),
+    Scenario("warm", "", 0, _session_ok, replays=2),
+]
+
+
+def test_replays(count: int) -> list[str]:
+    """Replay files to hand the fake app. It only uses their names, but the harness wants them to exist."""
+    found = sorted(glob.glob(os.path.join(PROJECT_ROOT, "BotOrNot.Tests", "TestData", "*.replay")))
+    if not found:
+        raise FileNotFoundError("no .replay files in BotOrNot.Tests/TestData")
+    return [found[i % len(found)] for i in range(count)]
+
+
+def run_scenario(scenario: Scenario, out_dir: str, extra: list[str]) -> dict:
+    artifacts = os.path.join(out_dir, scenario.name)
+    os.makedirs(artifacts, exist_ok=True)
+    result_path = os.path.join(artifacts, "result.json")
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    cmd = [sys.executable, HARNESS, *test_replays(scenario.replays), "--fake-app",
+           "--fake-args", scenario.fake_args, "--artifacts", artifacts, "--result-json", result_path,
+           *scenario.harness_args, *extra]
+    start = time.monotonic()
+    with open(os.path.join(artifacts, "harness.log"), "w", encoding="utf-8") as log:
+        try:
+            code = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=TIMEOUT).returncode
+        except subprocess.TimeoutExpired:
+            code = None
+    seconds = time.monotonic() - start
+
+    result = {}
+    if os.path.exists(result_path):
+        with open(result_path, encoding="utf-8") as f:
+            result = json.load(f)
+    if code is None:
+        problem = f"timed out after {TIMEOUT}s"
+    elif code != scenario.expect_code:
+        problem = f"exit code {code}, expected {scenario.expect_code}" + (f" ({result['error']})"
+                                                                           if result.get("error") else "")
+    else:
+        problem = scenario.check(result)
+    return {"scenario": scenario.name, "ok": problem is None, "problem": problem, "exit_code": code,
+            "seconds": round(seconds, 2), "artifacts": artifacts}
+
+
+def print_summary(rows: list[dict]):
+    print(f"\n  {'Scenario':<12} {'Exit':>4} {'Time':>7}  Verdict")
+    print(f"  {'-'*12} {'-'*4} {'-'*7}  {'-'*40}")
+    for r in rows:
+        code = "-" if r["exit_code"] is None else r["exit_code"]
+        print(f"  {r['scenario']:<12} {code:>4} {r['seconds']:>6.1f}s  {'ok' if r['ok'] else 'FAILED: ' + r['problem']}")
+    passed = sum(r["ok"] for r in rows)
+    print(f"\n  {passed}/{len(rows)} harness self-tests passed")
+
+
+def parse_args(argv=None) -> tuple[argparse.Namespace, list[str]]:
+    """Arguments after `--` are passed through to every run_ui_test.py invocation."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra = []
+    if "--" in argv:
+        cut = argv.index("--")
+        argv, extra = argv[:cut], argv[cut + 1:]
+    parser = argparse.ArgumentParser(prog="harness.py selftest",
+                                     description="Run the harness against the stand-in window in fakeapp.py")
+    parser.add_argument("--only", action="append", choices=[s.name for s in SCENARIOS], default=[],
+                        help="run only this scenario; may be repeated")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="artifacts directory, one subdirectory per scenario")
+    return parser.parse_args(argv), extra
+
+
+def main(argv=None) -> int:
+    args, extra = parse_args(argv)
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    out_dir = os.path.abspath(args.out)
+    rows = []
+    for scenario in scenarios:
+        print(f"  Running {scenario.name} …", flush=True)
+        rows.append(run_scenario(scenario, out_dir, extra))
+    with open(os.path.join(out_dir, "selftest.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    print_summary(rows)
+    return 0 if all(r["ok"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
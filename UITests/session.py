@@ -0,0 +1,89 @@
+"""
+Warm-app sessions for the BotOrNot GUI test harness.
+
+With several replays (or --warm) the harness starts the app once with
+--commands and loads every replay into that one process through its stdin
+command channel (BotOrNot.Avalonia/Services/CommandChannel.cs):
+
+    reset           clear the filter and both grids' sort   → "view reset"
+    open <path>     load a replay like the file dialog does → "replay loaded", "grid populated"
+    state           report filter, sort and row counts      → "view state: …"
+
+Each replay gets the same checks as a cold run (sort oracle, visual
+baselines) plus checks that nothing leaked from the replay before it: the
+requested file was the one loaded, every player is shown (no filter left
+over), no sort survived the reset, and the grid actually repainted.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from oracle import Finding, OracleResult
+
+
+@dataclass
+class ReplayOutcome:
+    replay: str
+    checks: list[Finding] = field(default_factory=list)
+    rows: int | None = None
+    load_seconds: float | None = None
+    sort_results: list[OracleResult] = field(default_factory=list)
+    sort_latencies: list[dict] = field(default_factory=list)
+    shots: list[tuple[str, str]] = field(default_factory=list)   # (label, path) taken for this replay
+    visual: list = field(default_factory=list)                   # visual.VisualResult
+    error: str | None = None
+    seconds: float = 0.0                                          # wall time of this replay's step
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.replay)
+
+    @property
+    def ok(self) -> bool:
+        return (self.error is None
+                and all(c.ok for c in self.checks)
+                and all(r.ok for r in self.sort_results)
+                and not any(v.status in ("fail", "error") for v in self.visual))
+
+    def add(self, check: str, ok: bool, detail: str = ""):
+        self.checks.append(Finding(check, ok, detail))
+
+    def to_dict(self) -> dict:
+        """Shaped like a single run's result JSON, so corpus.py can treat both alike."""
+        out = {
+            "replay": self.replay,
+            "status": "pass" if self.ok else "fail",
+            "seconds": round(self.seconds, 2),
+            "checks": [{"check": c.check, "ok": c.ok, "detail": c.detail} for c in self.checks],
+            "sort_oracle": [r.to_dict() for r in self.sort_results],
+            "sort_latencies": self.sort_latencies,
+            "visual": [v.to_dict() for v in self.visual],
+        }
+        if self.rows is not None:
+            out["rows"] = self.rows
+        if self.load_seconds is not None:
+            out["load_seconds"] = self.load_seconds
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+def print_summary(outcomes: list[ReplayOutcome]):
+    if not outcomes:
+        return
+    print(f"\n  Warm session: {len(outcomes)} replays in one app")
+    for o in outcomes:
+        load = f"{o.load_seconds:.2f}s" if o.load_seconds is not None else "-"
+        rows = o.rows if o.rows is not None else "-"
+        print(f"  {'PASS' if o.ok else 'FAIL':<5} {load:>7} {rows!s:>5} rows  {o.name}")
+        if o.error:
+            print(f"      ERROR {o.error}")
+        for c in o.checks:
+            if not c.ok:
+                print(f"      FAILED {c.check}{': ' + c.detail if c.detail else ''}")
+        for r in o.sort_results:
+            if not r.ok:
+                print(f"      FAILED sort oracle for {r.column}")
+        for v in o.visual:
+            if v.status in ("fail", "error"):
+                print(f"      FAILED visual {v.label}")
@@ -0,0 +1,234 @@
+"""
+Soak mode for the BotOrNot GUI test harness.
+
+A soak run keeps one app open (the warm session's command channel, see
+session.py) and repeats the load-and-sort cycle over its replays for a set
+time or number of iterations. Each iteration records the app's resident
+memory at its end (procstats.py), its wall time, the replay's load time
+and the median header-click latency (latency.py).
+
+Screenshots go into a DiskRing: a fixed set of slot files in
+<artifacts>/ring/ that are overwritten round-robin, so the disk use of an
+hours-long run stays at `size` frames. When an iteration fails, every frame
+still in the ring plus the next `keep_after` frames are copied to
+<artifacts>/failures/iter_NNNNN/, together with the reason and the app's
+recent output.
+
+At the end a least-squares line is fitted to each series, after the first
+few warm-up iterations. A leak is memory that grows by more than
+`max_rss_slope` MB per iteration. A slowdown is a time that grows by more
+than `max_drift` of its starting value over the run. Either one counts only
+when the line explains the data (r² ≥ MIN_R2), so noise alone never fails a
+soak.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+from dataclasses import dataclass, asdict
+
+WARMUP = 2            # iterations left out of the trend fits (JIT, caches, first layout)
+MIN_ITERATIONS = 5    # fitted iterations needed before a trend is judged
+MIN_R2 = 0.5
+MIN_DRIFT_SECONDS = 0.02
+DEFAULT_RSS_SLOPE = 0.5   # MB per iteration
+DEFAULT_DRIFT = 0.2       # fraction of the starting value, over the whole run
+
+_DURATION = re.compile(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:(\d+(?:\.\d+)?)s?)?")
+
+
+def parse_duration(text: str) -> float:
+    """ "90", "90s", "30m", "2h", "1h30m" → seconds."""
+    match = _DURATION.fullmatch(text.strip().lower())
+    if not text.strip() or not match or not any(match.groups()):
+        raise ValueError(f"not a duration: {text!r} (use e.g. 90s, 30m, 2h or 1h30m)")
+    hours, minutes, seconds = (float(g) if g else 0.0 for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+# ---------------------------------------------------------------------------
+# On-disk frame ring
+# ---------------------------------------------------------------------------
+
+class DiskRing:
+    """The last `size` screenshots in fixed slot files, plus copies kept around failures."""
+
+    def __init__(self, root: str, size: int, keep_after: int = 10):
+        self.dir = os.path.join(root, "ring")
+        self.failures_dir = os.path.join(root, "failures")
+        # A new soak starts with an empty ring and no failures from an earlier one
+        for d in (self.dir, self.failures_dir):
+            shutil.rmtree(d, ignore_errors=True)
+        os.makedirs(self.dir)
+        self.size = max(1, size)
+        self.keep_after = keep_after
+        self.iteration = 0
+        self.count = 0                                  # frames taken so far
+        self.slots: list[dict | None] = [None] * self.size
+        self.kept: list[dict] = []                      # one entry per failure
+        self._collecting: list[list] = []               # [failure dir, frames still to copy]
+        self._copies: list[tuple[str, str]] = []        # (slot path, destination) once the slot is written
+
+    def path(self, label: str) -> str:
+        """The slot file for the next screenshot (overwriting the oldest)."""
+        slot = self.count % self.size
+        self.count += 1
+        path = os.path.join(self.dir, f"slot_{slot:03d}.png")
+        self.slots[slot] = {"slot": slot, "seq": self.count, "iteration": self.iteration, "label": label,
+                            "time": time.strftime("%H:%M:%S")}
+        for entry in self._collecting:
+            self._copies.append((path, os.path.join(entry[0], self._name(self.slots[slot]))))
+            entry[1] -= 1
+        self._collecting = [e for e in self._collecting if e[1] > 0]
+        return path
+
+    @staticmethod
+    def _name(frame: dict) -> str:
+        return f"{frame['seq']:06d}_iter{frame['iteration']:05d}_{frame['label']}.png"
+
+    def frames(self) -> list[dict]:
+        """Frames in the ring, oldest first."""
+        return sorted((f for f in self.slots if f), key=lambda f: f["seq"])
+
+    def sync(self):
+        """Copy frames taken since the last failure into its directory and write the ring index.
+        Call after the screenshot writer has flushed."""
+        for src, dst in self._copies:
+            if os.path.exists(src):
+                shutil.copyfile(src, dst)
+        self._copies = []
+        with open(os.path.join(self.dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(self.frames(), f, indent=1)
+
+    def keep(self, reason: str, app_output: list[str] = ()) -> str:
+        """Copy the ring for a failure in the current iteration; the next keep_after frames follow."""
+        out = os.path.join(self.failures_dir, f"iter_{self.iteration:05d}")
+        os.makedirs(out, exist_ok=True)
+        frames = self.frames()
+        for frame in frames:
+            src = os.path.join(self.dir, f"slot_{frame['slot']:03d}.png")
+            if os.path.exists(src):
+                shutil.copyfile(src, os.path.join(out, self._name(frame)))
+        with open(os.path.join(out, "reason.txt"), "w", encoding="utf-8") as f:
+            f.write(f"iteration {self.iteration}: {reason}\n")
+        if app_output:
+            with open(os.path.join(out, "app_output.txt"), "w", encoding="utf-8") as f:
+                f.write("\n".join(app_output) + "\n")
+        if self.keep_after > 0:
+            self._collecting.append([out, self.keep_after])
+        self.kept.append({"iteration": self.iteration, "reason": reason, "dir": out, "frames_before": len(frames)})
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Iterations and trends
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Iteration:
+    index: int
+    replay: str
+    ok: bool
+    seconds: float
+    rss_mb: float | None = None          # app RSS at the end of the iteration
+    load_seconds: float | None = None
+    sort_seconds: float | None = None    # median header click → first change
+    error: str | None = None
+
+
+@dataclass
+class Trend:
+    series: str
+    unit: str
+    n: int
+    slope: float          # per iteration
+    intercept: float      # fitted value at the first fitted iteration
+    r2: float
+
+    @property
+    def growth(self) -> float:
+        """Fitted change from the first to the last fitted iteration."""
+        return self.slope * (self.n - 1)
+
+
+def fit(series: str, unit: str, points: list[tuple[int, float]]) -> Trend | None:
+    """Least-squares line through (iteration, value) points."""
+    n = len(points)
+    if n < 2:
+        return None
+    mx = sum(x for x, _ in points) / n
+    my = sum(y for _, y in points) / n
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+    slope = sum((x - mx) * (y - my) for x, y in points) / sxx
+    x0 = points[0][0]
+    intercept = my + slope * (x0 - mx)
+    ss_tot = sum((y - my) ** 2 for _, y in points)
+    ss_res = sum((y - (my + slope * (x - mx))) ** 2 for x, y in points)
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else 0.0
+    return Trend(series, unit, n, slope, intercept, r2)
+
+
+SERIES = (("rss_mb", "MB"), ("seconds", "s"), ("load_seconds", "s"), ("sort_seconds", "s"))
+
+
+def analyze(iterations: list[Iteration], max_rss_slope: float = DEFAULT_RSS_SLOPE,
+            max_drift: float = DEFAULT_DRIFT) -> dict:
+    """Trend lines over the iterations after WARMUP and the leaks and slowdowns they show."""
+    fitted = [it for it in iterations if it.index >= WARMUP and it.ok]
+    trends, flags = [], []
+    for key, unit in SERIES:
+        trend = fit(key, unit, [(it.index, getattr(it, key)) for it in fitted if getattr(it, key) is not None])
+        if trend is None:
+            continue
+        trends.append(trend)
+        if trend.n < MIN_ITERATIONS or trend.r2 < MIN_R2:
+            continue
+        if unit == "MB" and trend.slope > max_rss_slope:
+            flags.append(f"app RSS grows {trend.slope:.2f} MB per iteration "
+                         f"({trend.growth:+.0f} MB over {trend.n} iterations, r²={trend.r2:.2f})")
+        elif (unit == "s" and trend.growth > max_drift * max(trend.intercept, 1e-9)
+              and trend.growth > MIN_DRIFT_SECONDS):
+            flags.append(f"{key} slows down {trend.growth / trend.intercept:+.0%} over {trend.n} iterations "
+                         f"({trend.intercept:.3f}s → {trend.intercept + trend.growth:.3f}s, r²={trend.r2:.2f})")
+    return {
+        "iterations": len(iterations),
+        "failed": sum(not it.ok for it in iterations),
+        "warmup": WARMUP,
+        "max_rss_slope_mb": max_rss_slope,
+        "max_drift": max_drift,
+        "trends": [{**asdict(t), "growth": t.growth} for t in trends],
+        "flags": flags,
+        "records": [asdict(it) for it in iterations],
+    }
+
+
+def write_csv(path: str, iterations: list[Iteration]) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("iteration,replay,ok,seconds,rss_mb,load_seconds,sort_seconds,error\n")
+        for it in iterations:
+            values = (it.rss_mb, it.load_seconds, it.sort_seconds)
+            f.write(f"{it.index},\"{os.path.basename(it.replay)}\",{int(it.ok)},{it.seconds:.3f},"
+                    + ",".join("" if v is None else f"{v:.3f}" for v in values)
+                    + f",\"{(it.error or '').replace(chr(34), chr(39))}\"\n")
+    return path
+
+
+def print_summary(analysis: dict):
+    print(f"\n  Soak: {analysis['iterations']} iterations, {analysis['failed']} failed "
+          f"(trends fitted after {analysis['warmup']} warm-up iterations)")
+    if analysis["trends"]:
+        print(f"  {'Series':<14} {'n':>5} {'Start':>10} {'Slope/iter':>12} {'Over run':>10} {'r²':>6}")
+        print(f"  {'-'*14} {'-'*5} {'-'*10} {'-'*12} {'-'*10} {'-'*6}")
+        for t in analysis["trends"]:
+            unit = t["unit"]
+            print(f"  {t['series']:<14} {t['n']:>5} {t['intercept']:>8.3f}{unit:<2} {t['slope']:>+10.4f}{unit:<2} "
+                  f"{t['growth']:>+8.2f}{unit:<2} {t['r2']:>6.2f}")
+    for flag in analysis["flags"]:
+        print(f"  TREND: {flag}")
+    for kept in analysis.get("kept", []):
+        print(f"  Kept failure artifacts of iteration {kept['iteration']}: {kept['dir']} ({kept['reason']})")
@@ -0,0 +1,216 @@
+"""
+Step timing for the BotOrNot GUI test harness.
+
+Every step() of a run is a span, and the helpers it calls (clicks,
+screenshots, focusing, waits, the build and the app launch) open nested
+spans inside it. Each span is tagged with what it spends its time on:
+
+- sleep       — waiting for the app (polling a condition, an app log line)
+- io          — input events, captures, file writes
+- subprocess  — dotnet, ffmpeg, osascript
+
+Time that no tagged span accounts for is the harness's own work ("other").
+At the end the spans are written as a Chrome trace-event file (open it in
+chrome://tracing or https://ui.perfetto.dev) and summarized per step.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+KINDS = ("sleep", "io", "subprocess")
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str | None            # one of KINDS, "step", or None for untagged work
+    start: float                # time.perf_counter()
+    end: float | None = None
+    parent: "Span | None" = None
+    thread: int = 0
+    args: dict = field(default_factory=dict)
+    children: list["Span"] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end if self.end is not None else time.perf_counter()) - self.start)
+
+    def self_seconds(self) -> float:
+        """Time spent in this span and not in any of its children."""
+        return max(0.0, self.seconds - sum(c.seconds for c in self.children))
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans: list[Span] = []
+_steps: list[Span] = []
+_counters: list[tuple[str, float, dict]] = []
+_origin = time.perf_counter()
+
+
+def _stack() -> list[Span]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _open(name: str, kind: str | None, args: dict) -> Span:
+    stack = _stack()
+    thread = threading.get_ident()
+    parent = stack[-1] if stack else None
+    if parent is None and _steps and _steps[-1].end is None and _steps[-1].thread == thread:
+        parent = _steps[-1]
+    s = Span(name, kind, time.perf_counter(), parent=parent, thread=thread, args=args)
+    with _lock:
+        _spans.append(s)
+        if parent:
+            parent.children.append(s)
+    stack.append(s)
+    return s
+
+
+def _close(s: Span):
+    s.end = time.perf_counter()
+    stack = _stack()
+    if stack and stack[-1] is s:
+        stack.pop()
+
+
+@contextmanager
+def span(name: str, kind: str | None = None, **args):
+    """Time the enclosed block as a child of the innermost open span (or the current step)."""
+    s = _open(name, kind, args)
+    try:
+        yield s
+    finally:
+        _close(s)
+
+
+def begin_step(name: str) -> Span:
+    """
+    Close the current step (and anything left open inside it) and start a new
+    one. Steps are sequential top-level spans; the harness opens one per
+    step() banner.
+    """
+    end_step()
+    s = Span(name, "step", time.perf_counter(), thread=threading.get_ident())
+    with _lock:
+        _spans.append(s)
+        _steps.append(s)
+    return s
+
+
+def end_step():
+    """Close the current step. Called by begin_step() and once at the end of the run."""
+    if not _steps or _steps[-1].end is not None:
+        return
+    now = time.perf_counter()
+    # An exception may have left spans open on this thread; close them at the step boundary
+    for s in _stack():
+        if s.end is None:
+            s.end = now
+    _stack().clear()
+    _steps[-1].end = now
+
+
+def steps() -> list[Span]:
+    return list(_steps)
+
+
+def counter(name: str, t: float, **values):
+    """Record counter values (e.g. the app's memory) at perf_counter time t; shown as a track in the trace."""
+    with _lock:
+        _counters.append((name, t, values))
+
+
+# ---------------------------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------------------------
+
+def breakdown(s: Span) -> dict[str, float]:
+    """
+    Wall time of a span split by kind. Each nested span contributes only its
+    own (self) time, so a wait inside a focus call isn't counted twice.
+    """
+    totals = {kind: 0.0 for kind in KINDS}
+    totals["other"] = 0.0
+    pending = list(s.children)
+    totals["other"] += s.self_seconds()
+    while pending:
+        child = pending.pop()
+        pending.extend(child.children)
+        totals[child.kind if child.kind in KINDS else "other"] += child.self_seconds()
+    return totals
+
+
+def step_summary() -> list[dict]:
+    """Per-step totals in seconds (stored in the run's result JSON for run-to-run comparison)."""
+    rows = []
+    for s in _steps:
+        parts = breakdown(s)
+        rows.append({
+            "step": s.name,
+            "seconds": round(s.seconds, 3),
+            **{kind: round(v, 3) for kind, v in parts.items()},
+        })
+    return rows
+
+
+def print_summary(rows: list[dict] | None = None):
+    """Print where each step's wall-clock time went (this run's, or step_summary() rows from a result file)."""
+    rows = step_summary() if rows is None else rows
+    if not rows:
+        return
+    cols = KINDS + ("other",)
+    print(f"\n  {'Step':<40} {'Wall':>8}" + "".join(f" {c:>10}" for c in cols))
+    print(f"  {'-'*40} {'-'*8}" + "".join(f" {'-'*10}" for _ in cols))
+    totals = dict.fromkeys(("seconds",) + cols, 0.0)
+    for row in rows:
+        print(f"  {row['step'][:40]:<40} {row['seconds']:>7.2f}s"
+              + "".join(f" {row[c]:>9.2f}s" for c in cols))
+        for key in totals:
+            totals[key] += row[key]
+    print(f"  {'TOTAL':<40} {totals['seconds']:>7.2f}s" + "".join(f" {totals[c]:>9.2f}s" for c in cols))
+
+
+# ---------------------------------------------------------------------------
+# Chrome trace export
+# ---------------------------------------------------------------------------
+
+def _us(t: float) -> float:
+    return round((t - _origin) * 1e6, 1)
+
+
+def chrome_trace() -> dict:
+    """All spans as complete ("X") trace events, one track per thread, plus counter ("C") events."""
+    pid = os.getpid()
+    with _lock:
+        spans = list(_spans)
+        counters = list(_counters)
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "run_ui_test"}}]
+    for s in spans:
+        events.append({
+            "name": s.name,
+            "cat": s.kind or "other",
+            "ph": "X",
+            "ts": _us(s.start),
+            "dur": round(s.seconds * 1e6, 1),
+            "pid": pid,
+            "tid": s.thread,
+            "args": {k: v if isinstance(v, (int, float, bool, str)) or v is None else str(v)
+                     for k, v in s.args.items()},
+        })
+    for name, t, values in counters:
+        events.append({"name": name, "ph": "C", "ts": _us(t), "pid": pid, "args": values})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+    return path
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Visual regression checks for the BotOrNot GUI test harness.
+
+Golden screenshots live in UITests/baselines/<backend>/<replay>/<label>.png,
+one per screenshot label (app_launched, replay_loaded, sort_Kills_desc, …).
+Each run's screenshots are compared against them with NumPy:
+
+- both images are block-averaged down by `downsample`, which irons out
+  antialiasing noise and makes the comparison cheap
+- volatile regions (window title with the replay path, the indeterminate
+  progress bar, …) are masked out, see masks.json
+- the image is split into tiles; a tile fails when more than `tile_fraction`
+  of its pixels differ by more than `pixel_threshold`
+- a 64-bit difference hash of each image catches gross changes (wrong theme,
+  empty grid) and is reported alongside the tile result
+
+A failing comparison writes <screenshot>.diff.png: the baseline in grey with
+differing pixels in red and failed tiles outlined.
+
+Usage (compare an existing artifacts directory):
+    python3 UITests/visual.py SCREENSHOT_DIR --replay NAME [--backend x11] [--update]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from dataclasses import dataclass, field
+
+UITESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(UITESTS_DIR, "baselines")
+MASKS_FILE = "masks.json"
+
+# Rectangles are fractions of the image (x, y, w, h) so they survive Retina
+# scaling. "*" applies to every label; other keys to that label only.
+DEFAULT_MASKS = {
+    "quartz": {
+        "*": [
+            {"name": "title bar (replay file name)", "rect": [0.0, 0.0, 1.0, 0.035]},
+            {"name": "loading progress bar", "rect": [0.40, 0.035, 0.12, 0.06]},
+        ],
+    },
+    "x11": {
+        "*": [
+            {"name": "loading progress bar", "rect": [0.40, 0.0, 0.12, 0.06]},
+        ],
+    },
+}
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+@dataclass
+class Thresholds:
+    downsample: int = 2          # block size for averaging before comparison
+    pixel_threshold: int = 24    # max channel delta (0-255) still counted as equal
+    tile: int = 32               # tile edge, in downsampled pixels
+    tile_fraction: float = 0.02  # fraction of differing pixels that fails a tile
+    hash_distance: int = 10      # dHash bits that may differ
+
+
+@dataclass
+class VisualResult:
+    label: str
+    status: str                  # "pass", "fail", "new" (no baseline), "error"
+    seconds: float = 0.0
+    changed_fraction: float = 0.0
+    failed_tiles: list = field(default_factory=list)   # [(col, row), ...]
+    hash_distance: int = 0
+    heatmap: str | None = None
+    reason: str = ""
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "status": self.status,
+            "seconds": round(self.seconds, 3),
+            "changed_fraction": round(self.changed_fraction, 5),
+            "failed_tiles": len(self.failed_tiles),
+            "hash_distance": self.hash_distance,
+            "heatmap": self.heatmap,
+            "reason": self.reason,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Array helpers
+# ---------------------------------------------------------------------------
+
+def load_rgb(path: str):
+    """PNG → HxWx3 uint8 array."""
+    from PIL import Image
+    with Image.open(path) as image:
+        return _np().asarray(image.convert("RGB"))
+
+
+def downsample(pixels, factor: int):
+    """Block-average an HxWxC array by `factor` (edges that don't fill a block are dropped)."""
+    np = _np()
+    if factor <= 1:
+        return pixels.astype(np.float32)
+    h, w = pixels.shape[0] // factor * factor, pixels.shape[1] // factor * factor
+    blocks = pixels[:h, :w].astype(np.float32).reshape(h // factor, factor, w // factor, factor, -1)
+    return blocks.mean(axis=(1, 3))
+
+
+def dhash(pixels, size: int = 8) -> int:
+    """Difference hash: compare neighbouring cells of a (size+1)xsize grey thumbnail."""
+    from PIL import Image
+    np = _np()
+    grey = Image.fromarray(pixels.astype(np.uint8)).convert("L").resize((size + 1, size), Image.BILINEAR)
+    cells = np.asarray(grey, dtype=np.int16)
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def mask_array(shape: tuple[int, int], rects: list[dict]):
+    """Boolean HxW array, True where pixels are ignored."""
+    np = _np()
+    h, w = shape
+    mask = np.zeros((h, w), dtype=bool)
+    for entry in rects:
+        fx, fy, fw, fh = entry["rect"]
+        x0, y0 = int(fx * w), int(fy * h)
+        x1, y1 = int(round((fx + fw) * w)), int(round((fy + fh) * h))
+        mask[max(0, y0):min(h, y1), max(0, x0):min(w, x1)] = True
+    return mask
+
+
+def tile_scores(changed, mask, tile: int):
+    """Per-tile fraction of changed, unmasked pixels. Returns a rows x cols float array."""
+    np = _np()
+    h, w = changed.shape
+    rows, cols = -(-h // tile), -(-w // tile)
+    pad = ((0, rows * tile - h), (0, cols * tile - w))
+    counted = np.pad(~mask, pad).reshape(rows, tile, cols, tile).sum(axis=(1, 3))
+    hits = np.pad(changed & ~mask, pad).reshape(rows, tile, cols, tile).sum(axis=(1, 3))
+    return np.divide(hits, counted, out=np.zeros(hits.shape, dtype=np.float32), where=counted > 0)
+
+
+# ---------------------------------------------------------------------------
+# Baseline store
+# ---------------------------------------------------------------------------
+
+class BaselineStore:
+    """Golden images for one backend and replay, plus the masks that apply to them."""
+
+    def __init__(self, backend: str, replay: str, root: str = BASELINE_DIR):
+        self.backend = backend
+        self.root = os.path.join(root, backend)
+        self.dir = os.path.join(self.root, replay)
+        self._masks = None
+
+    def path(self, label: str) -> str:
+        return os.path.join(self.dir, f"{label}.png")
+
+    def has(self, label: str) -> bool:
+        return os.path.exists(self.path(label))
+
+    def update(self, label: str, screenshot_path: str):
+        os.makedirs(self.dir, exist_ok=True)
+        shutil.copyfile(screenshot_path, self.path(label))
+
+    def masks(self, label: str) -> list[dict]:
+        if self._masks is None:
+            path = os.path.join(self.root, MASKS_FILE)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    self._masks = json.load(f)
+            else:
+                self._masks = DEFAULT_MASKS.get(self.backend, {})
+        return self._masks.get("*", []) + self._masks.get(label, [])
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def compare(label: str, baseline_path: str, actual_path: str, masks: list[dict],
+            thresholds: Thresholds = Thresholds(), heatmap_path: str | None = None) -> VisualResult:
+    np = _np()
+    start = time.perf_counter()
+    baseline, actual = load_rgb(baseline_path), load_rgb(actual_path)
+    if baseline.shape != actual.shape:
+        from PIL import Image
+        # Same window on a different scale factor: bring the actual image to the baseline's size
+        bh, bw = baseline.shape[:2]
+        ah, aw = actual.shape[:2]
+        if abs(bw / bh - aw / ah) > 0.01:
+            return VisualResult(label, "fail", time.perf_counter() - start,
+                                reason=f"size {aw}x{ah} does not match baseline {bw}x{bh}")
+        actual = np.asarray(Image.fromarray(actual).resize((bw, bh), Image.BILINEAR))
+
+    small_base = downsample(baseline, thresholds.downsample)
+    small_actual = downsample(actual, thresholds.downsample)
+    mask = mask_array(small_base.shape[:2], masks)
+    delta = np.abs(small_base - small_actual).max(axis=2)
+    changed = (delta > thresholds.pixel_threshold) & ~mask
+
+    scores = tile_scores(changed, mask, thresholds.tile)
+    failed = [(int(c), int(r)) for r, c in zip(*np.nonzero(scores > thresholds.tile_fraction))]
+    unmasked = int((~mask).sum()) or 1
+    distance = hamming(dhash(np.where(mask[..., None], 0, small_base)),
+                       dhash(np.where(mask[..., None], 0, small_actual)))
+
+    result = VisualResult(label, "pass", changed_fraction=float(changed.sum()) / unmasked,
+                          failed_tiles=failed, hash_distance=distance)
+    if failed or distance > thresholds.hash_distance:
+        result.status = "fail"
+        result.reason = f"{len(failed)} tiles differ, dHash distance {distance}"
+        if heatmap_path:
+            write_heatmap(small_base, delta, mask, failed, thresholds.tile, heatmap_path)
+            result.heatmap = heatmap_path
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def write_heatmap(baseline, delta, mask, failed_tiles, tile: int, path: str):
+    """Baseline in grey, differences in red (brighter = bigger), failed tiles outlined in yellow."""
+    from PIL import Image
+    np = _np()
+    grey = baseline.mean(axis=2) * 0.5
+    out = np.repeat(grey[..., None], 3, axis=2)
+    strength = np.clip(delta / 128.0, 0, 1)
+    out[..., 0] = np.maximum(out[..., 0], strength * 255)
+    out[..., 1] *= 1 - strength
+    out[..., 2] *= 1 - strength
+    out[mask] = out[mask] * 0.3 + np.array([0, 0, 90]) * 0.7   # masked areas tinted blue
+    h, w = delta.shape
+    for col, row in failed_tiles:
+        x0, y0 = col * tile, row * tile
+        x1, y1 = min(w, x0 + tile) - 1, min(h, y0 + tile) - 1
+        out[y0, x0:x1 + 1] = out[y1, x0:x1 + 1] = (255, 255, 0)
+        out[y0:y1 + 1, x0] = out[y0:y1 + 1, x1] = (255, 255, 0)
+    Image.fromarray(out.astype(np.uint8)).save(path, compress_level=1)
+
+
+def check(shots: list[tuple[str, str]], store: BaselineStore, update: bool = False,
+          thresholds: Thresholds = Thresholds()) -> list[VisualResult]:
+    """
+    Compare (label, screenshot path) pairs against the store. Labels without a
+    baseline are reported as "new"; with update=True they (and failures) are
+    written to the store instead.
+    """
+    results = []
+    for label, path in shots:
+        if not os.path.exists(path):
+            results.append(VisualResult(label, "error", reason="screenshot missing"))
+            continue
+        if not store.has(label):
+            if update:
+                store.update(label, path)
+            results.append(VisualResult(label, "new", reason="baseline written" if update else "no baseline"))
+            continue
+        try:
+            result = compare(label, store.path(label), path, store.masks(label), thresholds,
+                             heatmap_path=os.path.splitext(path)[0] + ".diff.png")
+        except Exception as e:
+            result = VisualResult(label, "error", reason=str(e))
+        if update and result.status == "fail":
+            store.update(label, path)
+            result.reason += " (baseline updated)"
+        results.append(result)
+    return results
+
+
+def print_summary(results: list[VisualResult]):
+    if not results:
+        return
+    print(f"\n  {'Screenshot':<32} {'Result':<6} {'Changed':>8} {'Tiles':>6} {'dHash':>6} {'Time':>7}")
+    print(f"  {'-'*32} {'-'*6} {'-'*8} {'-'*6} {'-'*6} {'-'*7}")
+    for r in results:
+        print(f"  {r.label[:32]:<32} {r.status.upper():<6} {r.changed_fraction:>7.2%} "
+              f"{len(r.failed_tiles):>6} {r.hash_distance:>6} {r.seconds * 1000:>5.0f}ms  {r.reason}")
+
+
+# ---------------------------------------------------------------------------
+# Command line: re-check an artifacts directory
+# ---------------------------------------------------------------------------
+
+def shots_in(directory: str) -> list[tuple[str, str]]:
+    """(label, path) for harness screenshots named NN_<label>_HHMMSS.png."""
+    shots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".png") or name.endswith(".diff.png"):
+            continue
+        parts = name[:-4].split("_")
+        if len(parts) >= 3 and parts[0].isdigit() and parts[-1].isdigit():
+            shots.append(("_".join(parts[1:-1]), os.path.join(directory, name)))
+    return shots
+
+
+def main(argv=None) -> int:
+    from backends import default_backend_name
+    parser = argparse.ArgumentParser(description="Compare harness screenshots against golden images")
+    parser.add_argument("screenshots", help="directory with the run's screenshots")
+    parser.add_argument("--backend", default=None, help="baseline set (default: this platform's backend)")
+    parser.add_argument("--replay", required=True, help="replay name (file stem) the baselines were taken with")
+    parser.add_argument("--baselines", default=BASELINE_DIR)
+    parser.add_argument("--update", action="store_true", help="write new and failing screenshots as baselines")
+    args = parser.parse_args(argv)
+
+    store = BaselineStore(args.backend or default_backend_name(), args.replay, args.baselines)
+    results = check(shots_in(args.screenshots), store, update=args.update)
+    print_summary(results)
+    return 1 if any(r.status in ("fail", "error") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
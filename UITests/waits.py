@@ -0,0 +1,131 @@
+"""
+Event-driven waits for the BotOrNot GUI test harness.
+
+Instead of sleeping for a worst-case fixed time, the harness polls a
+condition until it holds. The most common condition is "this screen region
+stopped changing", which tracks how long the app really takes to render.
+
+Every wait is recorded together with the fixed sleep it replaced, so the run
+ends with a table showing how much time the waits saved (or cost). Each wait
+is also a "sleep" span in the step timing (timing.py).
+"""
+
+import time
+import hashlib
+from dataclasses import dataclass
+
+import timing
+
+
+@dataclass
+class WaitRecord:
+    label: str
+    elapsed: float
+    budget: float | None   # the fixed sleep this wait replaced, if any
+    ok: bool
+
+
+_records: list[WaitRecord] = []
+
+
+def wait_until(condition, timeout: float, poll: float = 0.1, label: str = "wait",
+               budget: float | None = None, required: bool = False):
+    """
+    Poll condition() every `poll` seconds until it returns something truthy or
+    `timeout` seconds pass. Returns the last value of condition().
+
+    budget is the fixed sleep this wait replaces; it is only used for logging.
+    If required is True a timeout raises TimeoutError instead of returning.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    with timing.span(label, "sleep", timeout=timeout, budget=budget):
+        value = condition()
+        while not value and time.monotonic() < deadline:
+            time.sleep(poll)
+            value = condition()
+    record(label, time.monotonic() - start, budget, bool(value), timeout)
+    if not value and required:
+        raise TimeoutError(f"{label} did not happen within {timeout:.1f}s")
+    return value
+
+
+def record(label: str, elapsed: float, budget: float | None, ok: bool, timeout: float | None = None):
+    """Log a finished wait. Used by wait_until and by waits driven by other events (app log lines)."""
+    _records.append(WaitRecord(label, elapsed, budget, ok))
+    note = f" (fixed budget {budget:.1f}s)" if budget is not None else ""
+    status = "ok" if ok else f"TIMED OUT after {timeout or elapsed:.1f}s"
+    print(f"  [wait] {label}: {elapsed:.2f}s{note} {status}")
+
+
+def region_fingerprint(grab, region) -> bytes:
+    """Cheap content hash of a screen region. grab(region) must return raw pixels."""
+    return hashlib.blake2b(grab(region), digest_size=16).digest()
+
+
+def region_stable(grab, region, settle: float = 0.3):
+    """
+    Condition that holds once the region's pixels have not changed for
+    `settle` seconds. region is a (x, y, w, h) tuple in screen coordinates.
+    """
+    state = {"digest": None, "since": 0.0}
+
+    def condition() -> bool:
+        digest = region_fingerprint(grab, region)
+        now = time.monotonic()
+        if digest != state["digest"]:
+            state["digest"] = digest
+            state["since"] = now
+            return False
+        return now - state["since"] >= settle
+
+    return condition
+
+
+def region_changed(grab, region, reference: bytes | None = None):
+    """
+    Condition that holds once the region differs from `reference` (a
+    region_fingerprint taken earlier), or from its content at creation time.
+    """
+    baseline = reference if reference is not None else region_fingerprint(grab, region)
+
+    def condition() -> bool:
+        return region_fingerprint(grab, region) != baseline
+
+    return condition
+
+
+def all_of(*conditions):
+    """Condition that holds once every condition has held (each is checked until it does)."""
+    done = [False] * len(conditions)
+
+    def condition() -> bool:
+        for i, cond in enumerate(conditions):
+            if not done[i]:
+                done[i] = bool(cond())
+                if not done[i]:
+                    return False
+        return True
+
+    return condition
+
+
+def records() -> list[WaitRecord]:
+    return list(_records)
+
+
+def print_summary():
+    """Print every wait of the run next to the fixed sleep it replaced."""
+    if not _records:
+        return
+    print(f"\n  {'Wait':<36} {'Actual':>8} {'Budget':>8} {'Saved':>8}")
+    print(f"  {'-'*36} {'-'*8} {'-'*8} {'-'*8}")
+    total_actual = total_budget = 0.0
+    for r in _records:
+        budget = f"{r.budget:.2f}s" if r.budget is not None else "-"
+        saved = f"{r.budget - r.elapsed:+.2f}s" if r.budget is not None else "-"
+        flag = "" if r.ok else "  (timeout)"
+        print(f"  {r.label[:36]:<36} {r.elapsed:>7.2f}s {budget:>8} {saved:>8}{flag}")
+        total_actual += r.elapsed
+        total_budget += r.budget or 0.0
+    print(f"  {'TOTAL':<36} {total_actual:>7.2f}s {total_budget:>7.2f}s {total_budget - total_actual:>+7.2f}s")